@@ -0,0 +1,336 @@
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+from models import db, Employee, Supplier, Product, WorkSchedule, User, UserRequest
+from datetime import datetime
+from flask_login import current_user
+from search_utils import invalidate_product_search
+from db_pool import pool_stats
+from view_utils import requires_admin, requires_operator_or_admin, requires_authorized_or_above
+from reference_utils import get_departments
+
+bp = Blueprint('admin', __name__)
+
+@bp.route('/admin/user_requests')
+@requires_admin
+def user_requests():
+    requests = UserRequest.query.order_by(UserRequest.request_date.desc()).all()
+    return render_template('user_requests.html', requests=requests)
+
+@bp.route('/admin/approve_request/<int:request_id>')
+@requires_admin
+def approve_request(request_id):
+    user_request = UserRequest.query.get_or_404(request_id)
+
+    if user_request.status != 'pending':
+        flash('Цю заявку вже оброблено.', 'warning')
+        return redirect(url_for('admin.user_requests'))
+
+    new_user = User(
+        username=user_request.full_name,
+        email=user_request.email,
+        role='authorized_user'
+    )
+    new_user.password_hash = user_request.password_hash
+
+    user_request.status = 'approved'
+    user_request.reviewed_by = current_user.id
+    user_request.reviewed_at = datetime.utcnow()
+
+    db.session.add(new_user)
+    db.session.commit()
+
+    flash(f'Користувача {new_user.username} створено з правами авторизованого користувача.', 'success')
+    return redirect(url_for('admin.user_requests'))
+
+@bp.route('/admin/reject_request/<int:request_id>')
+@requires_admin
+def reject_request(request_id):
+    user_request = UserRequest.query.get_or_404(request_id)
+
+    if user_request.status != 'pending':
+        flash('Цю заявку вже оброблено.', 'warning')
+        return redirect(url_for('admin.user_requests'))
+
+    user_request.status = 'rejected'
+    user_request.reviewed_by = current_user.id
+    user_request.reviewed_at = datetime.utcnow()
+
+    db.session.commit()
+
+    flash('Заявку відхилено.', 'success')
+    return redirect(url_for('admin.user_requests'))
+
+@bp.route('/admin/users')
+@requires_admin
+def admin_users():
+    users = User.query.all()
+    return render_template('admin_users.html', users=users)
+
+@bp.route('/admin/toggle_user/<int:user_id>')
+@requires_admin
+def toggle_user(user_id):
+    user = User.query.get_or_404(user_id)
+
+    if user.role == 'administrator':
+        flash("Неможливо змінити статус адміністратора.", "danger")
+        return redirect(url_for('admin.admin_users'))
+
+    user.is_active_flag = not user.is_active_flag
+    db.session.commit()
+
+    if user.is_active_flag:
+        flash(f"Користувача {user.username} активовано.", "success")
+    else:
+        flash(f"Користувача {user.username} заблоковано.", "warning")
+
+    return redirect(url_for('admin.admin_users'))
+
+@bp.route('/admin/create_operator', methods=['GET', 'POST'])
+@requires_admin
+def create_operator():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        email = request.form.get('email')
+        password = request.form.get('password')
+
+        if username and email and password:
+            existing_user = User.query.filter_by(username=username).first()
+            if existing_user:
+                flash('Користувач з таким логіном вже існує.', 'danger')
+            else:
+                new_user = User(
+                    username=username,
+                    email=email,
+                    role='operator'
+                )
+                new_user.set_password(password)
+                db.session.add(new_user)
+                db.session.commit()
+                flash(f'Оператора {username} створено успішно.', 'success')
+                return redirect(url_for('admin.admin_users'))
+
+    return render_template('create_operator.html')
+
+@bp.route('/employees')
+@requires_authorized_or_above
+def employees():
+    employees = Employee.query.filter_by(is_deleted=False).all()
+    departments = get_departments()
+    work_schedules = WorkSchedule.query.order_by(WorkSchedule.work_date)
+
+    return render_template('employees.html', employees=employees, departments=departments,  work_schedules=work_schedules)
+
+@bp.route('/employees/add', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def add_employee():
+    if request.method == 'POST':
+        first_name = request.form.get('first_name')
+        last_name = request.form.get('last_name')
+        position = request.form.get('position')
+        phone = request.form.get('phone')
+        email = request.form.get('email')
+        is_on_vacation = 'is_on_vacation' in request.form
+        department_id = request.form.get('department_id')
+
+        if first_name and last_name and position and department_id:
+            employee = Employee(
+                first_name=first_name,
+                last_name=last_name,
+                position=position,
+                phone=phone,
+                email=email,
+                is_on_vacation=is_on_vacation,
+                department_id=department_id
+            )
+            db.session.add(employee)
+            db.session.commit()
+            flash(f'Співробітника {employee.full_name} додано успішно.', 'success')
+            return redirect(url_for('admin.employees'))
+
+    departments = get_departments()
+    return render_template('add_employee.html', departments=departments)
+
+@bp.route('/employees/edit/<int:employee_id>', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def edit_employee(employee_id):
+    employee = Employee.query.get_or_404(employee_id)
+
+    if request.method == 'POST':
+        employee.first_name = request.form.get('first_name')
+        employee.last_name = request.form.get('last_name')
+        employee.position = request.form.get('position')
+        employee.phone = request.form.get('phone')
+        employee.email = request.form.get('email')
+        employee.is_on_vacation = 'is_on_vacation' in request.form
+        employee.department_id = request.form.get('department_id')
+
+        db.session.commit()
+        flash(f'Співробітника {employee.full_name} оновлено успішно.', 'success')
+        return redirect(url_for('admin.employees'))
+
+    departments = get_departments()
+    return render_template('edit_employee.html', employee=employee, departments=departments)
+
+@bp.route('/employees/delete/<int:employee_id>')
+@requires_operator_or_admin
+def delete_employee(employee_id):
+    employee = Employee.query.get_or_404(employee_id)
+
+    if not employee.is_deletable():
+        flash(f'Неможливо видалити співробітника {employee.full_name}, бо за ним є продажі.', 'danger')
+        return redirect(url_for('admin.employees'))
+
+    employee.is_deleted = True
+    db.session.commit()
+
+    flash(f'Співробітника {employee.full_name} успішно видалено.', 'success')
+    return redirect(url_for('admin.employees'))
+
+@bp.route('/schedule/add', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def add_schedule():
+    employees = Employee.query.filter_by(is_deleted=False).all()
+    departments = get_departments()
+
+    if request.method == 'POST':
+        emp_id = request.form.get('employee_id')
+        work_date = datetime.strptime(request.form.get('work_date'), "%Y-%m-%d").date()
+        start = datetime.strptime(request.form.get('shift_start'), "%H:%M").time()
+        end = datetime.strptime(request.form.get('shift_end'), "%H:%M").time()
+
+        schedule = WorkSchedule(
+            employee_id=emp_id,
+            department_id=int(request.form.get('department_id')),
+            work_date=work_date,
+            shift_start=start,
+            shift_end=end
+        )
+
+        db.session.add(schedule)
+        db.session.commit()
+        flash("Зміну додано.", "success")
+        return redirect(url_for('admin.employees'))
+
+    return render_template("add_schedule.html", employees=employees, departments=departments)
+
+@bp.route('/schedule/edit/<int:schedule_id>', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def edit_schedule(schedule_id):
+    schedule = WorkSchedule.query.get_or_404(schedule_id)
+    employees = Employee.query.filter_by(is_deleted=False).all()
+    departments = get_departments()
+
+    if request.method == 'POST':
+        schedule.employee_id = request.form.get('employee_id')
+        schedule.department_id = request.form.get('department_id')
+        schedule.work_date = datetime.strptime(request.form['work_date'], "%Y-%m-%d").date()
+        schedule.shift_start = datetime.strptime(request.form['shift_start'], "%H:%M").time()
+        schedule.shift_end = datetime.strptime(request.form['shift_end'], "%H:%M").time()
+
+        db.session.commit()
+        flash("Зміну оновлено.", "success")
+        return redirect(url_for('admin.employees'))
+
+    return render_template("edit_schedule.html", schedule=schedule, employees=employees, departments=departments)
+
+@bp.route('/schedule/delete/<int:schedule_id>')
+@requires_operator_or_admin
+def delete_schedule(schedule_id):
+    schedule = WorkSchedule.query.get_or_404(schedule_id)
+
+    db.session.delete(schedule)
+    db.session.commit()
+
+    flash("Зміну видалено.", "success")
+    return redirect(url_for('admin.employees'))
+
+SOFT_DELETABLE = {
+    'suppliers': Supplier,
+    'products': Product,
+    'employees': Employee,
+}
+
+def parse_id_list():
+    """Ідентифікатори з JSON {"ids": [...]} або з полів форми ids; ValueError для некоректного тіла."""
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict) or not isinstance(payload.get('ids', []), list):
+            raise ValueError('Некоректне тіло запиту: очікується {"ids": [...]}')
+        raw_ids = payload.get('ids')
+    else:
+        raw_ids = request.form.getlist('ids')
+
+    ids = set()
+    for raw in raw_ids or []:
+        try:
+            ids.add(int(raw))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+@bp.route('/api/<entity>/bulk-delete', methods=['POST'])
+@requires_operator_or_admin
+def api_bulk_delete(entity):
+    model = SOFT_DELETABLE.get(entity)
+    if model is None:
+        return jsonify({'error': 'Невідомий тип записів'}), 404
+
+    try:
+        ids = parse_id_list()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not ids:
+        return jsonify({'error': 'Не передано жодного ідентифікатора'}), 400
+
+    found = {row.id for row in db.session.query(model.id).filter(model.id.in_(ids))}
+    blocked = model.ids_with_dependencies(found)
+    to_delete = found - blocked
+
+    if to_delete:
+        model.query.filter(model.id.in_(to_delete)).update(
+            {model.is_deleted: True}, synchronize_session=False
+        )
+    db.session.commit()
+
+    if model is Product:
+        invalidate_product_search()
+
+    return jsonify({
+        'deleted': sorted(to_delete),
+        'blocked': sorted(blocked),
+        'not_found': sorted(ids - found)
+    })
+
+@bp.route('/api/<entity>/bulk-restore', methods=['POST'])
+@requires_operator_or_admin
+def api_bulk_restore(entity):
+    model = SOFT_DELETABLE.get(entity)
+    if model is None:
+        return jsonify({'error': 'Невідомий тип записів'}), 404
+
+    try:
+        ids = parse_id_list()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not ids:
+        return jsonify({'error': 'Не передано жодного ідентифікатора'}), 400
+
+    found = {row.id for row in db.session.query(model.id).filter(model.id.in_(ids))}
+
+    if found:
+        model.query.filter(model.id.in_(found)).update(
+            {model.is_deleted: False}, synchronize_session=False
+        )
+    db.session.commit()
+
+    if model is Product:
+        invalidate_product_search()
+
+    return jsonify({
+        'restored': sorted(found),
+        'not_found': sorted(ids - found)
+    })
+
+@bp.route('/api/admin/pool-stats')
+@requires_admin
+def api_pool_stats():
+    return jsonify(pool_stats(db.engine))
@@ -0,0 +1,187 @@
+"""ASGI-режим розгортання: uvicorn asgi:application --workers 4
+
+Flask-додаток лишається синхронним, але запити розподіляються між двома пулами потоків:
+звітні GET-ендпоінти виконуються в окремому обмеженому пулі, тож повільні звіти
+не займають потоки, що обслуговують касу та інші маршрути на запис.
+"""
+import io
+import os
+import sys
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from app import get_app
+
+REPORT_WORKERS = int(os.getenv('ASGI_REPORT_WORKERS', 4))
+WEB_WORKERS = int(os.getenv('ASGI_WEB_WORKERS', 16))
+# скільки порцій відповіді може чекати на відправлення; далі потік звіту блокується, доки клієнт не прочитає
+RESPONSE_BUFFER_CHUNKS = int(os.getenv('ASGI_RESPONSE_BUFFER_CHUNKS', 8))
+# як часто потік, що чекає на місце в черзі, перевіряє, чи клієнт ще на зв'язку
+DISCONNECT_POLL = 0.1
+REPORT_PATHS = ('/api/query', '/api/dashboard', '/api/revenue-series', '/api/sales-cube', '/api/export')
+
+app = get_app()
+
+_report_executor = ThreadPoolExecutor(REPORT_WORKERS, thread_name_prefix='asgi-reports')
+_web_executor = ThreadPoolExecutor(WEB_WORKERS, thread_name_prefix='asgi-web')
+
+class ClientDisconnected(Exception):
+    pass
+
+def _is_report(scope):
+    return scope['method'] == 'GET' and scope['path'].startswith(REPORT_PATHS)
+
+def _environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client')
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0] if client else '',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').lower()
+        value = value.decode('latin-1')
+        if name == 'content-length':
+            continue
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+            continue
+        key = 'HTTP_' + name.upper().replace('-', '_')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+    return environ
+
+def _run_wsgi(environ, emit):
+    # уся відповідь формується в одному потоці: stream_with_context тримає контекст Flask у генераторі
+    def start_response(status, headers, exc_info=None):
+        emit(('start', int(status.split(' ', 1)[0]), headers))
+
+    iterable = app(environ, start_response)
+    try:
+        for chunk in iterable:
+            if chunk:
+                emit(('body', chunk))
+    finally:
+        # close() звільняє слот звіту та з'єднання з БД, навіть якщо клієнт пішов посеред відповіді
+        if hasattr(iterable, 'close'):
+            iterable.close()
+
+async def _read_body(receive):
+    body = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(body)
+
+async def _wait_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            _report_executor.shutdown(wait=False)
+            _web_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    body = await _read_body(receive)
+    if body is None:
+        return
+
+    loop = asyncio.get_running_loop()
+    messages = asyncio.Queue(RESPONSE_BUFFER_CHUNKS)
+    disconnected = threading.Event()
+
+    def emit(message):
+        # викликається в потоці пулу: чекає на місце в черзі, тож повільний клієнт гальмує генерацію звіту
+        future = asyncio.run_coroutine_threadsafe(messages.put(message), loop)
+        while True:
+            if disconnected.is_set():
+                future.cancel()
+                raise ClientDisconnected()
+            try:
+                return future.result(timeout=DISCONNECT_POLL)
+            except FutureTimeout:
+                pass
+
+    executor = _report_executor if _is_report(scope) else _web_executor
+    task = loop.run_in_executor(executor, _run_wsgi, _environ(scope, body), emit)
+    # виняток потоку після відключення клієнта нікому не потрібен
+    task.add_done_callback(lambda future: future.cancelled() or future.exception())
+    watcher = asyncio.ensure_future(_wait_disconnect(receive))
+
+    started = False
+    try:
+        while True:
+            getter = asyncio.ensure_future(messages.get())
+            done, _ = await asyncio.wait({getter, task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if watcher in done:
+                getter.cancel()
+                disconnected.set()
+                return
+            if getter in done:
+                message = getter.result()
+            else:
+                # потік завершився; усе, що він встиг покласти в чергу, ще треба відправити
+                getter.cancel()
+                if messages.empty():
+                    break
+                message = messages.get_nowait()
+
+            if message[0] == 'start' and not started:
+                started = True
+                await send({
+                    'type': 'http.response.start',
+                    'status': message[1],
+                    'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in message[2]]
+                })
+            elif message[0] == 'body':
+                await send({'type': 'http.response.body', 'body': message[1], 'more_body': True})
+    finally:
+        watcher.cancel()
+        # клієнт пішов, send упав або сервер скасував запит: потік закриє відповідь на наступній порції
+        if not task.done():
+            disconnected.set()
+
+    if task.exception() is not None and not started:
+        await send({
+            'type': 'http.response.start',
+            'status': 500,
+            'headers': [(b'content-type', b'text/plain; charset=utf-8')]
+        })
+        started = True
+
+    if started:
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
@@ -0,0 +1,60 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from models import db, User, UserRequest
+from flask_login import login_user, logout_user, login_required, current_user
+
+bp = Blueprint('auth', __name__)
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('catalogue.index'))
+
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+
+        user = User.query.filter_by(username=username).first()
+
+        if not user:
+            flash("Користувача з таким логіном не існує.", "danger")
+        elif not user.check_password(password):
+            flash("Невірний пароль.", "danger")
+        elif not user.is_active():
+            flash("Ваш обліковий запис заблоковано. Зверніться до адміністратора.", "danger")
+        else:
+            login_user(user)
+            next_page = request.args.get('next')
+            return redirect(next_page) if next_page else redirect(url_for('catalogue.index'))
+
+    return render_template('login.html')
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for('auth.login'))
+
+@bp.route('/register_request', methods=['GET', 'POST'])
+def register_request():
+    if current_user.is_authenticated:
+        return redirect(url_for('catalogue.index'))
+
+    if request.method == 'POST':
+        full_name = request.form.get('full_name')
+        email = request.form.get('email')
+        phone = request.form.get('phone')
+        password = request.form.get('password')
+
+        if full_name and email:
+            user_request = UserRequest(
+                full_name=full_name,
+                email=email,
+                phone=phone,
+            )
+            user_request.set_password(password)
+            db.session.add(user_request)
+            db.session.commit()
+            flash('Ваш запит на реєстрацію надіслано адміністратору.', 'success')
+            return redirect(url_for('catalogue.index'))
+
+    return render_template('register_request.html')
@@ -0,0 +1,107 @@
+"""Навантажувальний тест ASGI-режиму: затримка «легких» запитів, поки паралельно йдуть важкі звіти.
+
+Запити подаються прямо в asgi.application без мережі, тож міряється саме розподіл між пулами:
+    python benchmarks/asgi_load.py --reports 40 --requests 100
+    python benchmarks/asgi_load.py --reports 40 --requests 100 --shared-pool
+
+--shared-pool пускає все через один пул того самого загального розміру, як звичайний
+багатопотоковий WSGI-сервер: звіти займають потоки, а легкі запити чекають у черзі за ними.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# обмеження на користувача тут заважає: усі звіти йдуть від одного облікового запису
+os.environ.setdefault('REPORTS_PER_USER', '1000')
+
+from concurrent.futures import ThreadPoolExecutor
+
+import asgi
+
+async def call(path, headers=(), method='GET', body=b''):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query.encode('latin-1'),
+        'headers': list(headers), 'http_version': '1.1', 'scheme': 'http',
+        'server': ('localhost', 80), 'client': ('127.0.0.1', 0)
+    }
+    request = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    finished = asyncio.Event()
+    status = {}
+
+    async def receive():
+        if request:
+            return request.pop()
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status['code'] = message['status']
+            status['headers'] = message['headers']
+
+    started = time.perf_counter()
+    await asgi.application(scope, receive, send)
+    finished.set()
+    return status.get('code'), time.perf_counter() - started, status.get('headers', [])
+
+async def login(username, password):
+    _, _, headers = await call(
+        '/login', method='POST',
+        body=f'username={username}&password={password}'.encode('utf-8'),
+        headers=[(b'content-type', b'application/x-www-form-urlencoded')]
+    )
+    cookie = next(value for name, value in headers if name == b'set-cookie')
+    return [(b'cookie', cookie.split(b';')[0])]
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+async def run(args):
+    headers = await login(args.username, args.password)
+    reports = [asyncio.ensure_future(call(args.report_path, headers)) for _ in range(args.reports)]
+    await asyncio.sleep(0.05)
+
+    light = []
+    for _ in range(args.requests):
+        light.append(await call(args.web_path, headers))
+        await asyncio.sleep(args.interval)
+    reports = await asyncio.gather(*reports)
+
+    for name, results in (('легкі', light), ('звіти', reports)):
+        timings = [elapsed * 1000 for _, elapsed, _ in results]
+        statuses = sorted({code for code, _, _ in results})
+        print(
+            f"{name:>6}: {len(results)} запитів, статуси {statuses}, "
+            f"p50 {percentile(timings, 0.5):7.1f} мс, p95 {percentile(timings, 0.95):7.1f} мс, "
+            f"макс {max(timings):7.1f} мс"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reports', type=int, default=40, help='скільки важких звітів запустити одночасно')
+    parser.add_argument('--requests', type=int, default=100, help='скільки легких запитів зробити послідовно')
+    parser.add_argument('--interval', type=float, default=0.01)
+    parser.add_argument('--report-path', default='/api/query6')
+    parser.add_argument('--web-path', default='/api/departments')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--shared-pool', action='store_true', help='один пул для всіх запитів (як WSGI)')
+    args = parser.parse_args()
+
+    if args.shared_pool:
+        asgi._is_report = lambda scope: False
+        asgi._web_executor = ThreadPoolExecutor(asgi.REPORT_WORKERS + asgi.WEB_WORKERS)
+    print(
+        f"{'спільний пул' if args.shared_pool else 'окремі пули'}: "
+        f"звітів {asgi.REPORT_WORKERS} + інших {asgi.WEB_WORKERS} потоків, "
+        f"{args.reports} x {args.report_path} і {args.requests} x {args.web_path}"
+    )
+    asyncio.run(run(args))
+
+if __name__ == '__main__':
+    main()
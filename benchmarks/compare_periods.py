@@ -0,0 +1,56 @@
+"""Заміри /api/compare: час обчислення періодів залежно від кількості потоків.
+
+Запуск на робочій копії бази (DATABASE_URL з .env):
+    python benchmarks/compare_periods.py --start 2024-01-01 --end 2024-12-31 --period month --workers 1,2,4,8
+
+Прискорення близьке до лінійного лише тоді, коли час іде на сервер БД (PostgreSQL)
+і пул має не менше з'єднань, ніж потоків; на SQLite запити впираються в GIL.
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import comparison_utils
+from app import get_app
+
+def run(app, metric, periods, workers, repeat):
+    comparison_utils._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='compare')
+    try:
+        comparison_utils.compare_periods(app, metric, periods)  # прогрів пулу з'єднань
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            comparison_utils.compare_periods(app, metric, periods)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+    finally:
+        comparison_utils._executor.shutdown()
+        comparison_utils._executor = None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--start', type=date.fromisoformat, default=date(date.today().year, 1, 1))
+    parser.add_argument('--end', type=date.fromisoformat, default=date.today())
+    parser.add_argument('--period', choices=comparison_utils.PERIOD_TYPES, default='month')
+    parser.add_argument('--metric', choices=comparison_utils.METRICS, default='revenue')
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = get_app()
+    periods = comparison_utils.split_periods(args.start, args.end, args.period)
+    print(f"{args.metric}, {len(periods)} періодів ({args.period}), {app.config['SQLALCHEMY_DATABASE_URI'].split(':')[0]}")
+
+    baseline = None
+    for workers in [int(value) for value in args.workers.split(',')]:
+        elapsed = run(app, args.metric, periods, workers, args.repeat)
+        baseline = baseline or elapsed
+        print(f"потоків {workers:>2}: {elapsed * 1000:8.1f} мс, прискорення x{baseline / elapsed:.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Запит 4 до і після переписування на NOT EXISTS: час виконання та план запиту.
+
+    python benchmarks/query4_not_exists.py --synthetic 20
+    python benchmarks/query4_not_exists.py --category 'Настільні ігри' --category Детективи
+
+«До» — попередня форма: окремий пошук першої категорії за LIKE, потім NOT IN по підзапиту
+постачальників. «Після» — поточний BookstoreQueries.query_4_suppliers_without_categories.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic
+from models import db, Supplier, Contract, ContractProduct, Product, ProductCategory
+from queries import BookstoreQueries
+
+def suppliers_before(category_names=None):
+    # відтворення коду до переписування; список категорій обробляється так само через IN
+    if category_names:
+        category_ids = [row.id for row in ProductCategory.query.filter(ProductCategory.name.in_(category_names))]
+    else:
+        first = ProductCategory.query.filter(ProductCategory.name.like('%настільн%')).first()
+        category_ids = [first.id] if first else []
+    if not category_ids:
+        return db.session.query(Supplier)
+
+    suppliers_with_category = db.session.query(Supplier.id).join(Contract).join(
+        ContractProduct
+    ).join(Product).filter(
+        Product.category_id.in_(category_ids)
+    ).subquery()
+    return db.session.query(Supplier).filter(~Supplier.id.in_(suppliers_with_category))
+
+def suppliers_after(category_names=None):
+    return BookstoreQueries.query_4_suppliers_without_categories(category_names, as_query=True)
+
+def explain(query):
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    prefix = 'EXPLAIN ANALYZE' if db.engine.dialect.name == 'postgresql' else 'EXPLAIN QUERY PLAN'
+    rows = db.session.execute(db.text(f'{prefix} {statement}')).all()
+    return '\n'.join('    ' + ' | '.join(str(value) for value in row) for row in rows)
+
+def measure(build, category_names, repeat):
+    result = build(category_names).all()  # прогрів кешу сторінок і компіляції
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build(category_names).all()
+        timings.append(time.perf_counter() - started)
+    return min(timings), {supplier.id for supplier in result}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--category', action='append', help='назва категорії; можна повторювати')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--explain', action='store_true', help='вивести плани обох запитів')
+    synthetic.add_arguments(parser)
+    args = parser.parse_args()
+
+    with synthetic.benchmark_app(args.synthetic).app_context():
+        before, before_ids = measure(suppliers_before, args.category, args.repeat)
+        after, after_ids = measure(suppliers_after, args.category, args.repeat)
+
+        print(f"категорії: {', '.join(args.category) if args.category else 'LIKE %настільн%'}")
+        print(f"до    (NOT IN):     {before * 1000:8.2f} мс, постачальників {len(before_ids)}")
+        print(f"після (NOT EXISTS): {after * 1000:8.2f} мс, постачальників {len(after_ids)}")
+        print(f"прискорення x{before / after:.2f}; результати {'збігаються' if before_ids == after_ids else 'РІЗНІ'}")
+
+        if args.explain:
+            print('план до:\n' + explain(suppliers_before(args.category)))
+            print('план після:\n' + explain(suppliers_after(args.category)))
+
+if __name__ == '__main__':
+    main()
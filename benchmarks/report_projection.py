@@ -0,0 +1,110 @@
+"""Запити 1, 3, 4, 6 та 7: ORM-сутності проти проєкції колонок (projection=True).
+
+    python benchmarks/report_projection.py --synthetic 20
+    python benchmarks/report_projection.py --query 6 --repeat 10
+
+«Сутності» — попередній шлях API: запит повертає ORM-об'єкти, а назви відділу, постачальника
+та співробітника підтягуються лінивими зв'язками. «Проєкція» — поточний шлях: лише потрібні
+колонки як легкі рядки. Обидва шляхи кодуються в JSON так само, як це робить API, і
+результати порівнюються побайтно.
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic
+from json_utils import dumps
+from queries import BookstoreQueries
+
+STREAM_BATCH_SIZE = 500
+
+def shift_times(result, start, end):
+    result['shift_start'] = start.strftime('%H:%M')
+    result['shift_end'] = end.strftime('%H:%M')
+    return result
+
+# номер запиту -> (побудова запиту, перетворення сутностей як раніше, перетворення проєкції як в API)
+REPORTS = {
+    1: (
+        lambda projection: BookstoreQueries.query_1_employees_info(as_query=True, projection=projection),
+        lambda emp: {
+            'id': emp.id, 'full_name': emp.full_name, 'position': emp.position,
+            'department': emp.department.name, 'phone': emp.phone, 'email': emp.email,
+            'hire_date': emp.hire_date, 'is_on_vacation': emp.is_on_vacation
+        },
+        lambda row: row._asdict()
+    ),
+    3: (
+        lambda projection: BookstoreQueries.query_3_contracts_by_period('year', as_query=True, projection=projection),
+        lambda contract: {
+            'id': contract.id, 'contract_number': contract.contract_number, 'supplier': contract.supplier.name,
+            'start_date': contract.start_date.strftime('%Y-%m-%d'), 'end_date': contract.end_date.strftime('%Y-%m-%d')
+        },
+        lambda row: row._asdict()
+    ),
+    4: (
+        lambda projection: BookstoreQueries.query_4_suppliers_without_categories(
+            ['Настільні ігри'], as_query=True, projection=projection
+        ),
+        lambda supplier: {
+            'id': supplier.id, 'name': supplier.name, 'contact_person': supplier.contact_person,
+            'phone': supplier.phone, 'email': supplier.email, 'address': supplier.address
+        },
+        lambda row: row._asdict()
+    ),
+    6: (
+        lambda projection: BookstoreQueries.query_6_sales_info(as_query=True, projection=projection),
+        lambda row: {
+            'sale_id': row[0].id, 'sale_date': row[0].sale_date, 'sale_time': row[0].sale_time,
+            'employee': row[0].employee.full_name, 'product_name': row[2].name, 'category': row[3].name,
+            'quantity': row[1].quantity, 'unit_price': row[1].unit_price, 'total_price': row[1].total_price
+        },
+        lambda row: row._asdict()
+    ),
+    7: (
+        lambda projection: BookstoreQueries.query_7_employee_count(
+            date.today(), as_query=True, projection=projection
+        ),
+        lambda row: shift_times({
+            'full_name': row[0].full_name, 'position': row[0].position, 'department': row[2].name
+        }, row[1].shift_start, row[1].shift_end),
+        lambda row: shift_times(row._asdict(), row.shift_start, row.shift_end)
+    ),
+}
+
+def encode(build, to_dict, projection):
+    from models import db
+
+    started = time.perf_counter()
+    body = [dumps(to_dict(row)) for row in build(projection).yield_per(STREAM_BATCH_SIZE)]
+    elapsed = time.perf_counter() - started
+    db.session.expunge_all()  # наступний прогін не повинен отримати сутності з identity map
+    return elapsed, body
+
+def measure(build, to_dict, projection, repeat):
+    _, body = encode(build, to_dict, projection)  # прогрів кешу сторінок і компіляції
+    return min(encode(build, to_dict, projection)[0] for _ in range(repeat)), body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--query', type=int, action='append', choices=sorted(REPORTS),
+                        help='номер запиту; можна повторювати (типово всі)')
+    parser.add_argument('--repeat', type=int, default=5)
+    synthetic.add_arguments(parser)
+    args = parser.parse_args()
+
+    with synthetic.benchmark_app(args.synthetic).app_context():
+        for number in args.query or sorted(REPORTS):
+            build, entity_to_dict, projection_to_dict = REPORTS[number]
+            before, before_body = measure(build, entity_to_dict, False, args.repeat)
+            after, after_body = measure(build, projection_to_dict, True, args.repeat)
+            same = 'збігаються' if before_body == after_body else 'РІЗНІ'
+            print(f"запит {number}: рядків {len(after_body)}, сутності {before * 1000:8.2f} мс, "
+                  f"проєкція {after * 1000:8.2f} мс, прискорення x{before / after:.2f}; результати {same}")
+
+if __name__ == '__main__':
+    main()
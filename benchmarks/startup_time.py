@@ -0,0 +1,76 @@
+"""Холодний старт: імпорт app, створення додатку та перший запит у свіжому інтерпретаторі.
+
+    python benchmarks/startup_time.py --repeat 10
+    git worktree add /tmp/bookstore-before 38922e5~1
+    python benchmarks/startup_time.py --baseline /tmp/bookstore-before
+
+Кожен замір — окремий процес python, як у воркера gunicorn чи збирання тестів pytest.
+«імпорт» — `import app` (це все, що потрібно для збирання тестів і `gunicorn app:app` до
+першого звернення), «додаток» — отримання `app.app`, «запит» — перший GET /login.
+З --baseline ті самі фази міряються для іншої копії дерева, наприклад монолітного app.py
+до переходу на фабрику додатку.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHASES = ('імпорт', 'додаток', 'запит')
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.app
+created = time.perf_counter()
+application.test_client().get('/login').close()
+served = time.perf_counter()
+print(json.dumps([imported - started, created - imported, served - created]))
+"""
+
+def probe(tree, env):
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=tree, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+def measure(tree, repeat, env):
+    probe(tree, env)  # прогрів кешу байткоду та файлової системи
+    runs = [probe(tree, env) for _ in range(repeat)]
+    return [median(run[i] for run in runs) for i in range(len(PHASES))]
+
+def report(label, timings):
+    phases = ', '.join(f'{name} {value * 1000:7.1f} мс' for name, value in zip(PHASES, timings))
+    print(f'{label}: {phases}; разом {sum(timings) * 1000:7.1f} мс')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--baseline', help='корінь іншої копії дерева для порівняння')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bookstore-startup-') as workdir:
+        env = dict(os.environ)
+        env.setdefault('SECRET_KEY', 'benchmark')
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(workdir, 'startup.db')}")
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+
+        after = measure(ROOT, args.repeat, env)
+        if args.baseline:
+            env['PYTHONPATH'] = env['PYTHONPATH'].replace(ROOT, os.path.abspath(args.baseline), 1)
+            before = measure(args.baseline, args.repeat, env)
+            report('до   ', before)
+        report('після', after)
+        if args.baseline:
+            print(f'імпорт app: прискорення x{before[0] / after[0]:.2f}; '
+                  f'до першої відповіді x{sum(before) / sum(after):.2f}')
+
+if __name__ == '__main__':
+    main()
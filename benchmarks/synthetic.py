@@ -0,0 +1,140 @@
+"""Синтетична база для бенчмарків: python benchmarks/<скрипт>.py --synthetic 5 створює
+тимчасову SQLite-базу з масштабом 5 замість робочої DATABASE_URL."""
+import os
+import sys
+import random
+import tempfile
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CATEGORIES = (
+    'Художня література', "Комп'ютерна література", 'Дитяча книга', 'Настільні ігри', 'Детективи',
+    'Фантастика', 'Історія', 'Медицина', 'Кулінарія', 'Подорожі'
+)
+DEPARTMENTS = ("Комп'ютерна література", 'Детективи', 'Дитяча книга', 'Медицина', 'Ігри')
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--synthetic', type=int, metavar='SCALE',
+        help='тимчасова SQLite-база із синтетичними даними (1 ~ 1000 товарів, 6000 позицій продажів)'
+    )
+
+def seed(scale, today=None):
+    """Заповнює порожню базу поточного контексту додатку; повертає кількість рядків за таблицями."""
+    from models import (
+        db, Department, ProductCategory, Employee, Supplier, Contract, Product, ContractProduct,
+        Sale, SaleItem, WorkSchedule, Delivery, DeliveryItem
+    )
+
+    today = today or date.today()
+    rnd = random.Random(scale)
+    rows = {}
+
+    def insert(model, values):
+        db.session.execute(model.__table__.insert(), values)
+        rows[model.__tablename__] = len(values)
+
+    insert(Department, [{'id': i + 1, 'name': name} for i, name in enumerate(DEPARTMENTS)])
+    insert(ProductCategory, [{'id': i + 1, 'name': name} for i, name in enumerate(CATEGORIES)])
+
+    employees = 50 * scale
+    insert(Employee, [{
+        'id': i, 'first_name': f'Ім\'я {i}', 'last_name': f'Прізвище {i}',
+        'position': 'Менеджер' if i % 10 == 0 else 'Продавець', 'phone': f'+380{i:09d}',
+        'email': f'employee{i}@example.com', 'hire_date': today - timedelta(days=rnd.randint(30, 3000)),
+        'is_on_vacation': i % 17 == 0, 'department_id': i % len(DEPARTMENTS) + 1, 'is_deleted': False
+    } for i in range(1, employees + 1)])
+
+    products = 1000 * scale
+    insert(Product, [{
+        'id': i, 'name': f'Книга {i}', 'author': f'Автор {i % 300}', 'isbn': f'978-966-{i:07d}',
+        'publisher': f'Видавництво {i % 40}', 'publication_date': today - timedelta(days=i % 5000),
+        'price': rnd.randint(50, 900), 'stock_quantity': rnd.randint(0, 200),
+        'category_id': i % len(CATEGORIES) + 1, 'department_id': i % len(DEPARTMENTS) + 1,
+        'is_deleted': False, 'version': 1
+    } for i in range(1, products + 1)])
+
+    suppliers = 200 * scale
+    insert(Supplier, [{
+        'id': i, 'name': f'Постачальник {i}', 'contact_person': f'Контакт {i}', 'phone': f'+380{i:09d}',
+        'email': f'supplier{i}@example.com', 'address': f'вул. Складська, {i}', 'is_deleted': False
+    } for i in range(1, suppliers + 1)])
+
+    contracts = []
+    for supplier_id in range(1, suppliers + 1):
+        for _ in range(3):
+            start = today - timedelta(days=rnd.randint(0, 700))
+            end = start + timedelta(days=rnd.randint(30, 730))
+            contracts.append({
+                'id': len(contracts) + 1, 'contract_number': f'C-{len(contracts) + 1:07d}',
+                'supplier_id': supplier_id, 'start_date': start, 'end_date': end,
+                'is_deleted': False, 'is_active': start <= today <= end
+            })
+    insert(Contract, contracts)
+
+    insert(ContractProduct, [{
+        'id': i + 1, 'contract_id': i // 5 + 1, 'product_id': rnd.randint(1, products),
+        'quantity_per_delivery': rnd.randint(5, 50), 'purchase_price': rnd.randint(30, 600)
+    } for i in range(len(contracts) * 5)])
+
+    deliveries, delivery_items = [], []
+    for contract in contracts:
+        delivery_id = len(deliveries) + 1
+        deliveries.append({
+            'id': delivery_id, 'contract_id': contract['id'], 'delivery_date': contract['start_date'],
+            'total_amount': 0, 'version': 1
+        })
+        for _ in range(3):
+            quantity, price = rnd.randint(1, 30), rnd.randint(30, 600)
+            delivery_items.append({
+                'id': len(delivery_items) + 1, 'delivery_id': delivery_id, 'product_id': rnd.randint(1, products),
+                'quantity': quantity, 'unit_price': price, 'total_price': quantity * price
+            })
+    insert(Delivery, deliveries)
+    insert(DeliveryItem, delivery_items)
+
+    sales, sale_items = [], []
+    for sale_id in range(1, 2000 * scale + 1):
+        items = []
+        for _ in range(3):
+            quantity, price = rnd.randint(1, 3), rnd.randint(50, 900)
+            items.append({
+                'id': len(sale_items) + len(items) + 1, 'sale_id': sale_id, 'product_id': rnd.randint(1, products),
+                'quantity': quantity, 'unit_price': price, 'total_price': quantity * price
+            })
+        sale_items.extend(items)
+        sales.append({
+            'id': sale_id, 'employee_id': rnd.randint(1, employees),
+            'sale_date': today - timedelta(days=rnd.randint(0, 400)),
+            'sale_time': time(rnd.randint(9, 20), rnd.randint(0, 59)),
+            'total_amount': sum(item['total_price'] for item in items), 'version': 1
+        })
+    insert(Sale, sales)
+    insert(SaleItem, sale_items)
+
+    insert(WorkSchedule, [{
+        'id': day * employees + employee_id, 'employee_id': employee_id,
+        'department_id': employee_id % len(DEPARTMENTS) + 1, 'work_date': today - timedelta(days=day),
+        'shift_start': time(9), 'shift_end': time(18)
+    } for day in range(30) for employee_id in range(1, employees + 1)])
+
+    db.session.commit()
+    return rows
+
+def benchmark_app(scale=None):
+    """Додаток для бенчмарку: робоча база або нова тимчасова із синтетичними даними."""
+    if not scale:
+        from app import get_app
+        return get_app()
+
+    from app import create_app
+    from models import db
+
+    path = os.path.join(tempfile.mkdtemp(prefix='bookstore-bench-'), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'SECRET_KEY': 'benchmark'})
+    with app.app_context():
+        db.create_all()
+        rows = seed(scale)
+    print(f"синтетична база {path}: " + ', '.join(f'{name} {count}' for name, count in rows.items()))
+    return app
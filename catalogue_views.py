@@ -0,0 +1,214 @@
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+from sqlalchemy import func
+from models import db, Product
+from datetime import datetime, date
+from concurrency_utils import EditConflict, claim_version
+from search_utils import search_products, invalidate_product_search
+from inventory_utils import record_stock_movement, stock_as_of
+from view_utils import requires_operator_or_admin, parse_date
+from etag_utils import etag_cached, REFERENCE_MAX_AGE
+from reference_utils import get_departments, get_product_categories
+
+bp = Blueprint('catalogue', __name__)
+
+@bp.route('/')
+def index():
+    return render_template('index.html')
+
+@bp.route('/products')
+@etag_cached('products', 'product_categories')
+def products():
+    search_query = request.args.get('q', '').strip()
+    if search_query:
+        found_ids = [row['id'] for row in search_products(search_query, limit=100)]
+        found = {p.id: p for p in Product.query.filter(Product.id.in_(found_ids))}
+        products = [found[pid] for pid in found_ids if pid in found]
+    else:
+        products = Product.query.filter_by(is_deleted=False).all()
+    categories = get_product_categories()
+    # одна агрегація замість лінивого завантаження category.products для кожної категорії
+    category_stats = {
+        category_id: (count, total)
+        for category_id, count, total in db.session.query(
+            Product.category_id, func.count(Product.id), func.coalesce(func.sum(Product.price), 0)
+        ).group_by(Product.category_id)
+    }
+    return render_template(
+        'products.html', products=products, categories=categories,
+        category_stats=category_stats, search_query=search_query
+    )
+
+@bp.route('/api/products/search')
+def api_product_search():
+    search_query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 20, type=int) or 20, 1), 100)
+
+    return jsonify({
+        'query': search_query,
+        'results': search_products(search_query, limit=limit)
+    })
+
+@bp.route('/api/categories')
+@etag_cached('product_categories', max_age=REFERENCE_MAX_AGE)
+def api_categories():
+    categories = sorted(get_product_categories(), key=lambda c: c.name)
+    return jsonify([{'id': c.id, 'name': c.name} for c in categories])
+
+@bp.route('/api/departments')
+@etag_cached('departments', max_age=REFERENCE_MAX_AGE)
+def api_departments():
+    departments = sorted(get_departments(), key=lambda d: d.name)
+    return jsonify([{'id': d.id, 'name': d.name} for d in departments])
+
+@bp.route('/products/add', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def add_product():
+    categories = get_product_categories()
+    departments = get_departments()
+
+    if request.method == 'POST':
+        name = request.form.get('name')
+        author = request.form.get('author')
+        isbn = request.form.get('isbn')
+        publisher = request.form.get('publisher')
+        publication_date_raw = request.form.get('publication_date')
+        price_raw = request.form.get('price')
+        stock_quantity_raw = request.form.get('stock_quantity')
+        category_id = request.form.get('category_id')
+        department_id = request.form.get('department_id')
+
+        if not name or not price_raw or not category_id:
+            flash('Назва, ціна та категорія є обовʼязковими полями.', 'danger')
+            return render_template('add_product.html', categories=categories, departments=departments)
+
+        try:
+            price = float(price_raw)
+        except ValueError:
+            flash('Невірний формат ціни.', 'danger')
+            return render_template('add_product.html', categories=categories, departments=departments)
+
+        try:
+            stock_quantity = int(stock_quantity_raw) if stock_quantity_raw else 0
+        except ValueError:
+            flash('Невірний формат кількості.', 'danger')
+            return render_template('add_product.html', categories=categories, departments=departments)
+
+        pub_date = None
+        if publication_date_raw:
+            try:
+                pub_date = datetime.strptime(publication_date_raw, '%Y-%m-%d').date()
+            except ValueError:
+                flash('Невірний формат дати публікації.', 'danger')
+                return render_template('add_product.html', categories=categories, departments=departments)
+
+        product = Product(
+            name=name,
+            author=author,
+            isbn=isbn,
+            publisher=publisher,
+            publication_date=pub_date,
+            price=price,
+            stock_quantity=stock_quantity,
+            category_id=category_id,
+            department_id = department_id
+        )
+        db.session.add(product)
+        db.session.flush()
+        record_stock_movement(product.id, stock_quantity, 'initial', product.id)
+        db.session.commit()
+        invalidate_product_search()
+        flash(f'Товар "{product.name}" додано успішно.', 'success')
+        return redirect(url_for('catalogue.products'))
+
+    return render_template('add_product.html', categories=categories,departments=departments)
+
+@bp.route('/products/edit/<int:product_id>', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def edit_product(product_id):
+    product = Product.query.get_or_404(product_id)
+    categories = get_product_categories()
+    departments = get_departments()
+
+    if request.method == 'POST':
+        try:
+            claim_version(Product, product.id, request.form.get('version', type=int))
+        except EditConflict:
+            db.session.rollback()
+            flash('Товар щойно змінив інший користувач. Перевірте актуальні дані та повторіть редагування.', 'warning')
+            return render_template('edit_product.html', product=product, categories=categories, departments=departments), 409
+
+        product.name = request.form.get('name')
+        product.author = request.form.get('author')
+        product.isbn = request.form.get('isbn')
+        product.publisher = request.form.get('publisher')
+
+        publication_date_raw = request.form.get('publication_date')
+        price_raw = request.form.get('price')
+        stock_quantity_raw = request.form.get('stock_quantity')
+        category_id = request.form.get('category_id')
+        department_id = request.form.get('department_id')
+
+        try:
+            product.price = float(price_raw)
+        except ValueError:
+            flash('Невірний формат ціни.', 'danger')
+            return render_template('edit_product.html', product=product, categories=categories, departments=departments)
+
+        try:
+            old_stock = product.stock_quantity or 0
+            product.stock_quantity = int(stock_quantity_raw) if stock_quantity_raw else 0
+            record_stock_movement(product.id, product.stock_quantity - old_stock, 'manual', product.id)
+        except ValueError:
+            flash('Невірний формат кількості.', 'danger')
+            return render_template('edit_product.html', product=product, categories=categories, departments=departments)
+
+        if publication_date_raw:
+            try:
+                product.publication_date = datetime.strptime(publication_date_raw, '%Y-%m-%d').date()
+            except ValueError:
+                flash('Невірний формат дати публікації.', 'danger')
+                return render_template('edit_product.html', product=product, categories=categories, departments=departments)
+        else:
+            product.publication_date = None
+
+        product.category_id = category_id
+        product.department_id = department_id
+
+        db.session.commit()
+        invalidate_product_search()
+        flash(f'Товар "{product.name}" оновлено успішно.', 'success')
+        return redirect(url_for('catalogue.products'))
+
+    return render_template('edit_product.html', product=product, categories=categories, departments=departments)
+
+@bp.route('/products/delete/<int:product_id>')
+@requires_operator_or_admin
+def delete_product(product_id):
+    product = Product.query.get_or_404(product_id)
+
+    if not product.is_deletable():
+        flash(
+            f'Неможливо видалити товар "{product.name}", бо він використовується в продажах/поставках.',
+            'danger'
+        )
+        return redirect(url_for('catalogue.products'))
+
+    product.is_deleted = True
+    db.session.commit()
+    invalidate_product_search()
+
+    flash(f'Товар "{product.name}" успішно видалено.', 'success')
+    return redirect(url_for('catalogue.products'))
+
+@bp.route('/api/products/<int:product_id>/stock')
+@requires_operator_or_admin
+def api_stock_as_of(product_id):
+    product = Product.query.get_or_404(product_id)
+    target_date = parse_date(request.args.get('date')) or date.today()
+
+    return jsonify({
+        'product_id': product.id,
+        'name': product.name,
+        'date': target_date.strftime('%Y-%m-%d'),
+        'stock_quantity': stock_as_of(product.id, target_date)
+    })
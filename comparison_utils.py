@@ -0,0 +1,133 @@
+import os
+import threading
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from dateutil.relativedelta import relativedelta
+from models import db
+from queries import BookstoreQueries
+
+# кожен потік бере власне з'єднання з пулу, тож значення не має перевищувати розмір пулу
+COMPARE_WORKERS = int(os.getenv('COMPARE_WORKERS', 4))
+MAX_PERIODS = int(os.getenv('COMPARE_MAX_PERIODS', 120))
+
+PERIOD_TYPES = ('week', 'month', 'quarter', 'year')
+METRICS = ('revenue', 'top_sellers')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=COMPARE_WORKERS, thread_name_prefix='compare')
+        return _executor
+
+def _period_start(value, period_type):
+    if period_type == 'week':
+        return value - timedelta(days=value.weekday())
+    if period_type == 'month':
+        return value.replace(day=1)
+    if period_type == 'quarter':
+        return date(value.year, (value.month - 1) // 3 * 3 + 1, 1)
+    return date(value.year, 1, 1)
+
+def _period_label(start, period_type):
+    if period_type == 'week':
+        return start.strftime('%Y-%m-%d')
+    if period_type == 'month':
+        return start.strftime('%Y-%m')
+    if period_type == 'quarter':
+        return f'{start.year}-Q{(start.month - 1) // 3 + 1}'
+    return str(start.year)
+
+def split_periods(start_date, end_date, period_type):
+    """Календарні періоди, що покривають [start_date, end_date]; крайні обрізаються за межами діапазону."""
+    step = {
+        'week': relativedelta(weeks=1),
+        'month': relativedelta(months=1),
+        'quarter': relativedelta(months=3),
+        'year': relativedelta(years=1)
+    }[period_type]
+
+    periods = []
+    start = _period_start(start_date, period_type)
+    while start <= end_date:
+        end = start + step - timedelta(days=1)
+        periods.append((_period_label(start, period_type), max(start, start_date), min(end, end_date)))
+        start += step
+    return periods
+
+def _revenue(start, end, category_name=None, **_):
+    revenue = BookstoreQueries.query_2_revenue_analysis(
+        start_date=start, end_date=end, category_name=category_name
+    )
+    return {'revenue': revenue}
+
+def _top_sellers(start, end, min_amount=0, top=None, **_):
+    sellers = BookstoreQueries.query_5_top_sellers(
+        min_amount=min_amount, start_date=start, end_date=end
+    )
+    sellers = sorted(sellers, key=lambda row: row.total_sales, reverse=True)
+    return {
+        'sellers': [
+            {
+                'employee_id': emp.id,
+                'full_name': emp.full_name,
+                'department': emp.department.name,
+                'total_sales': total_sales,
+                'sales_count': sales_count
+            }
+            for emp, total_sales, sales_count in (sellers[:top] if top else sellers)
+        ]
+    }
+
+_EVALUATORS = {'revenue': _revenue, 'top_sellers': _top_sellers}
+
+def _evaluate(app, metric, label, start, end, options):
+    # окремий потік — окремий контекст і сесія, а отже окреме з'єднання з пулу
+    with app.app_context():
+        try:
+            result = _EVALUATORS[metric](start, end, **options)
+        finally:
+            db.session.remove()
+    return dict(result, period=label, start_date=start, end_date=end)
+
+def compare_periods(app, metric, periods, **options):
+    """Обчислює метрику для кожного періоду паралельно; повертає (результати в порядку періодів, загальний підсумок).
+
+    Для top_sellers загальний рейтинг рахується окремим запитом за весь діапазон, паралельно з періодами:
+    сума обрізаних до top списків періодів занижувала б підсумки й губила продавців.
+    """
+    executor = _get_executor()
+    futures = [
+        executor.submit(_evaluate, app, metric, label, start, end, options)
+        for label, start, end in periods
+    ]
+    overall = None
+    if metric == 'top_sellers' and periods:
+        overall = executor.submit(
+            _evaluate, app, metric, 'overall', periods[0][1], periods[-1][2], dict(options, top=None)
+        )
+    return [future.result() for future in futures], overall.result() if overall else None
+
+def summarize(metric, results, overall=None):
+    if metric == 'revenue':
+        previous = None
+        for item in results:
+            revenue = item['revenue']
+            item['change_pct'] = (
+                round(float((revenue - previous) / previous * 100), 2) if previous else None
+            )
+            previous = revenue
+        return {'total_revenue': sum(item['revenue'] for item in results)}
+
+    periods_in_top = {}
+    for item in results:
+        for seller in item['sellers']:
+            periods_in_top[seller['employee_id']] = periods_in_top.get(seller['employee_id'], 0) + 1
+
+    return {'overall': [
+        dict(seller, periods_in_top=periods_in_top.get(seller['employee_id'], 0))
+        for seller in (overall['sellers'] if overall else [])
+    ]}
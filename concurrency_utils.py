@@ -0,0 +1,63 @@
+import os
+import threading
+from models import Product
+from inventory_utils import record_stock_movement
+
+REPORTS_PER_USER = int(os.getenv('REPORTS_PER_USER', 2))
+
+_user_slots = {}
+_user_slots_lock = threading.Lock()
+
+class EditConflict(Exception):
+    pass
+
+def claim_version(model, obj_id, expected_version):
+    """Compare-and-swap: збільшує version, лише якщо запис не змінювали після відкриття форми."""
+    if expected_version is None:
+        raise EditConflict()
+
+    updated = model.query.filter(
+        model.id == obj_id,
+        model.version == expected_version
+    ).update({model.version: model.version + 1}, synchronize_session=False)
+
+    if not updated:
+        raise EditConflict()
+
+    return expected_version + 1
+
+def adjust_stock(product_id, delta, allow_negative=False, reason='manual', reference_id=None):
+    """Атомарно змінює залишок товару на delta і пише рух у журнал; False, якщо залишок став би від'ємним."""
+    query = Product.query.filter(Product.id == product_id)
+    if not allow_negative:
+        query = query.filter(Product.stock_quantity + delta >= 0)
+
+    updated = query.update({
+        Product.stock_quantity: Product.stock_quantity + delta,
+        Product.version: Product.version + 1
+    }, synchronize_session=False)
+
+    if updated:
+        record_stock_movement(product_id, delta, reason, reference_id)
+
+    return bool(updated)
+
+def try_acquire_report_slot(user_id):
+    """Неблокуюче захоплення одного з REPORTS_PER_USER слотів користувача; повертає функцію звільнення або None."""
+    with _user_slots_lock:
+        slot = _user_slots.get(user_id)
+        if slot is None:
+            slot = _user_slots[user_id] = threading.BoundedSemaphore(REPORTS_PER_USER)
+
+    if not slot.acquire(blocking=False):
+        return None
+
+    released = threading.Event()
+
+    def release():
+        # close() відповіді може викликатися повторно
+        if not released.is_set():
+            released.set()
+            slot.release()
+
+    return release
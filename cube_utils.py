@@ -0,0 +1,274 @@
+import os
+import time
+import logging
+import threading
+from array import array
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import func
+from models import db, Employee, Product, Sale, SaleItem
+from queries import EMPLOYEE_FULL_NAME
+from reference_utils import get_departments, get_product_categories
+from scheduler import register_periodic_job
+
+logger = logging.getLogger(__name__)
+
+# повне перезавантаження підхоплює рідкісні зміни довідників (категорія товару тощо)
+CUBE_RELOAD_INTERVAL = float(os.getenv('SALES_CUBE_RELOAD_INTERVAL', 3600))
+LOAD_BATCH_SIZE = 5000
+# дрібні пакети від дописування зливаються в один, щоб агрегація не дробилася на сотні шматків
+MAX_BATCHES = 64
+
+DIMENSIONS = ('day', 'month', 'department', 'category', 'employee')
+
+EPOCH = date(1970, 1, 1)
+
+# стовпці куба: коди вимірів і міри; 4 + 4 + 4 + 4 + 8 + 4 = 28 байт на рядок чека
+_COLUMNS = (
+    ('day', 'i'),          # дні від 1970-01-01 (date32)
+    ('department', 'i'),   # products.department_id
+    ('category', 'i'),     # products.category_id
+    ('employee', 'i'),     # sales.employee_id
+    ('revenue', 'd'),      # sale_items.total_price
+    ('quantity', 'i')      # sale_items.quantity
+)
+
+def _schema():
+    import pyarrow as pa
+
+    types = {'i': pa.int32(), 'd': pa.float64()}
+    return pa.schema([(name, pa.date32() if name == 'day' else types[code]) for name, code in _COLUMNS])
+
+class SalesCube:
+    """Незмінні пакети Arrow; дописування додає пакет, тож зріз, що вже читає таблицю, не зачіпається."""
+
+    def __init__(self):
+        self.batches = []
+        self.rows = 0
+        self.last_item_id = 0
+        self.loaded_at = None
+        self._table = None
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, rows, batch_size=LOAD_BATCH_SIZE):
+        import pyarrow as pa
+
+        schema = _schema()
+        buffers = None
+        for row in rows:
+            if buffers is None:
+                buffers = {name: array(code) for name, code in _COLUMNS}
+            buffers['day'].append((row.sale_date - EPOCH).days)
+            buffers['department'].append(row.department_id)
+            buffers['category'].append(row.category_id)
+            buffers['employee'].append(row.employee_id)
+            buffers['revenue'].append(float(row.total_price))
+            buffers['quantity'].append(row.quantity)
+            self.last_item_id = max(self.last_item_id, row.id)
+            if len(buffers['day']) >= batch_size:
+                self._add_batch(pa, schema, buffers)
+                buffers = None
+        if buffers is not None:
+            self._add_batch(pa, schema, buffers)
+
+    def _add_batch(self, pa, schema, buffers):
+        # масиви array вже не змінюються, тож Arrow використовує їхні буфери без копіювання
+        length = len(buffers['day'])
+        self.batches.append(pa.record_batch([
+            pa.Array.from_buffers(field.type, length, [None, pa.py_buffer(buffers[field.name])])
+            for field in schema
+        ], schema=schema))
+        self.rows += length
+        if len(self.batches) > MAX_BATCHES:
+            self.batches = pa.Table.from_batches(self.batches, schema=schema).combine_chunks().to_batches()
+        self._table = None
+
+    def table(self):
+        import pyarrow as pa
+
+        if self._table is None:
+            self._table = pa.Table.from_batches(self.batches, schema=_schema())
+        return self._table
+
+    def memory_bytes(self):
+        return sum(batch.nbytes for batch in self.batches)
+
+_cube = None
+_loaded_monotonic = 0.0
+# змін (редагувань і видалень продажів) зроблено / враховано в поточному кубі
+_changes = 0
+_loaded_changes = 0
+_rebuilding = False
+_lock = threading.Lock()
+
+def _item_rows(after_id=0):
+    return db.session.query(
+        SaleItem.id,
+        SaleItem.quantity,
+        SaleItem.total_price,
+        Sale.sale_date,
+        Sale.employee_id,
+        Product.department_id,
+        Product.category_id
+    ).join(Sale, Sale.id == SaleItem.sale_id).join(
+        Product, Product.id == SaleItem.product_id
+    ).filter(SaleItem.id > after_id)
+
+def _load():
+    cube = SalesCube()
+    rows = _item_rows().order_by(Sale.sale_date, SaleItem.id)
+    cube.append(rows.yield_per(LOAD_BATCH_SIZE))
+    cube.loaded_at = time.time()
+    return cube
+
+def _reload():
+    global _cube, _loaded_monotonic, _loaded_changes
+    with _lock:
+        changes = _changes
+    cube = _load()
+    with _lock:
+        _cube, _loaded_monotonic, _loaded_changes = cube, time.monotonic(), changes
+    logger.info("Куб продажів завантажено: %s рядків, %s байт", len(cube), cube.memory_bytes())
+    return cube
+
+def append_new_sales():
+    """Дописує до куба позиції, створені після останнього завантаження (у тому числі іншими воркерами)."""
+    with _lock:
+        cube = _cube
+    if cube is None:
+        return
+    rows = _item_rows(cube.last_item_id).order_by(SaleItem.id).all()
+    with _lock:
+        # паралельний виклик міг уже дописати частину цих позицій
+        cube.append([row for row in rows if row.id > cube.last_item_id])
+
+def _rebuild(app):
+    global _rebuilding
+    try:
+        with app.app_context():
+            try:
+                # зміна під час завантаження запускає ще один прохід
+                while _changes != _loaded_changes:
+                    _reload()
+            finally:
+                db.session.remove()
+    except Exception:
+        logger.exception("Не вдалося перезавантажити куб продажів")
+    finally:
+        with _lock:
+            _rebuilding = False
+
+def invalidate_sales_cube():
+    """Редагування чи видалення продажу: куб перебудовується у фоні, а запити тим часом бачать попередній."""
+    global _changes, _rebuilding
+    with _lock:
+        _changes += 1
+        if _cube is None or _rebuilding:
+            return
+        _rebuilding = True
+    threading.Thread(
+        target=_rebuild, args=(current_app._get_current_object(),), name='sales-cube', daemon=True
+    ).start()
+
+@register_periodic_job
+def refresh_sales_cube():
+    with _lock:
+        cube = _cube
+        expired = (
+            cube is None or _changes != _loaded_changes
+            or time.monotonic() - _loaded_monotonic > CUBE_RELOAD_INTERVAL
+        )
+
+    if not expired:
+        # позиції з id не більшим за останній можуть лише зникнути (редагування, видалення продажу)
+        known = db.session.query(func.count(SaleItem.id)).filter(SaleItem.id <= cube.last_item_id).scalar()
+        expired = known != len(cube)
+
+    if expired:
+        _reload()
+    else:
+        append_new_sales()
+
+def get_sales_cube():
+    with _lock:
+        cube = _cube
+    # синхронно куб завантажується лише вперше; застарілий замінить фонове перезавантаження
+    if cube is None:
+        cube = _reload()
+    return cube
+
+def _labels(dimension, codes):
+    if dimension == 'day':
+        return {code: (EPOCH + timedelta(days=code)).isoformat() for code in codes}
+    if dimension == 'month':
+        return {code: f'{code // 12:04d}-{code % 12 + 1:02d}' for code in codes}
+    if dimension == 'department':
+        return {item.id: item.name for item in get_departments()}
+    if dimension == 'category':
+        return {item.id: item.name for item in get_product_categories()}
+    return dict(db.session.query(Employee.id, EMPLOYEE_FULL_NAME).filter(Employee.id.in_(list(codes))))
+
+def slice_sales(group_by=(), start_date=None, end_date=None, departments=None, categories=None, employees=None):
+    """Групує куб за вимірами group_by з фільтрами; повертає (групи, підсумок, кількість рядків у діапазоні дат).
+
+    Фільтри й групування виконуються обчислювальними ядрами pyarrow над стовпцями, без циклу Python по рядках.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    cube = get_sales_cube()
+    with _lock:
+        table = cube.table()
+
+    if start_date:
+        table = table.filter(pc.greater_equal(table['day'], pa.scalar(start_date, pa.date32())))
+    if end_date:
+        table = table.filter(pc.less_equal(table['day'], pa.scalar(end_date, pa.date32())))
+    scanned = table.num_rows
+
+    for name, values in (('department', departments), ('category', categories), ('employee', employees)):
+        if values:
+            table = table.filter(pc.is_in(table[name], value_set=pa.array(list(values), pa.int32())))
+
+    keys = []
+    for dimension in group_by:
+        if dimension == 'day':
+            column = table['day'].cast(pa.int32())
+        elif dimension == 'month':
+            column = pc.add(pc.multiply(pc.year(table['day']), 12), pc.subtract(pc.month(table['day']), 1))
+        else:
+            column = table[dimension]
+        keys.append('key_' + dimension)
+        table = table.append_column('key_' + dimension, column)
+
+    aggregated = table.group_by(keys).aggregate([
+        ('revenue', 'sum'), ('quantity', 'sum'), ('revenue', 'count')
+    ]).to_pydict() if table.num_rows else {}
+
+    codes = [aggregated.get(key, []) for key in keys]
+    labels = [_labels(dimension, set(codes[index])) for index, dimension in enumerate(group_by)]
+    result = []
+    for position in range(len(aggregated.get('revenue_sum', []))):
+        item = {}
+        for index, dimension in enumerate(group_by):
+            code = codes[index][position]
+            item[dimension] = (
+                {'id': code, 'name': labels[index].get(code)} if dimension not in ('day', 'month')
+                else labels[index][code]
+            )
+        item.update(
+            revenue=round(aggregated['revenue_sum'][position], 2),
+            quantity=aggregated['quantity_sum'][position],
+            lines=aggregated['revenue_count'][position]
+        )
+        result.append(item)
+    result.sort(key=lambda item: item['revenue'], reverse=True)
+
+    totals = {
+        'revenue': round(sum(item['revenue'] for item in result), 2),
+        'quantity': sum(item['quantity'] for item in result),
+        'lines': sum(item['lines'] for item in result)
+    }
+    return result, totals, scanned
@@ -0,0 +1,100 @@
+import os
+import logging
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, NullPool
+
+logger = logging.getLogger(__name__)
+
+def _env_flag(name, default):
+    return os.getenv(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+POOL_RECYCLE = int(os.getenv('POOL_RECYCLE', 300))
+POOL_USE_LIFO = _env_flag('DB_POOL_USE_LIFO', 'false')
+# false: без перевірочного запиту при кожному checkout; розірване з'єднання
+# виявляється за помилкою, пул інвалідується, а запит отримує 503
+POOL_PRE_PING = _env_flag('DB_POOL_PRE_PING', 'true')
+# PgBouncer у режимі transaction pooling: з'єднання сервера не закріплене за клієнтом,
+# тому не можна покладатися на PREPARE між транзакціями; NullPool віддає пулінг PgBouncer
+PGBOUNCER_MODE = _env_flag('DB_PGBOUNCER', 'false')
+PGBOUNCER_NULL_POOL = _env_flag('DB_PGBOUNCER_NULL_POOL', 'false')
+
+_stats = {
+    'connects': 0,
+    'checkouts': 0,
+    'checkins': 0,
+    'invalidations': 0,
+    'disconnect_errors': 0
+}
+_stats_lock = threading.Lock()
+
+def engine_options(database_url):
+    options = {
+        'pool_pre_ping': POOL_PRE_PING,
+        'pool_recycle': POOL_RECYCLE
+    }
+
+    if PGBOUNCER_MODE and PGBOUNCER_NULL_POOL:
+        options['poolclass'] = NullPool
+        return options
+
+    # для SQLite SQLAlchemy обирає NullPool/SingletonThreadPool, які не приймають розмірів пулу
+    if database_url and not database_url.startswith('sqlite'):
+        options.update({
+            'pool_size': POOL_SIZE,
+            'max_overflow': MAX_OVERFLOW,
+            'pool_timeout': POOL_TIMEOUT,
+            'pool_use_lifo': POOL_USE_LIFO
+        })
+
+    return options
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+@event.listens_for(Pool, 'connect')
+def _on_connect(dbapi_connection, connection_record):
+    _count('connects')
+
+@event.listens_for(Pool, 'checkout')
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    _count('checkouts')
+
+@event.listens_for(Pool, 'checkin')
+def _on_checkin(dbapi_connection, connection_record):
+    _count('checkins')
+
+@event.listens_for(Pool, 'invalidate')
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    _count('invalidations')
+
+@event.listens_for(Engine, 'handle_error')
+def _on_error(context):
+    if context.is_disconnect:
+        _count('disconnect_errors')
+        logger.warning("Втрачено з'єднання з БД, пул буде перевідкрито: %s", context.original_exception)
+
+def pool_stats(engine):
+    pool = engine.pool
+    with _stats_lock:
+        stats = dict(_stats)
+
+    stats.update({
+        'pool_class': type(pool).__name__,
+        'status': pool.status(),
+        'pre_ping': POOL_PRE_PING,
+        'pgbouncer_mode': PGBOUNCER_MODE
+    })
+
+    # лічильники розміру є лише в QueuePool
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+
+    return stats
@@ -0,0 +1,403 @@
+from decimal import Decimal
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+from models import db, Supplier, Contract, Product, Delivery, DeliveryItem, ContractProduct
+from queries import BookstoreQueries
+from datetime import datetime, date
+from flask_login import current_user
+from scorecard_utils import refresh_supplier_scorecards, get_supplier_scorecards
+from concurrency_utils import EditConflict, claim_version, adjust_stock
+from view_utils import requires_operator_or_admin, requires_authorized_or_above
+from etag_utils import etag_cached
+from fragment_utils import cached_fragment
+
+bp = Blueprint('deliveries', __name__)
+
+@bp.route('/suppliers')
+@requires_authorized_or_above
+def suppliers():
+    today = date.today()
+    can_edit = current_user.role in ('administrator', 'operator')
+    # лічильники активних договорів залежать від дати, тому дата входить у ключ фрагмента
+    supplier_rows = cached_fragment(
+        'supplier_rows', ('suppliers', 'contracts', 'supplier_scorecards'),
+        lambda: render_template('fragments/supplier_rows.html', suppliers=supplier_view_models(), can_edit=can_edit),
+        today, can_edit
+    )
+    contract_rows = cached_fragment(
+        'contract_rows', ('suppliers', 'contracts'),
+        lambda: render_template('fragments/contract_rows.html', contracts=contract_view_models(today)),
+        today
+    )
+    return render_template('suppliers.html', supplier_rows=supplier_rows, contract_rows=contract_rows)
+
+def supplier_view_models():
+    scorecards = get_supplier_scorecards()
+    rows = []
+    for supplier in Supplier.query.filter_by(is_deleted=False).order_by(Supplier.id):
+        scorecard = scorecards.get(supplier.id)
+        rows.append({
+            'id': supplier.id,
+            'name': supplier.name,
+            'contact_person': supplier.contact_person,
+            'phone': supplier.phone,
+            'email': supplier.email,
+            'address': supplier.address,
+            'contracts_count': scorecard.contracts_count if scorecard else 0,
+            'active_contracts': scorecard.active_contracts if scorecard else 0,
+            'total_delivered_value': scorecard.total_delivered_value if scorecard else 0
+        })
+    return rows
+
+def contract_view_models(today):
+    contracts = db.session.query(
+        Contract.contract_number,
+        Contract.start_date,
+        Contract.end_date,
+        Supplier.name.label('supplier_name')
+    ).join(Supplier, Supplier.id == Contract.supplier_id).filter(
+        Supplier.is_deleted == False,
+        Contract.is_deleted == False
+    ).order_by(Supplier.id, Contract.id)
+
+    rows = []
+    for contract in contracts:
+        if contract.end_date < today:
+            status = 'expired'
+        elif contract.start_date <= today:
+            status = 'active'
+        else:
+            status = 'future'
+        rows.append(dict(contract._asdict(), status=status))
+    return rows
+
+@bp.route('/suppliers/add', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def add_supplier():
+    if request.method == 'POST':
+        name = request.form.get('name')
+        contact_person = request.form.get('contact_person')
+        phone = request.form.get('phone')
+        email = request.form.get('email')
+        address = request.form.get('address')
+
+        if name:
+            supplier = Supplier(
+                name=name,
+                contact_person=contact_person,
+                phone=phone,
+                email=email,
+                address=address
+            )
+            db.session.add(supplier)
+            db.session.commit()
+            flash(f'Постачальника {supplier.name} додано успішно.', 'success')
+            return redirect(url_for('deliveries.suppliers'))
+
+    return render_template('add_supplier.html')
+
+@bp.route('/suppliers/edit/<int:supplier_id>', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def edit_supplier(supplier_id):
+    """Редагувати постачальника"""
+    supplier = Supplier.query.get_or_404(supplier_id)
+
+    if request.method == 'POST':
+        supplier.name = request.form.get('name')
+        supplier.contact_person = request.form.get('contact_person')
+        supplier.phone = request.form.get('phone')
+        supplier.email = request.form.get('email')
+        supplier.address = request.form.get('address')
+
+        db.session.commit()
+        flash(f'Постачальника {supplier.name} оновлено успішно.', 'success')
+        return redirect(url_for('deliveries.suppliers'))
+
+    return render_template('edit_supplier.html', supplier=supplier, today=date.today())
+
+@bp.route('/suppliers/delete/<int:supplier_id>')
+@requires_operator_or_admin
+def delete_supplier(supplier_id):
+    supplier = Supplier.query.get_or_404(supplier_id)
+
+    if not supplier.is_deletable():
+        flash("Неможливо видалити: є активні договори.", "danger")
+        return redirect(url_for('deliveries.suppliers'))
+
+    supplier.is_deleted = True
+    db.session.commit()
+
+    flash(f"Постачальника {supplier.name} успішно видалено.", "success")
+    return redirect(url_for('deliveries.suppliers'))
+
+@bp.route('/suppliers/<int:supplier_id>/contracts/add', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def add_contract(supplier_id):
+    supplier = Supplier.query.get_or_404(supplier_id)
+
+    if request.method == 'POST':
+        contract = Contract(
+            contract_number=request.form['contract_number'],
+            supplier_id=supplier_id,
+            start_date=datetime.strptime(request.form['start_date'], '%Y-%m-%d').date(),
+            end_date=datetime.strptime(request.form['end_date'], '%Y-%m-%d').date(),
+            is_deleted=False
+        )
+        contract.refresh_active_flag()
+        db.session.add(contract)
+        refresh_supplier_scorecards([supplier_id])
+        db.session.commit()
+        flash("Договір додано.", "success")
+        return redirect(url_for('deliveries.edit_supplier', supplier_id=supplier_id))
+
+    return render_template('add_contract.html', supplier=supplier)
+
+@bp.route('/contracts/edit/<int:contract_id>', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def edit_contract(contract_id):
+    contract = Contract.query.get_or_404(contract_id)
+    supplier = contract.supplier
+
+    expired = contract.end_date < date.today()
+    if request.method == 'POST' and 'contract_number' in request.form:
+        contract.contract_number = request.form['contract_number']
+        contract.start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d').date()
+        contract.end_date = datetime.strptime(request.form['end_date'], '%Y-%m-%d').date()
+        contract.refresh_active_flag()
+        refresh_supplier_scorecards([contract.supplier_id])
+        db.session.commit()
+
+        flash("Договір оновлено.", "success")
+        return redirect(url_for('deliveries.edit_contract', contract_id=contract.id))
+
+    products = Product.query.all()
+    return render_template('edit_contract.html', supplier=supplier, contract=contract, products=products, today=date.today(), expired=expired)
+
+@bp.route('/contracts/delete/<int:contract_id>')
+@requires_operator_or_admin
+def delete_contract(contract_id):
+    contract = Contract.query.get_or_404(contract_id)
+
+    if contract.end_date >= date.today():
+        flash("Видаляти можна лише завершені договори!", "danger")
+        return redirect(url_for('deliveries.edit_supplier', supplier_id=contract.supplier_id))
+
+    contract.is_deleted = True
+    contract.refresh_active_flag()
+    refresh_supplier_scorecards([contract.supplier_id])
+    db.session.commit()
+
+    flash("Договір видалено.", "success")
+    return redirect(url_for('deliveries.edit_supplier', supplier_id=contract.supplier_id))
+
+@bp.route('/contracts/<int:contract_id>/product/add', methods=['POST'])
+@requires_operator_or_admin
+def add_contract_product(contract_id):
+    product_id = int(request.form['product_id'])
+    quantity_per_delivery = int(request.form['quantity_per_delivery'])
+    purchase_price = Decimal(request.form['purchase_price'])
+
+    new_cp = ContractProduct(
+        contract_id=contract_id,
+        product_id=product_id,
+        quantity_per_delivery=quantity_per_delivery,
+        purchase_price=purchase_price
+    )
+
+    db.session.add(new_cp)
+    db.session.commit()
+
+    flash("Товар додано до договору.", "success")
+    return redirect(url_for('deliveries.edit_contract', contract_id=contract_id))
+
+@bp.route('/contract_product/delete/<int:cp_id>')
+def delete_contract_product(cp_id):
+    cp = ContractProduct.query.get_or_404(cp_id)
+    contract_id = cp.contract_id
+
+    db.session.delete(cp)
+    db.session.commit()
+
+    flash("Товар видалено з договору.", "success")
+    return redirect(url_for('deliveries.edit_contract', contract_id=contract_id))
+
+@bp.route('/deliveries')
+@etag_cached('deliveries', 'delivery_items', 'contracts', 'suppliers', 'products')
+def deliveries():
+    deliveries = Delivery.query.order_by(Delivery.delivery_date.desc()).all()
+    return render_template("deliveries.html", deliveries=deliveries)
+
+@bp.route('/deliveries/add', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def add_delivery():
+    contracts = Contract.query.filter(Contract.is_active == True).all()
+
+    selected_contract_id = request.args.get("contract_id", type=int)
+    contract_products = []
+
+    if selected_contract_id:
+        contract = Contract.query.get(selected_contract_id)
+        if contract:
+            contract_products = ContractProduct.query.filter_by(contract_id=selected_contract_id).all()
+
+    if request.method == 'GET':
+        return render_template(
+            "add_delivery.html",
+            contracts=contracts,
+            contract_products=contract_products,
+            selected_contract_id=selected_contract_id
+        )
+
+    contract_id = request.form.get('contract_id', type=int)
+
+    if not contract_id:
+        flash("Оберіть договір.", "danger")
+        return redirect(url_for('deliveries.add_delivery'))
+
+    delivery = Delivery(
+        contract_id=contract_id,
+        delivery_date=date.today(),
+        total_amount=0
+    )
+    db.session.add(delivery)
+    db.session.flush()
+
+    product_ids = request.form.getlist('product_id')
+    quantities = request.form.getlist('quantity')
+
+    total_amount = 0
+    items_added = 0
+
+    for pid, qty_raw in zip(product_ids, quantities):
+
+        if not qty_raw or int(qty_raw) <= 0:
+            continue
+
+        product = Product.query.get(int(pid))
+        qty = int(qty_raw)
+
+        unit_price = product.price
+        total_price = unit_price * qty
+
+        db.session.add(DeliveryItem(
+            delivery_id=delivery.id,
+            product_id=product.id,
+            quantity=qty,
+            unit_price=unit_price,
+            total_price=total_price
+        ))
+
+        adjust_stock(product.id, qty, reason='delivery', reference_id=delivery.id)
+        total_amount += total_price
+        items_added += 1
+
+    if items_added == 0:
+        db.session.rollback()
+        flash("Поставка повинна містити хоча б один товар.", "danger")
+        return redirect(url_for('deliveries.add_delivery', contract_id=contract_id))
+
+    delivery.total_amount = total_amount
+    refresh_supplier_scorecards([delivery.contract.supplier_id])
+    db.session.commit()
+
+    flash("Поставка створена успішно.", "success")
+    return redirect(url_for('deliveries.deliveries'))
+
+@bp.route('/deliveries/edit/<int:delivery_id>', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def edit_delivery(delivery_id):
+    delivery = Delivery.query.get_or_404(delivery_id)
+
+    old_items = {item.product_id: item.quantity for item in delivery.delivery_items}
+
+    if request.method == 'POST':
+        new_items = {}
+
+        for key in request.form:
+            if key.startswith('quantity_'):
+                product_id = int(key.split('_')[1])
+                qty = int(request.form[key])
+                if qty > 0:
+                    new_items[product_id] = qty
+
+        try:
+            claim_version(Delivery, delivery.id, request.form.get('version', type=int))
+        except EditConflict:
+            db.session.rollback()
+            flash("Поставку щойно змінив інший користувач. Перевірте актуальні дані та повторіть редагування.", "warning")
+            return render_template("edit_delivery.html", delivery=delivery), 409
+
+        for pid in sorted(set(old_items) | set(new_items)):
+            delta = new_items.get(pid, 0) - old_items.get(pid, 0)
+            if delta:
+                adjust_stock(pid, delta, allow_negative=True, reason='delivery_edit', reference_id=delivery.id)
+
+        DeliveryItem.query.filter_by(delivery_id=delivery.id).delete()
+
+        total_amount = 0
+        for pid, qty in new_items.items():
+            product = Product.query.get(pid)
+
+            cp = ContractProduct.query.filter_by(
+                contract_id=delivery.contract_id,
+                product_id=pid
+            ).first()
+
+            unit_price = cp.purchase_price if cp else product.price
+
+            db.session.add(DeliveryItem(
+                delivery_id=delivery.id,
+                product_id=pid,
+                quantity=qty,
+                unit_price=unit_price,
+                total_price=unit_price * qty
+            ))
+            total_amount += unit_price * qty
+
+        delivery.total_amount = total_amount
+        refresh_supplier_scorecards([delivery.contract.supplier_id])
+        db.session.commit()
+        flash("Поставка оновлена!", "success")
+        return redirect(url_for("deliveries.deliveries"))
+
+    return render_template("edit_delivery.html", delivery=delivery)
+
+@bp.route('/deliveries/delete/<int:delivery_id>')
+@requires_operator_or_admin
+def delete_delivery(delivery_id):
+    delivery = Delivery.query.get_or_404(delivery_id)
+
+    for item in delivery.delivery_items:
+        adjust_stock(item.product_id, -item.quantity, allow_negative=True,
+                     reason='delivery_delete', reference_id=delivery.id)
+
+    supplier_id = delivery.contract.supplier_id
+
+    DeliveryItem.query.filter_by(delivery_id=delivery.id).delete()
+    db.session.delete(delivery)
+    refresh_supplier_scorecards([supplier_id])
+    db.session.commit()
+
+    flash("Поставка видалена.", "success")
+    return redirect(url_for('deliveries.deliveries'))
+
+@bp.route('/api/contracts/expiring')
+@requires_authorized_or_above
+def api_expiring_contracts():
+    days = request.args.get('days', 30, type=int)
+    if days is None or days < 0:
+        return jsonify({'error': 'Кількість днів має бути невід\'ємним числом'}), 400
+
+    contracts = BookstoreQueries.contracts_expiring_within(days=days)
+
+    result = []
+    for contract, supplier in contracts:
+        result.append({
+            'id': contract.id,
+            'contract_number': contract.contract_number,
+            'supplier': supplier.name,
+            'start_date': contract.start_date.strftime('%Y-%m-%d'),
+            'end_date': contract.end_date.strftime('%Y-%m-%d'),
+            'days_left': (contract.end_date - date.today()).days
+        })
+
+    return jsonify({'days': days, 'contracts': result})
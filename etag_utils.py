@@ -0,0 +1,190 @@
+import os
+import zlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from flask import request, session, make_response, current_app, g, has_request_context
+from flask_login import current_user
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from models import db, TableVersion
+from history_utils import add_history_entry, register_entry_listener
+
+logger = logging.getLogger(__name__)
+
+# змінюється при розгортанні, щоб нові шаблони не віддавалися як 304 зі старими ETag
+BUILD_ID = os.getenv('APP_BUILD_ID', '')
+REFERENCE_MAX_AGE = int(os.getenv('REFERENCE_MAX_AGE', 300))
+HISTORY_REPLAY_SIZE = int(os.getenv('ETAG_HISTORY_REPLAY_SIZE', 1000))
+
+_versions = TableVersion.__table__
+_CHANGED_KEY = 'changed_tables'
+_change_listeners = []
+_history_entries = OrderedDict()  # ETag -> запис історії, зроблений під час повної відповіді
+_history_lock = threading.Lock()
+
+# --- лічильники змін ---
+
+def _mark_changed(session, table_name):
+    if table_name != _versions.name:
+        session.info.setdefault(_CHANGED_KEY, set()).add(table_name)
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed(session, flush_context):
+    for obj in session.new | session.deleted:
+        _mark_changed(session, obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            _mark_changed(session, obj.__table__.name)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk(orm_execute_state):
+    # Query.update()/delete() та INSERT ... SELECT оминають flush; таблицю позначаємо
+    # вже після виконання, коли відомо, чи змінено хоча б один рядок
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.update_execution_options(changed_tables_session=orm_execute_state.session)
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _collect_executed(conn, cursor, statement, parameters, context, executemany):
+    session = context.execution_options.get('changed_tables_session')
+    table = getattr(context.compiled and context.compiled.statement, 'table', None)
+    # періодичні UPDATE планувальника часто нічого не змінюють — такі не скидають кеш
+    if session is not None and table is not None and cursor.rowcount:
+        _mark_changed(session, table.name)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed(session):
+    session.info.pop(_CHANGED_KEY, None)
+
+@event.listens_for(Session, 'after_commit')
+def _bump_after_commit(session):
+    names = session.info.pop(_CHANGED_KEY, None)
+    if names:
+        try:
+            bump_versions(names)
+        except Exception:
+            logger.exception("Не вдалося оновити лічильники змін %s", sorted(names))
+        for listener in _change_listeners:
+            listener(names)
+
+def register_change_listener(func):
+    """func(names) викликається в процесі, що закомітив зміни, одразу після оновлення лічильників."""
+    if func not in _change_listeners:
+        _change_listeners.append(func)
+    return func
+
+def bump_versions(names):
+    """Збільшує лічильники окремою короткою транзакцією вже після коміту змін.
+
+    Версія читається до даних, тож відповідь, зібрана між комітом і оновленням лічильника,
+    отримає старий ETag і буде перезапитана, але застарілі дані ніколи не отримають новий.
+    """
+    names = sorted(names)
+    for attempt in range(2):
+        try:
+            with db.engine.begin() as conn:
+                updated = conn.execute(
+                    _versions.update()
+                    .where(_versions.c.name.in_(names))
+                    .values(version=_versions.c.version + 1)
+                ).rowcount
+                if updated < len(names):
+                    existing = set(conn.execute(
+                        select(_versions.c.name).where(_versions.c.name.in_(names))
+                    ).scalars())
+                    conn.execute(_versions.insert(), [
+                        {'name': name, 'version': 1} for name in names if name not in existing
+                    ])
+            return
+        except IntegrityError:
+            # інший воркер щойно створив рядок лічильника — повторюємо як звичайний UPDATE
+            if attempt:
+                raise
+
+def get_versions(names):
+    """Поточні лічильники одним запитом за первинним ключем; відсутній рядок — версія 0."""
+    rows = db.session.execute(
+        select(_versions.c.name, _versions.c.version).where(_versions.c.name.in_(list(names)))
+    )
+    versions = dict.fromkeys(names, 0)
+    versions.update(rows.all())
+    return versions
+
+# --- історія запитів для відповідей 304 ---
+
+@register_entry_listener
+def _remember_history_entry(user_id, entry):
+    key = g.get('etag_history_key') if has_request_context() else None
+    if key:
+        with _history_lock:
+            _history_entries[key] = (entry['api'], entry['params'], entry['result'])
+            _history_entries.move_to_end(key)
+            while len(_history_entries) > HISTORY_REPLAY_SIZE:
+                _history_entries.popitem(last=False)
+
+def _record_revalidated(etag, name):
+    """304 теж потрапляє в історію: повторюємо запис повної відповіді з тим самим ETag або пишемо загальний."""
+    with _history_lock:
+        remembered = _history_entries.get(etag)
+    if remembered:
+        api_name, params, result_text = remembered
+    else:
+        # повну відповідь віддав інший воркер або запис уже витіснено
+        api_name, params, result_text = name, f"Запит: {request.full_path.rstrip('?')}", "Результат"
+    add_history_entry(current_user.id, api_name, params, f"{result_text} (без змін, 304)")
+
+# --- умовні GET ---
+
+def resource_etag(resource, tables, daily=False):
+    versions = get_versions(tables)
+    context = '|'.join((
+        BUILD_ID,
+        request.full_path,
+        # роль змінює вигляд сторінок (кнопки редагування тощо), тож після зміни ролі потрібен новий ETag
+        f'{current_user.get_id()}:{current_user.role}' if current_user.is_authenticated else '',
+        date.today().isoformat() if daily else ''
+    ))
+    counters = '.'.join(str(versions[name]) for name in tables)
+    return f"{resource}-{counters}-{zlib.crc32(context.encode('utf-8')):08x}"
+
+def _set_cache_headers(response, etag, max_age):
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+def etag_cached(*tables, daily=False, max_age=None, history=None):
+    """ETag із лічильників змін таблиць; на збіг If-None-Match — 304 без запиту й рендерингу.
+
+    daily: відповідь залежить від сьогоднішньої дати (звіти «за поточний місяць» тощо).
+    max_age: скільки секунд браузер може не перепитувати довідкові дані.
+    history: назва звіту для історії запитів; відповідь 304 записується так само, як повна.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # флеш-повідомлення показуються на сторінці один раз, тож її треба відрендерити
+            if session.get('_flashes') and not request.path.startswith('/api/'):
+                return f(*args, **kwargs)
+
+            etag = resource_etag(f.__name__, tables, daily=daily)
+            if request.if_none_match.contains_weak(etag):
+                if history:
+                    _record_revalidated(etag, history)
+                return _set_cache_headers(current_app.response_class(status=304), etag, max_age)
+
+            if history:
+                g.etag_history_key = etag
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                _set_cache_headers(response, etag, max_age)
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,159 @@
+import os
+import calendar
+from datetime import date
+from sqlalchemy import select, func, extract
+from models import Sale, SaleItem, Delivery, DeliveryItem
+from saved_query_utils import read_only_connection
+
+# рядків в одній групі рядків Parquet / пакеті Arrow; стільки ж тримається в пам'яті одночасно
+ROW_GROUP_SIZE = int(os.getenv('EXPORT_ROW_GROUP_SIZE', 50000))
+
+FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows')
+}
+
+DATASETS = {
+    'sales': {
+        'date': Sale.sale_date,
+        'id': SaleItem.id,
+        'join': (SaleItem, Sale, Sale.id == SaleItem.sale_id),
+        'columns': (
+            ('sale_id', Sale.id, 'int32'),
+            ('sale_date', Sale.sale_date, 'date'),
+            ('sale_time', Sale.sale_time, 'time'),
+            ('employee_id', Sale.employee_id, 'int32'),
+            ('item_id', SaleItem.id, 'int32'),
+            ('product_id', SaleItem.product_id, 'int32'),
+            ('quantity', SaleItem.quantity, 'int32'),
+            ('unit_price', SaleItem.unit_price, 'money'),
+            ('total_price', SaleItem.total_price, 'money')
+        )
+    },
+    'deliveries': {
+        'date': Delivery.delivery_date,
+        'id': DeliveryItem.id,
+        'join': (DeliveryItem, Delivery, Delivery.id == DeliveryItem.delivery_id),
+        'columns': (
+            ('delivery_id', Delivery.id, 'int32'),
+            ('delivery_date', Delivery.delivery_date, 'date'),
+            ('contract_id', Delivery.contract_id, 'int32'),
+            ('item_id', DeliveryItem.id, 'int32'),
+            ('product_id', DeliveryItem.product_id, 'int32'),
+            ('quantity', DeliveryItem.quantity, 'int32'),
+            ('unit_price', DeliveryItem.unit_price, 'money'),
+            ('total_price', DeliveryItem.total_price, 'money')
+        )
+    }
+}
+
+class _ChunkSink:
+    """Файлоподібний приймач для writer-а pyarrow: записане забирається порціями через drain()."""
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def month_bounds(value):
+    """'YYYY-MM' -> (перший, останній день місяця); ValueError для некоректного значення."""
+    year, month = (int(part) for part in value.split('-'))
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+def _filtered(spec, query, start_date, end_date):
+    item, parent, on = spec['join']
+    query = query.select_from(item).join(parent, on)
+    if start_date:
+        query = query.where(spec['date'] >= start_date)
+    if end_date:
+        query = query.where(spec['date'] <= end_date)
+    return query
+
+def export_partitions(dataset, start_date=None, end_date=None):
+    """Місячні партиції з відбитком (кількість, найбільший id позиції).
+
+    Правка чи видалення документа перестворює або прибирає його позиції, тож відбиток змінюється;
+    для інкрементального оновлення достатньо повторно вивантажити місяці зі зміненим відбитком.
+    """
+    spec = DATASETS[dataset]
+    year = extract('year', spec['date'])
+    month = extract('month', spec['date'])
+    query = _filtered(spec, select(
+        year.label('year'),
+        month.label('month'),
+        func.count(spec['id']).label('rows'),
+        func.max(spec['id']).label('max_item_id')
+    ), start_date, end_date).group_by(year, month).order_by(year, month)
+
+    with read_only_connection() as conn:
+        rows = conn.execute(query).all()
+
+    partitions = []
+    for row in rows:
+        label = f'{int(row.year):04d}-{int(row.month):02d}'
+        first, last = month_bounds(label)
+        partitions.append({
+            'month': label,
+            'start_date': first,
+            'end_date': last,
+            'rows': row.rows,
+            'fingerprint': f'{row.rows}-{row.max_item_id}'
+        })
+    return partitions
+
+def iter_export(dataset, fmt, start_date=None, end_date=None, on_complete=None):
+    """Потоково кодує набір у Parquet або Arrow IPC, читаючи серверним курсором по ROW_GROUP_SIZE рядків."""
+    # pyarrow важкий, тож імпортується лише під час експорту, а не під час старту воркера
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {'int32': pa.int32(), 'date': pa.date32(), 'time': pa.time64('us'), 'money': pa.decimal128(10, 2)}
+    spec = DATASETS[dataset]
+    schema = pa.schema([(name, types[kind]) for name, _, kind in spec['columns']])
+    query = _filtered(
+        spec, select(*[column.label(name) for name, column, _ in spec['columns']]), start_date, end_date
+    ).order_by(spec['date'], spec['id'])
+
+    sink = _ChunkSink()
+    count = 0
+    with read_only_connection() as conn:
+        result = conn.execution_options(stream_results=True).execute(query)
+        if fmt == 'parquet':
+            writer = pq.ParquetWriter(sink, schema, compression='snappy')
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+        try:
+            for rows in result.partitions(ROW_GROUP_SIZE):
+                columns = zip(*rows)
+                writer.write_batch(pa.record_batch(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                count += len(rows)
+                yield sink.drain()
+        finally:
+            writer.close()
+    yield sink.drain()
+
+    if on_complete:
+        on_complete(count)
@@ -0,0 +1,32 @@
+import os
+import threading
+from collections import OrderedDict
+from markupsafe import Markup
+from etag_utils import get_versions
+
+FRAGMENT_CACHE_SIZE = int(os.getenv('FRAGMENT_CACHE_SIZE', 200))
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+def cached_fragment(name, tables, render, *key):
+    """Готовий HTML фрагмента для поточних версій таблиць; render() викликається лише при промаху.
+
+    key — решта того, від чого залежить розмітка (роль користувача, дата тощо).
+    Після зміни таблиці ключ змінюється, а старі фрагменти витісняються за LRU.
+    """
+    versions = get_versions(tables)
+    cache_key = (name, tuple(versions[table] for table in tables), key)
+
+    with _lock:
+        html = _cache.get(cache_key)
+        if html is not None:
+            _cache.move_to_end(cache_key)
+            return html
+
+    html = Markup(render())
+    with _lock:
+        _cache[cache_key] = html
+        while len(_cache) > FRAGMENT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return html
@@ -1,33 +1,120 @@
+import os
 import json
+import queue
+import atexit
+import logging
+import threading
 from pathlib import Path
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 HISTORY_DIR = Path("history")
-HISTORY_DIR.mkdir(exist_ok=True)
+
+QUEUE_SIZE = int(os.getenv('HISTORY_QUEUE_SIZE', 1000))
+BATCH_SIZE = int(os.getenv('HISTORY_BATCH_SIZE', 200))
+FLUSH_INTERVAL = float(os.getenv('HISTORY_FLUSH_INTERVAL', 1.0))
+
+_queue = queue.Queue(maxsize=QUEUE_SIZE)
+_write_lock = threading.Lock()
+_stop_event = threading.Event()
+_writer = None
+_writer_lock = threading.Lock()
+_entry_listeners = []
 
 def history_file(user_id):
     return HISTORY_DIR / f"user_{user_id}.json"
 
-def load_history(user_id):
+def _read_history(user_id):
     file = history_file(user_id)
     if not file.exists():
         return []
     with open(file, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def load_history(user_id):
+    flush_history()
+    return _read_history(user_id)
+
 def save_history(user_id, history_list):
+    # каталог створюється при першому записі, а не під час імпорту модуля
+    HISTORY_DIR.mkdir(exist_ok=True)
     file = history_file(user_id)
     with open(file, "w", encoding="utf-8") as f:
         json.dump(history_list, f, ensure_ascii=False, indent=2)
 
-def add_history_entry(user_id, api_name, params, result_text):
-    history = load_history(user_id)
+def _drain_locked(limit=None):
+    # викликається під _write_lock, щоб записи потрапляли у файли в порядку надходження
+    batch = {}
+    count = 0
+    while limit is None or count < limit:
+        try:
+            user_id, entry = _queue.get_nowait()
+        except queue.Empty:
+            break
+        batch.setdefault(user_id, []).append(entry)
+        count += 1
+
+    for user_id, entries in batch.items():
+        history = _read_history(user_id)
+        history.extend(entries)
+        save_history(user_id, history)
 
-    history.append({
+    return count
+
+def flush_history():
+    with _write_lock:
+        while _drain_locked(BATCH_SIZE):
+            pass
+
+def _run_writer():
+    while not _stop_event.wait(FLUSH_INTERVAL):
+        try:
+            flush_history()
+        except Exception:
+            logger.exception("Не вдалося записати історію запитів")
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None:
+        return
+    with _writer_lock:
+        if _writer is not None:
+            return
+        _writer = threading.Thread(target=_run_writer, name='history-writer', daemon=True)
+        _writer.start()
+        atexit.register(stop_history_writer)
+
+def stop_history_writer():
+    _stop_event.set()
+    if _writer is not None and _writer.is_alive():
+        _writer.join(timeout=FLUSH_INTERVAL * 2)
+    flush_history()
+
+def register_entry_listener(func):
+    """func(user_id, entry) викликається для кожного нового запису історії в тому ж потоці."""
+    if func not in _entry_listeners:
+        _entry_listeners.append(func)
+    return func
+
+def add_history_entry(user_id, api_name, params, result_text):
+    entry = {
         "api": api_name,
         "params": params,
         "result": result_text,
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
+    }
+    for listener in _entry_listeners:
+        listener(user_id, entry)
+
+    _ensure_writer()
 
-    save_history(user_id, history)
+    try:
+        _queue.put_nowait((user_id, entry))
+    except queue.Full:
+        # черга переповнена: пишемо синхронно, щоб не втратити запис
+        with _write_lock:
+            _drain_locked()
+            history = _read_history(user_id)
+            history.append(entry)
+            save_history(user_id, history)
@@ -1,10 +1,11 @@
-from app import app, db
+from app import get_app
+from scheduler import refresh_contract_flags
 from models import *
 from datetime import datetime, date, time, timedelta
 from decimal import Decimal
 
 def init_database():
-    with app.app_context():
+    with get_app().app_context():
         db.drop_all()
         db.create_all()
 
@@ -150,6 +151,7 @@ def init_database():
         for contract in contracts:
             db.session.add(contract)
         db.session.commit()
+        refresh_contract_flags()
 
         products = [
             Product(name="Python для початківців", author="Іван Програміст", 
@@ -0,0 +1,95 @@
+from datetime import datetime, date, time, timedelta
+from sqlalchemy import func, literal, text
+from sqlalchemy.exc import IntegrityError
+from models import db, Product, StockMovement, StockSnapshot
+from scheduler import register_periodic_job
+
+def record_stock_movement(product_id, quantity_change, reason, reference_id=None):
+    """Додає рядок до журналу руху товару в поточній транзакції."""
+    if not quantity_change:
+        return
+    db.session.add(StockMovement(
+        product_id=product_id,
+        quantity_change=quantity_change,
+        reason=reason,
+        reference_id=reference_id,
+        created_at=datetime.now()
+    ))
+
+def take_stock_snapshots(today=None):
+    """Одним INSERT ... SELECT фіксує залишки всіх товарів на сьогодні разом із позицією в журналі.
+
+    Знімок прив'язаний до id останнього руху, а не до часу: рух, записаний до знімка,
+    але закомічений після нього, має більший id і потрапить у хвіст журналу.
+    """
+    today = today or date.today()
+
+    if StockSnapshot.query.filter_by(snapshot_date=today).first():
+        return 0
+
+    if db.engine.dialect.name == 'postgresql':
+        # чекаємо на транзакції, що вже пишуть у журнал, і не пускаємо нові до коміту знімка,
+        # тож залишки й найбільший id руху узгоджені (SQLite і так має лише одного записувача)
+        db.session.execute(text('LOCK TABLE stock_movements IN SHARE MODE'))
+
+    last_movement_id = db.session.query(func.coalesce(func.max(StockMovement.id), 0)).scalar_subquery()
+    select = db.session.query(
+        Product.id,
+        literal(today, db.Date),
+        literal(datetime.now(), db.DateTime),
+        func.coalesce(Product.stock_quantity, 0),
+        last_movement_id
+    )
+    insert = StockSnapshot.__table__.insert().from_select(
+        ['product_id', 'snapshot_date', 'taken_at', 'stock_quantity', 'last_movement_id'], select
+    )
+
+    try:
+        result = db.session.execute(insert)
+        db.session.commit()
+    except IntegrityError:
+        # інший воркер уже зробив знімок за сьогодні
+        db.session.rollback()
+        return 0
+
+    return result.rowcount
+
+register_periodic_job(take_stock_snapshots)
+
+def _movements_sum(product_id, *criteria):
+    total = db.session.query(func.sum(StockMovement.quantity_change)).filter(
+        StockMovement.product_id == product_id,
+        *criteria
+    ).scalar()
+    return total or 0
+
+def stock_as_of(product_id, target_date):
+    """Залишок на кінець target_date: найближчий знімок плюс хвіст журналу після нього."""
+    moment = datetime.combine(target_date + timedelta(days=1), time.min) - timedelta(microseconds=1)
+
+    before = StockSnapshot.query.filter(
+        StockSnapshot.product_id == product_id,
+        StockSnapshot.taken_at <= moment
+    ).order_by(StockSnapshot.taken_at.desc()).first()
+
+    if before:
+        return before.stock_quantity + _movements_sum(
+            product_id,
+            StockMovement.id > before.last_movement_id,
+            StockMovement.created_at <= moment
+        )
+
+    after = StockSnapshot.query.filter(
+        StockSnapshot.product_id == product_id,
+        StockSnapshot.taken_at > moment
+    ).order_by(StockSnapshot.taken_at).first()
+
+    if after:
+        return after.stock_quantity - _movements_sum(
+            product_id,
+            StockMovement.id <= after.last_movement_id,
+            StockMovement.created_at > moment
+        )
+
+    current = db.session.query(Product.stock_quantity).filter(Product.id == product_id).scalar() or 0
+    return current - _movements_sum(product_id, StockMovement.created_at > moment)
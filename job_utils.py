@@ -0,0 +1,283 @@
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+import multiprocessing
+from pathlib import Path
+from functools import partial
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from sqlalchemy import select, text
+from models import db, ReportJob, SavedQuery, User
+from queries import BookstoreQueries
+from json_utils import iter_json_array
+from saved_query_utils import read_only_connection, bind_values
+from scheduler import register_periodic_job
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOBS_PER_USER = int(os.getenv('JOBS_PER_USER', 2))
+JOB_RESULT_TTL = timedelta(hours=float(os.getenv('JOB_RESULT_TTL_HOURS', 24)))
+JOB_TIMEOUT = timedelta(hours=float(os.getenv('JOB_TIMEOUT_HOURS', 6)))
+RESULTS_DIR = Path(os.getenv('JOB_RESULTS_DIR', 'job_results'))
+FETCH_BATCH_SIZE = 500
+# як часто воркер перевіряє, чи не скасували завдання
+CANCEL_CHECK_INTERVAL = float(os.getenv('JOB_CANCEL_CHECK_INTERVAL', 2))
+
+JOB_KINDS = ('query6', 'custom_sql', 'saved_query')
+ACTIVE_STATUSES = ('queued', 'running')
+
+_executor = None
+_executor_lock = threading.Lock()
+_futures = {}
+
+class JobLimitExceeded(Exception):
+    pass
+
+class JobCancelled(Exception):
+    pass
+
+class JobSubmitFailed(Exception):
+    pass
+
+def result_path(job_id):
+    return RESULTS_DIR / f'job_{job_id}.json'
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: дочірні процеси не успадковують з'єднання пулу та потоки батьківського процесу
+            _executor = ProcessPoolExecutor(
+                max_workers=JOB_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+def _discard_executor(executor):
+    """Пул із загиблим процесом більше не приймає завдань: наступне завдання створить новий."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+@atexit.register
+def stop_job_workers():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+# --- виконання у процесі-воркері ---
+
+@contextmanager
+def _job_rows(kind, params):
+    """Відкриває джерело рядків завдання: (ітератор рядків, перетворення рядка у dict)."""
+    if kind == 'query6':
+        query = BookstoreQueries.query_6_sales_info(
+            target_date=date.fromisoformat(params['target_date']) if params.get('target_date') else None,
+            month=params.get('month'),
+            category_name=params.get('category'),
+            supplier_name=params.get('supplier'),
+            as_query=True,
+            projection=True
+        )
+        yield query.yield_per(FETCH_BATCH_SIZE), lambda row: row._asdict()
+        return
+
+    if kind == 'saved_query':
+        saved_query = SavedQuery.query.get(params['query_id'])
+        if saved_query is None:
+            raise ValueError('Збережений запит видалено')
+        sql = saved_query.sql_text
+        values = bind_values(sql, params.get('params') or {})
+    else:
+        sql = params['sql']
+        values = {}
+
+    with read_only_connection() as conn:
+        result = conn.execution_options(stream_results=True).execute(text(sql), values)
+        yield result, lambda row: dict(row._mapping)
+
+def _cancellation_check(job_id):
+    """Функція, що повертає True для скасованого завдання; БД перепитується не частіше за CANCEL_CHECK_INTERVAL."""
+    checked = time.monotonic()
+
+    def is_cancelled():
+        nonlocal checked
+        now = time.monotonic()
+        if now - checked < CANCEL_CHECK_INTERVAL:
+            return False
+        checked = now
+        with db.engine.connect() as conn:
+            status = conn.execute(select(ReportJob.status).where(ReportJob.id == job_id)).scalar()
+        return status != 'running'
+
+    return is_cancelled
+
+def _execute_job(job_id):
+    started = ReportJob.query.filter(
+        ReportJob.id == job_id,
+        ReportJob.status == 'queued'
+    ).update({ReportJob.status: 'running', ReportJob.started_at: datetime.now()}, synchronize_session=False)
+    db.session.commit()
+    if not started:
+        return
+
+    job = ReportJob.query.get(job_id)
+    path = result_path(job_id)
+    part = path.with_suffix('.part')
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    counter = {'count': 0}
+    is_cancelled = _cancellation_check(job_id)
+
+    def finish(count):
+        counter['count'] = count
+
+    try:
+        with _job_rows(job.kind, json.loads(job.params)) as (rows, to_dict):
+            with open(part, 'w', encoding='utf-8') as f:
+                for chunk in iter_json_array(rows, to_dict, on_complete=finish):
+                    f.write(chunk)
+                    if is_cancelled():
+                        raise JobCancelled()
+    except JobCancelled:
+        part.unlink(missing_ok=True)
+        return
+    except Exception:
+        part.unlink(missing_ok=True)
+        raise
+
+    os.replace(part, path)
+    finished = datetime.now()
+    ReportJob.query.filter(ReportJob.id == job_id, ReportJob.status == 'running').update({
+        ReportJob.status: 'done',
+        ReportJob.row_count: counter['count'],
+        ReportJob.result_path: str(path),
+        ReportJob.finished_at: finished,
+        ReportJob.expires_at: finished + JOB_RESULT_TTL
+    }, synchronize_session=False)
+    db.session.commit()
+
+def _mark_failed(job_id, error):
+    ReportJob.query.filter(
+        ReportJob.id == job_id,
+        ReportJob.status.in_(ACTIVE_STATUSES)
+    ).update({
+        ReportJob.status: 'failed',
+        ReportJob.error: error,
+        ReportJob.finished_at: datetime.now()
+    }, synchronize_session=False)
+    db.session.commit()
+
+def run_job(job_id):
+    """Точка входу процесу-воркера."""
+    from app import get_app
+
+    with get_app().app_context():
+        try:
+            _execute_job(job_id)
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Помилка фонового завдання %s", job_id)
+            _mark_failed(job_id, str(e))
+        finally:
+            db.session.remove()
+
+# --- керування завданнями у веб-процесі ---
+
+def _job_finished(app, executor, job_id, future):
+    _futures.pop(job_id, None)
+    if future.cancelled() or future.exception() is None:
+        return
+    if isinstance(future.exception(), BrokenProcessPool):
+        _discard_executor(executor)
+    # воркер упав, не встигнувши записати статус (наприклад, BrokenProcessPool)
+    with app.app_context():
+        try:
+            _mark_failed(job_id, str(future.exception()))
+        finally:
+            db.session.remove()
+
+def submit_job(user_id, kind, params):
+    # блокування рядка користувача серіалізує паралельні запити одного користувача між підрахунком і вставкою
+    db.session.query(User.id).filter(User.id == user_id).with_for_update().first()
+    active = ReportJob.query.filter(
+        ReportJob.user_id == user_id,
+        ReportJob.status.in_(ACTIVE_STATUSES)
+    ).count()
+    if active >= JOBS_PER_USER:
+        db.session.rollback()
+        raise JobLimitExceeded()
+
+    job = ReportJob(user_id=user_id, kind=kind, params=json.dumps(params, ensure_ascii=False))
+    db.session.add(job)
+    db.session.commit()
+
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            future = executor.submit(run_job, job.id)
+            break
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            if attempt:
+                _mark_failed(job.id, 'Пул фонових процесів недоступний')
+                raise JobSubmitFailed()
+        except Exception as e:
+            # інакше рядок у статусі queued займав би ліміт користувача до expire_jobs
+            _mark_failed(job.id, str(e))
+            raise JobSubmitFailed() from e
+
+    _futures[job.id] = future
+    future.add_done_callback(partial(_job_finished, current_app._get_current_object(), executor, job.id))
+    return job
+
+def cancel_job(job):
+    cancelled = ReportJob.query.filter(
+        ReportJob.id == job.id,
+        ReportJob.status.in_(ACTIVE_STATUSES)
+    ).update({ReportJob.status: 'cancelled', ReportJob.finished_at: datetime.now()}, synchronize_session=False)
+    db.session.commit()
+
+    # завдання в черзі знімається одразу, а запущене зупиниться на наступній порції рядків
+    future = _futures.pop(job.id, None)
+    if future is not None:
+        future.cancel()
+    return bool(cancelled)
+
+@register_periodic_job
+def expire_jobs(now=None):
+    now = now or datetime.now()
+
+    expired = ReportJob.query.filter(
+        ReportJob.status == 'done',
+        ReportJob.expires_at < now
+    ).all()
+    for job in expired:
+        if job.result_path:
+            Path(job.result_path).unlink(missing_ok=True)
+        job.status = 'expired'
+        job.result_path = None
+
+    # завдання, які воркер так і не завершив (наприклад, після перезапуску сервера)
+    stale = ReportJob.query.filter(
+        ReportJob.status.in_(ACTIVE_STATUSES),
+        ReportJob.created_at < now - JOB_TIMEOUT
+    ).update({
+        ReportJob.status: 'failed',
+        ReportJob.error: 'Перевищено час виконання',
+        ReportJob.finished_at: now
+    }, synchronize_session=False)
+
+    db.session.commit()
+    if expired or stale:
+        logger.info("Завершено строк дії %s результатів, прострочено %s завдань", len(expired), stale)
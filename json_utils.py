@@ -0,0 +1,65 @@
+import json
+from decimal import Decimal
+from datetime import datetime, date, time
+from flask import Response, stream_with_context
+
+CHUNK_SIZE = 200
+
+def json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, time):
+        return value.strftime('%H:%M:%S')
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+_encoder = json.JSONEncoder(default=json_default, ensure_ascii=False, separators=(',', ':'))
+
+def dumps(value):
+    return _encoder.encode(value)
+
+def iter_json_array(rows, to_dict, on_complete=None):
+    """Кодує рядки в JSON-масив частинами, не збираючи весь список у пам'яті."""
+    count = 0
+    buffer = ['[']
+
+    for row in rows:
+        if count:
+            buffer.append(',')
+        buffer.append(dumps(to_dict(row)))
+        count += 1
+
+        if len(buffer) >= CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+
+    buffer.append(']')
+    yield ''.join(buffer)
+
+    if on_complete:
+        on_complete(count)
+
+def iter_json_object(fields, array_key, rows, to_dict, tail=None, on_complete=None):
+    """Об'єкт із полями fields, масивом array_key та полями tail(count), обчисленими після масиву."""
+    counter = {'count': 0}
+
+    def finish(count):
+        counter['count'] = count
+
+    yield '{' + ''.join(f'{dumps(key)}:{dumps(value)},' for key, value in fields.items()) + dumps(array_key) + ':'
+    yield from iter_json_array(rows, to_dict, on_complete=finish)
+
+    tail_fields = tail(counter['count']) if tail else {}
+    yield ''.join(f',{dumps(key)}:{dumps(value)}' for key, value in tail_fields.items()) + '}'
+
+    if on_complete:
+        on_complete(counter['count'])
+
+def json_response(value):
+    return Response(dumps(value), mimetype='application/json')
+
+def stream_json(chunks):
+    return Response(stream_with_context(chunks), mimetype='application/json')
@@ -0,0 +1,35 @@
+"""Оновлення схеми наявної бази без втрати даних (init_db.py натомість перестворює таблиці).
+
+    python migrate_db.py
+
+Кроки ідемпотентні: повторний запуск нічого не змінює.
+"""
+from sqlalchemy import inspect, text
+from app import get_app
+from models import db
+from scheduler import refresh_contract_flags
+
+def migrate_contract_flags():
+    """Додає contracts.is_active з індексом і заповнює прапорець за датами договорів.
+
+    Повертає кількість договорів, яким змінено прапорець.
+    """
+    columns = {column['name'] for column in inspect(db.engine).get_columns('contracts')}
+    if 'is_active' not in columns:
+        db.session.execute(text('ALTER TABLE contracts ADD COLUMN is_active BOOLEAN NOT NULL DEFAULT FALSE'))
+    db.session.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_contracts_active_end_date ON contracts (is_active, end_date)'
+    ))
+    db.session.commit()
+    return refresh_contract_flags()
+
+MIGRATIONS = [migrate_contract_flags]
+
+def migrate_database():
+    with get_app().app_context():
+        for migration in MIGRATIONS:
+            result = migration()
+            print(f"{migration.__name__}: {result}")
+
+if __name__ == '__main__':
+    migrate_database()
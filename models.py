@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, date
+from sqlalchemy import or_, and_
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -127,8 +128,14 @@ class Employee(db.Model):
     def is_manager(self):
         return 'керівник' in self.position.lower()
 
+    @classmethod
+    def ids_with_dependencies(cls, ids):
+        has_sales = db.session.query(Sale.id).filter(Sale.employee_id == cls.id).exists()
+        rows = db.session.query(cls.id).filter(cls.id.in_(ids), has_sales)
+        return {row.id for row in rows}
+
     def is_deletable(self):
-        return not self.sales
+        return self.id not in Employee.ids_with_dependencies([self.id])
     
     def __repr__(self):
         return f'<Employee {self.full_name}>'
@@ -146,6 +153,18 @@ class Supplier(db.Model):
 
     contracts = db.relationship('Contract', backref='supplier', lazy=True)
 
+    @classmethod
+    def ids_with_dependencies(cls, ids):
+        has_active_contract = db.session.query(Contract.id).filter(
+            Contract.supplier_id == cls.id,
+            Contract.is_active == True
+        ).exists()
+        rows = db.session.query(cls.id).filter(cls.id.in_(ids), has_active_contract)
+        return {row.id for row in rows}
+
+    def is_deletable(self):
+        return self.id not in Supplier.ids_with_dependencies([self.id])
+
     def __repr__(self):
         return f'<Supplier {self.name}>'
 
@@ -154,14 +173,32 @@ class Contract(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     contract_number = db.Column(db.String(50), nullable=False, unique=True)
-    supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.id'), nullable=False)
+    supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.id'), nullable=False, index=True)
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=False)
     is_deleted = db.Column(db.Boolean, default=False)
+    # підтримується scheduler (о півночі та на першому запиті нового дня) і формами договорів,
+    # щоб не порівнювати дати в кожному запиті; для інших дат див. active_on
+    is_active = db.Column(db.Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        db.Index('ix_contracts_active_end_date', 'is_active', 'end_date'),
+    )
     
     # Relationships
     contract_products = db.relationship('ContractProduct', backref='contract', lazy=True)
     deliveries = db.relationship('Delivery', backref='contract', lazy=True)
+
+    @classmethod
+    def active_on(cls, day):
+        """Умова «договір діє в день day»: на сьогодні — індексований прапорець, інакше — за датами."""
+        if day == date.today():
+            return cls.is_active == True
+        return and_(cls.is_deleted == False, cls.start_date <= day, cls.end_date >= day)
+
+    def refresh_active_flag(self, today=None):
+        today = today or date.today()
+        self.is_active = not self.is_deleted and self.start_date <= today <= self.end_date
     
     def __repr__(self):
         return f'<Contract {self.contract_number}>'
@@ -189,14 +226,28 @@ class Product(db.Model):
     publication_date = db.Column(db.Date)
     price = db.Column(db.Numeric(10, 2), nullable=False)
     stock_quantity = db.Column(db.Integer, default=0)
-    category_id = db.Column(db.Integer, db.ForeignKey('product_categories.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('product_categories.id'), nullable=False, index=True)
     is_deleted = db.Column(db.Boolean, default=False)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     # Relationships
     department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=False)
     contract_products = db.relationship('ContractProduct', backref='product', lazy=True)
     delivery_items = db.relationship('DeliveryItem', backref='product', lazy=True)
     sale_items = db.relationship('SaleItem', backref='product', lazy=True)
+
+    @classmethod
+    def ids_with_dependencies(cls, ids):
+        is_used = or_(
+            db.session.query(SaleItem.id).filter(SaleItem.product_id == cls.id).exists(),
+            db.session.query(DeliveryItem.id).filter(DeliveryItem.product_id == cls.id).exists(),
+            db.session.query(ContractProduct.id).filter(ContractProduct.product_id == cls.id).exists()
+        )
+        rows = db.session.query(cls.id).filter(cls.id.in_(ids), is_used)
+        return {row.id for row in rows}
+
+    def is_deletable(self):
+        return self.id not in Product.ids_with_dependencies([self.id])
     
     def __repr__(self):
         return f'<Product {self.name}>'
@@ -205,8 +256,8 @@ class ContractProduct(db.Model):
     __tablename__ = 'contract_products'
     
     id = db.Column(db.Integer, primary_key=True)
-    contract_id = db.Column(db.Integer, db.ForeignKey('contracts.id'), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    contract_id = db.Column(db.Integer, db.ForeignKey('contracts.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False, index=True)
     quantity_per_delivery = db.Column(db.Integer, nullable=False)
     purchase_price = db.Column(db.Numeric(10, 2), nullable=False)
     
@@ -220,6 +271,7 @@ class Delivery(db.Model):
     contract_id = db.Column(db.Integer, db.ForeignKey('contracts.id'), nullable=False)
     delivery_date = db.Column(db.Date, nullable=False, default=date.today)
     total_amount = db.Column(db.Numeric(10, 2), default=0)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     delivery_items = db.relationship('DeliveryItem', backref='delivery', lazy=True)
     
@@ -260,6 +312,7 @@ class Sale(db.Model):
     sale_date = db.Column(db.Date, nullable=False, default=date.today)
     sale_time = db.Column(db.Time, nullable=False, default=datetime.now().time)
     total_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     sale_items = db.relationship('SaleItem', backref='sale', lazy=True)
     
@@ -278,3 +331,114 @@ class SaleItem(db.Model):
     
     def __repr__(self):
         return f'<SaleItem {self.product_id}: {self.quantity}>'
+
+class SupplierScorecard(db.Model):
+    __tablename__ = 'supplier_scorecards'
+
+    supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.id'), primary_key=True)
+    contracts_count = db.Column(db.Integer, nullable=False, default=0)
+    active_contracts = db.Column(db.Integer, nullable=False, default=0)
+    deliveries_count = db.Column(db.Integer, nullable=False, default=0)
+    delivered_items = db.Column(db.Integer, nullable=False, default=0)
+    total_delivered_value = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    last_delivery_date = db.Column(db.Date)
+    refreshed_on = db.Column(db.Date, nullable=False, default=date.today)
+
+    supplier = db.relationship('Supplier', backref=db.backref('scorecard', uselist=False))
+
+    @property
+    def items_per_delivery(self):
+        if not self.deliveries_count:
+            return 0
+        return round(self.delivered_items / self.deliveries_count, 2)
+
+    def __repr__(self):
+        return f'<SupplierScorecard {self.supplier_id}>'
+
+class StockMovement(db.Model):
+    __tablename__ = 'stock_movements'
+
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    quantity_change = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(30), nullable=False)  # sale, sale_edit, sale_delete, delivery, delivery_edit, delivery_delete, initial, manual
+    reference_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_stock_movements_product_created', 'product_id', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<StockMovement {self.product_id}: {self.quantity_change:+d}>'
+
+class StockSnapshot(db.Model):
+    __tablename__ = 'stock_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    snapshot_date = db.Column(db.Date, nullable=False)
+    taken_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    stock_quantity = db.Column(db.Integer, nullable=False)
+    # найбільший stock_movements.id, вже врахований у stock_quantity
+    last_movement_id = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('product_id', 'snapshot_date', name='uq_stock_snapshots_product_date'),
+    )
+
+    def __repr__(self):
+        return f'<StockSnapshot {self.product_id} on {self.snapshot_date}: {self.stock_quantity}>'
+
+class SavedQuery(db.Model):
+    __tablename__ = 'saved_queries'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    description = db.Column(db.String(255))
+    sql_text = db.Column(db.Text, nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+    author = db.relationship('User')
+
+    def __repr__(self):
+        return f'<SavedQuery {self.name}>'
+
+class ReportJob(db.Model):
+    __tablename__ = 'report_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    kind = db.Column(db.String(30), nullable=False)  # query6, custom_sql, saved_query
+    params = db.Column(db.Text, nullable=False, default='{}')
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed, cancelled, expired
+    row_count = db.Column(db.Integer)
+    result_path = db.Column(db.String(255))
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_report_jobs_user_status', 'user_id', 'status'),
+    )
+
+    @property
+    def is_active(self):
+        return self.status in ('queued', 'running')
+
+    def __repr__(self):
+        return f'<ReportJob {self.id} {self.kind}: {self.status}>'
+
+class TableVersion(db.Model):
+    """Лічильник змін таблиці: збільшується після кожного коміту, що її змінив."""
+    __tablename__ = 'table_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TableVersion {self.name}: {self.version}>'
@@ -1,13 +1,192 @@
 from models import *
-from sqlalchemy import func, and_, or_, extract, desc
+from sqlalchemy import func, and_, or_, extract, desc, case, false, text
 from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
+import math
+
+EMPLOYEE_FULL_NAME = (Employee.first_name + ' ' + Employee.last_name).label('full_name')
+
+def _sales_by_category(periods):
+    """Продажі за категоріями для кількох періодів {ключ: (початок, кінець)} за один прохід."""
+    first = min(start for start, _ in periods.values())
+    last = max(end for _, end in periods.values())
+
+    period_sales = (
+        db.session.query(
+            Product.category_id.label('category_id'),
+            Sale.sale_date.label('sale_date'),
+            SaleItem.total_price.label('total_price')
+        )
+        .select_from(SaleItem)
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .join(Product, Product.id == SaleItem.product_id)
+        .filter(Sale.sale_date >= first, Sale.sale_date <= last)
+        .cte('period_sales')
+    )
+
+    # без else_ сума дає NULL для категорій без продажів у періоді
+    return (
+        db.session.query(
+            ProductCategory.name,
+            *[
+                func.sum(case(
+                    (period_sales.c.sale_date.between(start, end), period_sales.c.total_price)
+                )).label(key)
+                for key, (start, end) in periods.items()
+            ]
+        )
+        .join(period_sales, period_sales.c.category_id == ProductCategory.id)
+        .group_by(ProductCategory.id, ProductCategory.name)
+        .all()
+    )
+
+SERIES_STEPS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': relativedelta(months=1)
+}
+
+SERIES_SPLITS = {
+    'category': (ProductCategory, Product.category_id, 'product_categories', 'category_id'),
+    'department': (Department, Product.department_id, 'departments', 'department_id')
+}
+
+# PostgreSQL: інтервали будує generate_series, тож порожні інтервали приходять із нулями
+REVENUE_SERIES_PG_SQL = """
+    WITH buckets AS (
+        SELECT generate_series(
+            date_trunc(:granularity, CAST(:start_date AS timestamp)),
+            date_trunc(:granularity, CAST(:end_date AS timestamp) + interval '1 day' - interval '1 second'),
+            CAST(:step AS interval)
+        ) AS bucket
+    ),
+    totals AS (
+        SELECT date_trunc(:granularity, s.sale_date + s.sale_time) AS bucket,
+               {group_column} AS group_name,
+               SUM(si.total_price) AS revenue,
+               SUM(si.quantity) AS quantity
+        FROM sale_items si
+        JOIN sales s ON s.id = si.sale_id
+        JOIN products p ON p.id = si.product_id
+        {group_join}
+        WHERE s.sale_date BETWEEN :start_date AND :end_date
+        GROUP BY 1, 2
+    ),
+    groups AS (
+        {groups}
+    )
+    SELECT b.bucket, g.group_name, COALESCE(t.revenue, 0) AS revenue, COALESCE(t.quantity, 0) AS quantity
+    FROM buckets b
+    CROSS JOIN groups g
+    LEFT JOIN totals t ON t.bucket = b.bucket AND t.group_name IS NOT DISTINCT FROM g.group_name
+    ORDER BY b.bucket, g.group_name
+"""
+
+def _truncate_bucket(value, granularity, hour=0):
+    if granularity == 'hour':
+        return datetime(value.year, value.month, value.day, hour)
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    return value
+
+def _revenue_series_pg(start_date, end_date, granularity, split):
+    if split:
+        _, _, table, column = SERIES_SPLITS[split]
+        group_column = 'g.name'
+        group_join = f'JOIN {table} g ON g.id = p.{column}'
+        groups = 'SELECT DISTINCT group_name FROM totals'
+    else:
+        group_column = 'CAST(NULL AS text)'
+        group_join = ''
+        groups = 'SELECT CAST(NULL AS text) AS group_name'
+
+    step = {'hour': '1 hour', 'day': '1 day', 'week': '1 week', 'month': '1 month'}[granularity]
+    sql = REVENUE_SERIES_PG_SQL.format(group_column=group_column, group_join=group_join, groups=groups)
+
+    rows = db.session.execute(text(sql), {
+        'granularity': granularity,
+        'start_date': start_date,
+        'end_date': end_date,
+        'step': step
+    })
+    return [
+        (row.bucket if granularity == 'hour' else row.bucket.date(), row.group_name, row.revenue, row.quantity)
+        for row in rows
+    ]
+
+def _revenue_series_generic(start_date, end_date, granularity, split):
+    # без generate_series/date_trunc: один запит із групуванням за датою (і годиною),
+    # а інтервали та пропуски формуємо в Python
+    hour = extract('hour', Sale.sale_time) if granularity == 'hour' else None
+    columns = [Sale.sale_date]
+    if hour is not None:
+        columns.append(hour.label('hour'))
+
+    if split:
+        model, foreign_key, _, _ = SERIES_SPLITS[split]
+        group_column = model.name
+    else:
+        group_column = None
+
+    query = (
+        db.session.query(
+            *columns,
+            *([group_column.label('group_name')] if split else []),
+            func.sum(SaleItem.total_price).label('revenue'),
+            func.sum(SaleItem.quantity).label('quantity')
+        )
+        .select_from(SaleItem)
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .join(Product, Product.id == SaleItem.product_id)
+    )
+    if split:
+        query = query.join(model, model.id == foreign_key)
+
+    group_by = list(columns) + ([group_column] if split else [])
+    rows = (
+        query.filter(Sale.sale_date >= start_date, Sale.sale_date <= end_date)
+        .group_by(*group_by)
+        .all()
+    )
+
+    totals = {}
+    for row in rows:
+        bucket = _truncate_bucket(row.sale_date, granularity, row.hour if hour is not None else 0)
+        key = (bucket, row.group_name if split else None)
+        revenue, quantity = totals.get(key, (0, 0))
+        totals[key] = (revenue + (row.revenue or 0), quantity + (row.quantity or 0))
+
+    groups = sorted({group for _, group in totals}) if split else [None]
+
+    series = []
+    bucket = _truncate_bucket(start_date, granularity)
+    last = _truncate_bucket(end_date, granularity, 23)
+    while bucket <= last:
+        for group in groups:
+            revenue, quantity = totals.get((bucket, group), (0, 0))
+            series.append((bucket, group, revenue, quantity))
+        bucket += SERIES_STEPS[granularity]
+
+    return series
 
 class BookstoreQueries:
+    # projection=True: запит вибирає лише потрібні колонки і повертає легкі рядки-кортежі
+    # замість ORM-об'єктів (без identity map та інструментування атрибутів)
     
     @staticmethod
-    def query_1_employees_info(department_name=None, managers_only=False, on_vacation_only=False):
-        query = db.session.query(Employee).join(Department)
+    def query_1_employees_info(department_name=None, managers_only=False, on_vacation_only=False,
+                               as_query=False, projection=False):
+        if projection:
+            query = db.session.query(
+                Employee.id, EMPLOYEE_FULL_NAME, Employee.position,
+                Department.name.label('department'), Employee.phone, Employee.email,
+                Employee.hire_date, Employee.is_on_vacation
+            ).select_from(Employee).join(Department, Department.id == Employee.department_id)
+        else:
+            query = db.session.query(Employee).join(Department)
         
         if department_name:
             query = query.filter(Department.name == department_name)
@@ -18,7 +197,7 @@ class BookstoreQueries:
         if on_vacation_only:
             query = query.filter(Employee.is_on_vacation == True)
         
-        return query.all()
+        return query if as_query else query.all()
     
     @staticmethod
     def query_2_revenue_analysis(start_date=None, end_date=None, category_name=None):
@@ -45,7 +224,7 @@ class BookstoreQueries:
         return result.total_revenue if result.total_revenue else 0
 
     @staticmethod
-    def query_3_contracts_by_period(period_type='month'):
+    def query_3_contracts_by_period(period_type='month', as_query=False, projection=False):
         today = date.today()
 
         if period_type == 'week':
@@ -65,46 +244,70 @@ class BookstoreQueries:
             start_date = date(today.year, 1, 1)
             end_date = date(today.year, 12, 31)
 
-        query = db.session.query(Contract).filter(
+        if projection:
+            query = db.session.query(
+                Contract.id, Contract.contract_number, Supplier.name.label('supplier'),
+                Contract.start_date, Contract.end_date
+            ).join(Supplier, Supplier.id == Contract.supplier_id)
+        else:
+            query = db.session.query(Contract)
+
+        query = query.filter(
             Contract.start_date.between(start_date, end_date)
         )
 
-        return query.all()
+        return query if as_query else query.all()
 
     @staticmethod
-    def query_4_suppliers_without_board_games():
-        board_games_category = db.session.query(ProductCategory).filter(
-            ProductCategory.name.like('%настільн%')
-        ).first()
-        
-        if not board_games_category:
-            return db.session.query(Supplier).all()
-        
-        suppliers_with_board_games = db.session.query(Supplier.id).join(Contract).join(
-            ContractProduct
-        ).join(Product).filter(
-            Product.category_id == board_games_category.id
-        ).subquery()
-        
-        query = db.session.query(Supplier).filter(
-            ~Supplier.id.in_(suppliers_with_board_games)
+    def query_4_suppliers_without_categories(category_names=None, as_query=False, projection=False):
+        if category_names:
+            category_filter = ProductCategory.name.in_(category_names)
+        else:
+            category_filter = ProductCategory.name.like('%настільн%')
+
+        supplies_category = (
+            db.session.query(ContractProduct.id)
+            .join(Contract, Contract.id == ContractProduct.contract_id)
+            .join(Product, Product.id == ContractProduct.product_id)
+            .join(ProductCategory, ProductCategory.id == Product.category_id)
+            .filter(Contract.supplier_id == Supplier.id, category_filter)
+            .exists()
         )
-        
-        return query.all()
-    
+
+        if projection:
+            query = db.session.query(
+                Supplier.id, Supplier.name, Supplier.contact_person,
+                Supplier.phone, Supplier.email, Supplier.address
+            )
+        else:
+            query = db.session.query(Supplier)
+
+        query = query.filter(~supplies_category)
+
+        return query if as_query else query.all()
+
     @staticmethod
-    def query_5_top_sellers(min_amount=200, period_type='day', target_date=None):
+    def query_4_suppliers_without_board_games():
+        return BookstoreQueries.query_4_suppliers_without_categories()
+
+    @staticmethod
+    def query_5_top_sellers(min_amount=200, period_type='day', target_date=None, as_query=False,
+                            start_date=None, end_date=None):
         if not target_date:
             target_date = date.today()
         
-        if period_type == 'day':
-            start_date = end_date = target_date
-        elif period_type == 'week':
-            start_date = target_date - timedelta(days=target_date.weekday())
-            end_date = start_date + timedelta(days=6)
-        elif period_type == 'month':
-            start_date = date(target_date.year, target_date.month, 1)
-            end_date = (start_date + relativedelta(months=1)) - timedelta(days=1)
+        # явно заданий діапазон має пріоритет над period_type
+        if not (start_date and end_date):
+            if period_type == 'day':
+                start_date = end_date = target_date
+            elif period_type == 'week':
+                start_date = target_date - timedelta(days=target_date.weekday())
+                end_date = start_date + timedelta(days=6)
+            elif period_type == 'month':
+                start_date = date(target_date.year, target_date.month, 1)
+                end_date = (start_date + relativedelta(months=1)) - timedelta(days=1)
+            else:
+                raise ValueError(f'Невідомий період: {period_type}')
         
         query = db.session.query(
             Employee,
@@ -117,12 +320,27 @@ class BookstoreQueries:
         if min_amount:
             query = query.having(func.sum(Sale.total_amount) > min_amount)
         
-        return query.all()
+        return query if as_query else query.all()
 
     @staticmethod
-    def query_6_sales_info(target_date=None, month=None, category_name=None, supplier_name=None):
+    def query_6_sales_info(target_date=None, month=None, category_name=None, supplier_name=None,
+                           as_query=False, projection=False):
+        if projection:
+            query = (
+                db.session.query(
+                    Sale.id.label('sale_id'), Sale.sale_date, Sale.sale_time,
+                    EMPLOYEE_FULL_NAME.label('employee'), Product.name.label('product_name'),
+                    ProductCategory.name.label('category'), SaleItem.quantity,
+                    SaleItem.unit_price, SaleItem.total_price
+                )
+                .select_from(Sale)
+                .join(Employee, Employee.id == Sale.employee_id)
+            )
+        else:
+            query = db.session.query(Sale, SaleItem, Product, ProductCategory)
+
         query = (
-            db.session.query(Sale, SaleItem, Product, ProductCategory)
+            query
             .join(SaleItem, SaleItem.sale_id == Sale.id)
             .join(Product, Product.id == SaleItem.product_id)
             .join(ProductCategory, ProductCategory.id == Product.category_id)
@@ -145,24 +363,35 @@ class BookstoreQueries:
                 .filter(Supplier.name == supplier_name)
             )
 
-        return query.all()
+        return query if as_query else query.all()
 
     @staticmethod
-    def query_7_employee_count(target_date=None, department_name=None):
-        if not target_date:
+    def query_7_employee_count(target_date=None, department_name=None, as_query=False, projection=False):
+        if not target_date and not as_query:
             return {'employees': [], 'count': 0}
 
+        if projection:
+            query = db.session.query(
+                EMPLOYEE_FULL_NAME, Employee.position, Department.name.label('department'),
+                WorkSchedule.shift_start, WorkSchedule.shift_end
+            )
+        else:
+            query = db.session.query(Employee, WorkSchedule, Department)
+
         query = (
-            db.session.query(Employee, WorkSchedule, Department)
+            query
             .select_from(WorkSchedule)
             .join(Employee, Employee.id == WorkSchedule.employee_id)
             .join(Department, Department.id == Employee.department_id)
-            .filter(WorkSchedule.work_date == target_date)
+            .filter(WorkSchedule.work_date == target_date if target_date else false())
         )
 
         if department_name:
             query = query.filter(Department.name == department_name)
 
+        if as_query:
+            return query
+
         employees = query.all()
 
         return {
@@ -182,7 +411,23 @@ class BookstoreQueries:
     def query_9_supplier_product_value(supplier_name, target_date=None):
         if not target_date:
             target_date = date.today()
-        
+
+        scorecards = db.session.query(
+            func.count(Supplier.id).label('suppliers_count'),
+            func.count(SupplierScorecard.supplier_id).label('scorecards_count'),
+            func.sum(SupplierScorecard.total_delivered_value).label('total_value'),
+            func.max(SupplierScorecard.last_delivery_date).label('last_delivery_date')
+        ).outerjoin(
+            SupplierScorecard, SupplierScorecard.supplier_id == Supplier.id
+        ).filter(Supplier.name == supplier_name).first()
+
+        if (
+            scorecards.suppliers_count
+            and scorecards.scorecards_count == scorecards.suppliers_count
+            and (scorecards.last_delivery_date is None or scorecards.last_delivery_date <= target_date)
+        ):
+            return scorecards.total_value if scorecards.total_value else 0
+
         query = db.session.query(
             func.sum(DeliveryItem.total_price).label('total_value')
         ).join(Delivery).join(Contract).join(Supplier).filter(
@@ -203,34 +448,178 @@ class BookstoreQueries:
         start_date = from_date - timedelta(days=7)
         end_date = from_date
 
-        total_query = (
-            db.session.query(func.sum(SaleItem.total_price).label('total_sales'))
-            .select_from(SaleItem)
+        # загальна сума — це сума по категоріях, тож другий прохід по продажах не потрібен
+        category_results = [
+            (row.name, row.week)
+            for row in _sales_by_category({'week': (start_date, end_date)})
+        ]
+
+        return {
+            'total_sales': sum(sales for _, sales in category_results),
+            'by_category': category_results,
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d')
+        }
+
+    @staticmethod
+    def dashboard_summary(today=None):
+        """Усі звіти сторінки звітів із параметрами за замовчуванням."""
+        if not today:
+            today = date.today()
+
+        month_start = date(today.year, today.month, 1)
+        month_end = month_start + relativedelta(months=1) - timedelta(days=1)
+        week_start = today - timedelta(days=7)
+
+        # запити 2 і 10 ділять один прохід по продажах за місяць і тиждень
+        category_sales = _sales_by_category({
+            'month': (month_start, month_end),
+            'week': (week_start, today)
+        })
+        weekly = [(row.name, row.week) for row in category_sales if row.week is not None]
+
+        shifts = BookstoreQueries.query_7_employee_count(
+            target_date=today, as_query=True, projection=True
+        ).all()
+
+        return {
+            'date': today,
+            'employees': BookstoreQueries.query_1_employees_info(as_query=True, projection=True).all(),
+            'revenue': {
+                'revenue': sum(row.month or 0 for row in category_sales),
+                'start_date': month_start,
+                'end_date': month_end
+            },
+            'contracts': BookstoreQueries.query_3_contracts_by_period(
+                period_type='month', as_query=True, projection=True
+            ).all(),
+            'suppliers': BookstoreQueries.query_4_suppliers_without_categories(
+                as_query=True, projection=True
+            ).all(),
+            'top_sellers': BookstoreQueries.query_5_top_sellers(
+                period_type='day', target_date=today, as_query=True
+            ).all(),
+            'sales': BookstoreQueries.query_6_sales_info(
+                target_date=today, as_query=True, projection=True
+            ).all(),
+            'shifts': {'employees': shifts, 'count': len(shifts)},
+            'weekly_sales': {
+                'total_sales': sum(sales for _, sales in weekly),
+                'by_category': weekly,
+                'start_date': week_start,
+                'end_date': today
+            }
+        }
+
+    @staticmethod
+    def contracts_expiring_within(days=30, today=None):
+        if not today:
+            today = date.today()
+
+        query = db.session.query(Contract, Supplier).join(
+            Supplier, Supplier.id == Contract.supplier_id
+        ).filter(
+            Contract.active_on(today),
+            Contract.end_date.between(today, today + timedelta(days=days))
+        ).order_by(Contract.end_date)
+
+        return query.all()
+
+    @staticmethod
+    def revenue_series(start_date, end_date, granularity='day', split=None):
+        """Виторг і кількість проданого за інтервалами hour/day/week/month, з нулями для порожніх інтервалів.
+
+        split='category' або 'department' розбиває ряд за категоріями чи відділами товарів.
+        Повертає список кортежів (інтервал, група, виторг, кількість).
+        """
+        if db.engine.dialect.name == 'postgresql':
+            return _revenue_series_pg(start_date, end_date, granularity, split)
+        return _revenue_series_generic(start_date, end_date, granularity, split)
+
+    @staticmethod
+    def reorder_recommendations(cover_days=30, lead_time_days=7, today=None):
+        if not today:
+            today = date.today()
+
+        windows = {'sold_7': 7, 'sold_30': 30, 'sold_90': 90}
+
+        sales = (
+            db.session.query(
+                SaleItem.product_id.label('product_id'),
+                *[
+                    func.sum(case(
+                        (Sale.sale_date > today - timedelta(days=days), SaleItem.quantity),
+                        else_=0
+                    )).label(label)
+                    for label, days in windows.items()
+                ]
+            )
             .join(Sale, Sale.id == SaleItem.sale_id)
-            .filter(Sale.sale_date >= start_date, Sale.sale_date <= end_date)
+            .filter(Sale.sale_date > today - timedelta(days=max(windows.values())), Sale.sale_date <= today)
+            .group_by(SaleItem.product_id)
+            .subquery()
         )
 
-        total_result = total_query.first()
-        total_sales = total_result.total_sales if total_result.total_sales else 0
+        ranked_contracts = (
+            db.session.query(
+                ContractProduct.product_id.label('product_id'),
+                Contract.contract_number.label('contract_number'),
+                ContractProduct.quantity_per_delivery.label('quantity_per_delivery'),
+                ContractProduct.purchase_price.label('purchase_price'),
+                func.row_number().over(
+                    partition_by=ContractProduct.product_id,
+                    order_by=(ContractProduct.purchase_price, ContractProduct.id)
+                ).label('position')
+            )
+            .join(Contract, Contract.id == ContractProduct.contract_id)
+            .filter(Contract.active_on(today))
+            .subquery()
+        )
 
-        category_query = (
+        rows = (
             db.session.query(
-                ProductCategory.name,
-                func.sum(SaleItem.total_price).label('category_sales')
+                Product.id, Product.name, Product.stock_quantity,
+                sales.c.sold_7, sales.c.sold_30, sales.c.sold_90,
+                ranked_contracts.c.contract_number,
+                ranked_contracts.c.quantity_per_delivery,
+                ranked_contracts.c.purchase_price
             )
-            .select_from(ProductCategory)
-            .join(Product, Product.category_id == ProductCategory.id)
-            .join(SaleItem, SaleItem.product_id == Product.id)
-            .join(Sale, Sale.id == SaleItem.sale_id)
-            .filter(Sale.sale_date >= start_date, Sale.sale_date <= end_date)
-            .group_by(ProductCategory.id, ProductCategory.name)
+            .outerjoin(sales, sales.c.product_id == Product.id)
+            .outerjoin(ranked_contracts, and_(
+                ranked_contracts.c.product_id == Product.id,
+                ranked_contracts.c.position == 1
+            ))
+            .filter(Product.is_deleted == False)
+            .all()
         )
 
-        category_results = category_query.all()
+        result = []
+        for row in rows:
+            stock = row.stock_quantity or 0
+            sold_30 = row.sold_30 or 0
+            velocity = sold_30 / 30
+            days_of_stock = round(stock / velocity, 1) if velocity else None
 
-        return {
-            'total_sales': total_sales,
-            'by_category': category_results,
-            'start_date': start_date.strftime('%Y-%m-%d'),
-            'end_date': end_date.strftime('%Y-%m-%d')
-        }
+            shortage = math.ceil(velocity * (lead_time_days + cover_days)) - stock
+            proposed = 0
+            if shortage > 0 and row.quantity_per_delivery:
+                proposed = math.ceil(shortage / row.quantity_per_delivery) * row.quantity_per_delivery
+
+            result.append({
+                'product_id': row.id,
+                'name': row.name,
+                'stock_quantity': stock,
+                'sold_7': row.sold_7 or 0,
+                'sold_30': sold_30,
+                'sold_90': row.sold_90 or 0,
+                'daily_velocity': round(velocity, 3),
+                'days_of_stock': days_of_stock,
+                'needs_reorder': shortage > 0,
+                'contract_number': row.contract_number,
+                'quantity_per_delivery': row.quantity_per_delivery,
+                'purchase_price': row.purchase_price,
+                'proposed_quantity': proposed
+            })
+
+        result.sort(key=lambda item: (item['days_of_stock'] is None, item['days_of_stock'] or 0))
+        return result
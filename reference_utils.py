@@ -0,0 +1,54 @@
+import os
+import time
+import threading
+from collections import namedtuple
+from models import db, Department, ProductCategory
+from etag_utils import get_versions, register_change_listener
+
+# як часто перевіряти лічильник змін, записаний іншими воркерами; власні зміни скидають кеш одразу
+CHECK_INTERVAL = float(os.getenv('REFERENCE_CHECK_INTERVAL', 5))
+
+REFERENCE_MODELS = (Department, ProductCategory)
+
+_records = {
+    model.__tablename__: namedtuple(model.__name__ + 'Ref', [column.name for column in model.__table__.columns])
+    for model in REFERENCE_MODELS
+}
+_cache = {}  # назва таблиці -> (версія, час перевірки, записи)
+_lock = threading.Lock()
+
+def _load(model):
+    record = _records[model.__tablename__]
+    columns = [getattr(model, name) for name in record._fields]
+    return tuple(record(*row) for row in db.session.query(*columns).order_by(model.id))
+
+def _reference(model):
+    name = model.__tablename__
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(name)
+    if entry and now - entry[1] < CHECK_INTERVAL:
+        return entry[2]
+
+    version = get_versions([name])[name]
+    if entry and entry[0] == version:
+        items = entry[2]
+    else:
+        items = _load(model)
+    with _lock:
+        _cache[name] = (version, now, items)
+    return items
+
+def get_departments():
+    """Відділи як незмінні записи (id, name, description) у порядку id."""
+    return _reference(Department)
+
+def get_product_categories():
+    """Категорії як незмінні записи (id, name, description) у порядку id."""
+    return _reference(ProductCategory)
+
+@register_change_listener
+def invalidate_reference(names):
+    with _lock:
+        for name in names:
+            _cache.pop(name, None)
@@ -0,0 +1,917 @@
+from flask import Blueprint, Response, render_template, request, jsonify, url_for, send_file, abort, current_app, stream_with_context
+from models import db, SavedQuery, ReportJob
+from queries import BookstoreQueries, SERIES_STEPS, SERIES_SPLITS
+from datetime import datetime, date, timedelta
+from flask_login import current_user
+from sqlalchemy import text
+from history_utils import add_history_entry, load_history
+from json_utils import iter_json_array, iter_json_object, stream_json, json_response
+from saved_query_utils import (
+    SavedQueryError, validate_sql, query_parameters, run_read_only, run_saved_query, get_saved_query_stats,
+    invalidate_saved_query, bind_values
+)
+from job_utils import JOB_KINDS, JobLimitExceeded, JobSubmitFailed, submit_job, cancel_job
+from comparison_utils import METRICS, PERIOD_TYPES, MAX_PERIODS, split_periods, compare_periods, summarize
+from cube_utils import DIMENSIONS, slice_sales
+from export_utils import DATASETS as EXPORT_DATASETS, FORMATS as EXPORT_FORMATS, month_bounds, export_partitions, iter_export
+from view_utils import requires_operator_or_admin, requires_authorized_or_above, limit_reports_per_user, parse_date
+from etag_utils import etag_cached
+import os
+import json
+
+bp = Blueprint('reports', __name__)
+
+@bp.route('/reports')
+@requires_authorized_or_above
+def reports():
+    current_month = datetime.now().month
+    current_year = datetime.now().year
+    return render_template(
+        'reports.html',
+        current_month=current_month,
+        current_year=current_year,
+        datetime=datetime,
+        timedelta=timedelta
+    )
+
+@bp.route('/api/custom-sql', methods=['POST'])
+@requires_operator_or_admin
+def api_custom_sql():
+    sql = request.form.get('sql')
+
+    if not sql:
+        return jsonify({'error': 'SQL запит порожній'})
+
+    dangerous = ['drop ', 'delete ', 'alter ', 'truncate ', 'update ']
+    if any(word in sql.lower() for word in dangerous):
+        return jsonify({'error': 'Небезпечні команди заборонено!'})
+
+    try:
+        rows = run_read_only(sql)['rows']
+
+        add_history_entry(
+            current_user.id,
+            "Кастомний SQL-запит",
+            params=f"SQL-запит: {sql}",
+            result_text=f"Отримано {len(rows)} рядків"
+        )
+
+        return jsonify({'rows': rows})
+
+    except Exception as e:
+        add_history_entry(
+            current_user.id,
+            "Кастомний SQL-запит",
+            params=f"SQL-запит: {sql}",
+            result_text=f"Помилка виконання: {str(e)}"
+        )
+        return jsonify({'error': str(e)})
+
+def saved_query_to_dict(saved_query):
+    return {
+        'id': saved_query.id,
+        'name': saved_query.name,
+        'description': saved_query.description,
+        'sql': saved_query.sql_text,
+        'params': query_parameters(saved_query.sql_text),
+        'author': saved_query.author.username if saved_query.author else None,
+        'updated_at': saved_query.updated_at,
+        'stats': get_saved_query_stats(saved_query.id)
+    }
+
+@bp.route('/api/saved-queries')
+@requires_operator_or_admin
+def api_saved_queries():
+    saved_queries = SavedQuery.query.order_by(SavedQuery.name).all()
+    return json_response([saved_query_to_dict(saved_query) for saved_query in saved_queries])
+
+@bp.route('/api/saved-queries', methods=['POST'])
+@requires_operator_or_admin
+def api_create_saved_query():
+    payload = request.get_json(silent=True) or request.form
+    name = (payload.get('name') or '').strip()
+
+    if not name:
+        return jsonify({'error': 'Вкажіть назву запиту'}), 400
+
+    try:
+        sql = validate_sql(payload.get('sql'))
+    except SavedQueryError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if SavedQuery.query.filter_by(name=name).first():
+        return jsonify({'error': 'Запит з такою назвою вже існує'}), 409
+
+    saved_query = SavedQuery(
+        name=name,
+        description=payload.get('description'),
+        sql_text=sql,
+        created_by=current_user.id
+    )
+    db.session.add(saved_query)
+    db.session.commit()
+
+    return json_response(saved_query_to_dict(saved_query)), 201
+
+@bp.route('/api/saved-queries/<int:query_id>/delete', methods=['POST'])
+@requires_operator_or_admin
+def api_delete_saved_query(query_id):
+    saved_query = SavedQuery.query.get_or_404(query_id)
+    db.session.delete(saved_query)
+    db.session.commit()
+    invalidate_saved_query(query_id)
+    return jsonify({'deleted': query_id})
+
+@bp.route('/api/saved-queries/<int:query_id>/run', methods=['POST'])
+@requires_operator_or_admin
+def api_run_saved_query(query_id):
+    saved_query = SavedQuery.query.get_or_404(query_id)
+    payload = request.get_json(silent=True) or {}
+    params = payload.get('params') or {}
+    user_id = current_user.id
+
+    try:
+        result = run_saved_query(saved_query, params)
+    except SavedQueryError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        add_history_entry(
+            user_id,
+            f"Збережений запит: {saved_query.name}",
+            params=f"Параметри: {params}",
+            result_text=f"Помилка виконання: {str(e)}"
+        )
+        return jsonify({'error': str(e)}), 400
+
+    add_history_entry(
+        user_id,
+        f"Збережений запит: {saved_query.name}",
+        params=f"Параметри: {params}",
+        result_text=f"Отримано {len(result['rows'])} рядків" + (" (з кешу)" if result['cached'] else "")
+    )
+
+    result['stats'] = get_saved_query_stats(saved_query.id)
+    return json_response(result)
+
+def job_to_dict(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'params': json.loads(job.params),
+        'status': job.status,
+        'row_count': job.row_count,
+        'error': job.error,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+        'expires_at': job.expires_at,
+        'download_url': url_for('reports.api_download_job', job_id=job.id) if job.status == 'done' else None
+    }
+
+def get_own_job(job_id):
+    job = ReportJob.query.get_or_404(job_id)
+    if job.user_id != current_user.id and current_user.role != 'administrator':
+        abort(404)
+    return job
+
+def job_params_from_request(kind, payload):
+    """Перевіряє параметри завдання до постановки в чергу; повертає dict для збереження."""
+    if kind == 'query6':
+        target_date = parse_date(payload.get('target_date'))
+        month = payload.get('month')
+        return {
+            'target_date': target_date.isoformat() if target_date else None,
+            'month': int(month) if str(month or '').isdigit() else None,
+            'category': payload.get('category') or None,
+            'supplier': payload.get('supplier') or None
+        }
+
+    if current_user.role not in ('operator', 'administrator'):
+        raise SavedQueryError('Недостатньо прав для цього типу завдання')
+
+    if kind == 'custom_sql':
+        return {'sql': validate_sql(payload.get('sql'))}
+
+    saved_query = SavedQuery.query.get(payload.get('query_id') or 0)
+    if saved_query is None:
+        raise SavedQueryError('Збережений запит не знайдено')
+    params = payload.get('params') or {}
+    bind_values(saved_query.sql_text, params)
+    return {'query_id': saved_query.id, 'params': params}
+
+@bp.route('/api/jobs')
+@requires_authorized_or_above
+def api_jobs():
+    jobs = ReportJob.query.filter_by(user_id=current_user.id).order_by(ReportJob.created_at.desc()).limit(50)
+    return json_response([job_to_dict(job) for job in jobs])
+
+@bp.route('/api/jobs', methods=['POST'])
+@requires_authorized_or_above
+def api_submit_job():
+    payload = request.get_json(silent=True) or {}
+    kind = payload.get('kind')
+
+    if kind not in JOB_KINDS:
+        return jsonify({'error': 'Невідомий тип завдання'}), 400
+
+    try:
+        params = job_params_from_request(kind, payload)
+        job = submit_job(current_user.id, kind, params)
+    except SavedQueryError as e:
+        return jsonify({'error': str(e)}), 400
+    except JobLimitExceeded:
+        return jsonify({'error': 'Забагато активних завдань. Дочекайтеся завершення або скасуйте попередні.'}), 429
+    except JobSubmitFailed:
+        return jsonify({'error': 'Не вдалося запустити фонове завдання. Спробуйте пізніше.'}), 503
+
+    add_history_entry(
+        current_user.id,
+        "Фонове завдання",
+        params=f"Тип: {kind}; параметри: {params}",
+        result_text=f"Завдання #{job.id} поставлено в чергу"
+    )
+
+    return json_response(job_to_dict(job)), 202
+
+@bp.route('/api/jobs/<int:job_id>')
+@requires_authorized_or_above
+def api_job_status(job_id):
+    return json_response(job_to_dict(get_own_job(job_id)))
+
+@bp.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+@requires_authorized_or_above
+def api_cancel_job(job_id):
+    job = get_own_job(job_id)
+    if not cancel_job(job):
+        return jsonify({'error': 'Завдання вже завершено'}), 409
+    return jsonify({'cancelled': job_id})
+
+@bp.route('/api/jobs/<int:job_id>/download')
+@requires_authorized_or_above
+def api_download_job(job_id):
+    job = get_own_job(job_id)
+    if job.status != 'done' or not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({'error': 'Результат недоступний'}), 404
+    return send_file(
+        os.path.abspath(job.result_path),
+        mimetype='application/json',
+        as_attachment=True,
+        download_name=f'report_job_{job.id}.json'
+    )
+
+STREAM_BATCH_SIZE = 500
+
+# таблиці, від яких залежать звіти: їхні лічильники змін утворюють ETag відповіді
+EMPLOYEE_TABLES = ('employees', 'departments')
+SALES_TABLES = ('sales', 'sale_items', 'products', 'product_categories')
+SUPPLY_TABLES = ('suppliers', 'contracts', 'contract_products', 'products', 'product_categories')
+
+def row_to_dict(row):
+    return row._asdict()
+
+@bp.route('/api/query1')
+@requires_authorized_or_above
+@etag_cached(*EMPLOYEE_TABLES, daily=True, history="Запит 1: Інформація про співробітників")
+@limit_reports_per_user
+def api_query1():
+    department_name = request.args.get('department')
+    managers_only = request.args.get('managers_only', 'false').lower() == 'true'
+    on_vacation_only = request.args.get('on_vacation_only', 'false').lower() == 'true'
+
+    employees = BookstoreQueries.query_1_employees_info(
+        department_name=department_name,
+        managers_only=managers_only,
+        on_vacation_only=on_vacation_only,
+        as_query=True,
+        projection=True
+    )
+    user_id = current_user.id
+
+    def record(count):
+        add_history_entry(
+            user_id,
+            "Запит 1: Інформація про співробітників",
+            params=(
+                f"Відділ: {department_name or 'усі'}; "
+                f"лише менеджери: {'так' if managers_only else 'ні'}; "
+                f"у відпустці: {'так' if on_vacation_only else 'ні'}"
+            ),
+            result_text=f"Отримано {count} записів"
+        )
+
+    return stream_json(iter_json_array(employees.yield_per(STREAM_BATCH_SIZE), row_to_dict, on_complete=record))
+
+@bp.route('/api/query2')
+@requires_authorized_or_above
+@etag_cached(*SALES_TABLES, daily=True, history="Запит 2: Аналіз виторгу")
+@limit_reports_per_user
+def api_query2():
+    start_date = parse_date(request.args.get('start_date'))
+    end_date = parse_date(request.args.get('end_date'))
+    category = request.args.get('category')
+
+    revenue = BookstoreQueries.query_2_revenue_analysis(
+        start_date=start_date,
+        end_date=end_date,
+        category_name=category
+    )
+
+    add_history_entry(
+        current_user.id,
+        "Запит 2: Аналіз виторгу",
+        params=(
+            f"Період: {start_date or 'не вказано'} — {end_date or 'не вказано'}; "
+            f"категорія: {category or 'усі'}"
+        ),
+        result_text=f"Виторг: {float(revenue)} грн"
+    )
+
+    return jsonify({
+        'revenue': float(revenue),
+        'period': f"{start_date} — {end_date}" if start_date and end_date else "Поточний місяць",
+        'category': category or "Всі категорії"
+    })
+
+@bp.route('/api/query3')
+@requires_authorized_or_above
+@etag_cached('contracts', 'suppliers', daily=True, history="Запит 3: Договори за періодом")
+@limit_reports_per_user
+def api_query3():
+    period = request.args.get('period', 'month')
+
+    contracts = BookstoreQueries.query_3_contracts_by_period(
+        period_type=period,
+        as_query=True,
+        projection=True
+    )
+    user_id = current_user.id
+
+    def record(count):
+        add_history_entry(
+            user_id,
+            "Запит 3: Договори за періодом",
+            params=f"Період: {period}",
+            result_text=f"Знайдено {count} договорів"
+        )
+
+    return stream_json(iter_json_array(contracts.yield_per(STREAM_BATCH_SIZE), row_to_dict, on_complete=record))
+
+@bp.route('/api/query4')
+@requires_authorized_or_above
+@etag_cached(*SUPPLY_TABLES, daily=True, history="Запит 4: Постачальники без товарів категорій")
+@limit_reports_per_user
+def api_query4():
+    categories = [name for name in request.args.getlist('category') if name]
+
+    suppliers = BookstoreQueries.query_4_suppliers_without_categories(
+        category_names=categories,
+        as_query=True,
+        projection=True
+    )
+    user_id = current_user.id
+
+    def record(count):
+        add_history_entry(
+            user_id,
+            "Запит 4: Постачальники без товарів категорій",
+            params=f"Категорії: {', '.join(categories) if categories else 'настільні ігри'}",
+            result_text=f"Знайдено {count} постачальників"
+        )
+
+    return stream_json(iter_json_array(suppliers.yield_per(STREAM_BATCH_SIZE), row_to_dict, on_complete=record))
+
+@bp.route('/api/query5')
+@requires_authorized_or_above
+@etag_cached('sales', 'employees', 'departments', daily=True, history="Запит 5: Найкращі продавці")
+@limit_reports_per_user
+def api_query5():
+    min_amount = request.args.get('min_amount', 200)
+    period = request.args.get('period') or 'day'
+    target_date = parse_date(request.args.get('target_date'))
+
+    try:
+        sellers = BookstoreQueries.query_5_top_sellers(
+            min_amount=float(min_amount),
+            period_type=period,
+            target_date=target_date,
+            as_query=True
+        )
+    except ValueError:
+        return jsonify({'error': 'Некоректні параметри: період має бути day, week або month, сума — числом'}), 400
+    user_id = current_user.id
+
+    def to_dict(row):
+        emp, total_sales, sales_count = row
+        return {
+            'full_name': emp.full_name,
+            'department': emp.department.name,
+            'total_sales': total_sales,
+            'sales_count': sales_count
+        }
+
+    def record(count):
+        add_history_entry(
+            user_id,
+            "Запит 5: Найкращі продавці",
+            params=(
+                f"Мінімальна сума продажів: {min_amount} грн; "
+                f"період: {period}; "
+                f"дата: {target_date or 'не вказано'}"
+            ),
+            result_text=f"Знайдено {count} продавців"
+        )
+
+    return stream_json(iter_json_array(sellers.yield_per(STREAM_BATCH_SIZE), to_dict, on_complete=record))
+
+@bp.route('/api/query6')
+@requires_authorized_or_above
+@etag_cached(*SALES_TABLES, 'employees', 'suppliers', 'contracts', 'contract_products', daily=True, history="Запит 6: Деталі продажів")
+@limit_reports_per_user
+def api_query6():
+    target_date = parse_date(request.args.get('target_date'))
+    month_raw = request.args.get('month')
+    month = int(month_raw) if month_raw and month_raw.isdigit() else None
+    category_name = request.args.get('category')
+    supplier_name = request.args.get('supplier')
+
+    sales_info = BookstoreQueries.query_6_sales_info(
+        target_date=target_date,
+        month=month,
+        category_name=category_name,
+        supplier_name=supplier_name,
+        as_query=True,
+        projection=True
+    )
+    user_id = current_user.id
+
+    def record(count):
+        add_history_entry(
+            user_id,
+            "Запит 6: Деталі продажів",
+            params=(
+                f"Дата: {target_date or 'не вказано'}; "
+                f"місяць: {month or 'не вказано'}; "
+                f"категорія: {category_name or 'усі'}; "
+                f"постачальник: {supplier_name or 'усі'}"
+            ),
+            result_text=f"Знайдено {count} продажів"
+        )
+
+    filters = {
+        "target_date": request.args.get('target_date'),
+        "month": month,
+        "category": category_name,
+        "supplier": supplier_name
+    }
+
+    return stream_json(iter_json_object(
+        {"filters": filters}, "sales",
+        sales_info.yield_per(STREAM_BATCH_SIZE), row_to_dict,
+        on_complete=record
+    ))
+
+@bp.route('/api/query7')
+@requires_authorized_or_above
+@etag_cached(*EMPLOYEE_TABLES, 'work_schedules', daily=True, history="Запит 7: Співробітники за день")
+@limit_reports_per_user
+def api_query7():
+    raw_date = request.args.get('target_date')
+    department_name = request.args.get('department')
+    target_date = parse_date(raw_date) if raw_date else None
+
+    employees = BookstoreQueries.query_7_employee_count(
+        target_date=target_date,
+        department_name=department_name,
+        as_query=True,
+        projection=True
+    )
+    user_id = current_user.id
+
+    def to_dict(row):
+        result = row._asdict()
+        result['shift_start'] = row.shift_start.strftime('%H:%M')
+        result['shift_end'] = row.shift_end.strftime('%H:%M')
+        return result
+
+    def record(count):
+        add_history_entry(
+            user_id,
+            "Запит 7: Співробітники за день",
+            params=(
+                f"Дата: {raw_date or 'не вказано'}; "
+                f"відділ: {department_name or 'усі'}"
+            ),
+            result_text=f"Працівників у зміні: {count}"
+        )
+
+    return stream_json(iter_json_object(
+        {'date': raw_date or "Не вказано", 'department': department_name or "Всі відділи"},
+        'employees',
+        employees.yield_per(STREAM_BATCH_SIZE), to_dict,
+        tail=lambda count: {'count': count},
+        on_complete=record
+    ))
+
+@bp.route('/api/query8')
+@requires_authorized_or_above
+@etag_cached('contracts', 'suppliers', daily=True, history="Запит 8: Постачальник за номером договору")
+@limit_reports_per_user
+def api_query8():
+    contract_number = request.args.get('contract_number')
+
+    if not contract_number:
+        return jsonify({'error': 'Contract number is required'}), 400
+
+    result = BookstoreQueries.query_8_supplier_by_contract(contract_number)
+
+    if not result:
+        add_history_entry(
+            current_user.id,
+            "Запит 8: Постачальник за номером договору",
+            params=f"Номер договору: {contract_number}",
+            result_text="Договір не знайдено"
+        )
+        return jsonify({'error': 'Договір не знайдено'}), 404
+
+    supplier, contract = result
+
+    add_history_entry(
+        current_user.id,
+        "Запит 8: Постачальник за номером договору",
+        params=f"Номер договору: {contract_number}",
+        result_text=f"Постачальник: {supplier.name}"
+    )
+
+    return jsonify({
+        'supplier': {
+            'id': supplier.id,
+            'name': supplier.name,
+            'contact_person': supplier.contact_person,
+            'phone': supplier.phone,
+            'email': supplier.email,
+            'address': supplier.address
+        },
+        'contract': {
+            'id': contract.id,
+            'contract_number': contract.contract_number,
+            'start_date': contract.start_date.strftime('%Y-%m-%d'),
+            'end_date': contract.end_date.strftime('%Y-%m-%d')
+        }
+    })
+
+@bp.route('/api/query9')
+@requires_authorized_or_above
+@etag_cached('deliveries', 'delivery_items', 'contracts', 'suppliers', 'supplier_scorecards', daily=True, history="Запит 9: Вартість товарів від постачальника")
+@limit_reports_per_user
+def api_query9():
+    supplier_name = request.args.get('supplier_name')
+    target_date = parse_date(request.args.get('target_date'))
+
+    total_value = BookstoreQueries.query_9_supplier_product_value(
+        supplier_name=supplier_name,
+        target_date=target_date
+    )
+
+    add_history_entry(
+        current_user.id,
+        "Запит 9: Вартість товарів від постачальника",
+        params=f"Постачальник: {supplier_name or 'не вказано'}; дата: {target_date or 'не вказано'}",
+        result_text=f"Сума: {float(total_value)} грн"
+    )
+
+    return jsonify({
+        'supplier_name': supplier_name,
+        'total_value': float(total_value),
+        'date': target_date.strftime('%Y-%m-%d') if target_date else date.today().strftime('%Y-%m-%d')
+    })
+
+@bp.route('/api/query10')
+@requires_authorized_or_above
+@etag_cached(*SALES_TABLES, daily=True, history="Запит 10: Тижневий аналіз продажів")
+@limit_reports_per_user
+def api_query10():
+    from_date = parse_date(request.args.get('from_date'))
+
+    if not from_date:
+        from_date = date.today()
+
+    result = BookstoreQueries.query_10_weekly_sales_analysis(from_date=from_date)
+
+    categories = []
+    for cat_name, cat_sales in result['by_category']:
+        categories.append({
+            'category': cat_name,
+            'sales': float(cat_sales)
+        })
+
+    add_history_entry(
+        current_user.id,
+        "Запит 10: Тижневий аналіз продажів",
+        params=f"Дата початку аналізу: {from_date}",
+        result_text=f"Сума продажів за період: {float(result['total_sales'])} грн"
+    )
+
+    return jsonify({
+        'total_sales': float(result['total_sales']),
+        'by_category': categories,
+        'start_date': result['start_date'],
+        'end_date': result['end_date']
+    })
+
+@bp.route('/api/sales-cube')
+@requires_authorized_or_above
+@limit_reports_per_user
+def api_sales_cube():
+    group_by = [name.strip() for name in request.args.get('group_by', '').split(',') if name.strip()]
+    if any(name not in DIMENSIONS for name in group_by) or len(set(group_by)) != len(group_by):
+        return jsonify({'error': f"Невідомий або повторений вимір. Допустимі: {', '.join(DIMENSIONS)}"}), 400
+
+    start_date = parse_date(request.args.get('start_date'))
+    end_date = parse_date(request.args.get('end_date'))
+
+    groups, totals, scanned = slice_sales(
+        group_by,
+        start_date=start_date,
+        end_date=end_date,
+        departments=request.args.getlist('department', type=int),
+        categories=request.args.getlist('category', type=int),
+        employees=request.args.getlist('employee', type=int)
+    )
+
+    return json_response({
+        'group_by': group_by,
+        'start_date': start_date,
+        'end_date': end_date,
+        'groups': groups,
+        'totals': totals,
+        'rows_scanned': scanned
+    })
+
+def export_range():
+    """Діапазон експорту: month=YYYY-MM або start_date/end_date; None, якщо місяць некоректний."""
+    month = request.args.get('month')
+    if month:
+        try:
+            return month_bounds(month)
+        except ValueError:
+            return None
+    return parse_date(request.args.get('start_date')), parse_date(request.args.get('end_date'))
+
+@bp.route('/api/export/<dataset>')
+@requires_authorized_or_above
+@limit_reports_per_user
+def api_export(dataset):
+    fmt = request.args.get('format', 'parquet')
+    if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Доступні набори: {', '.join(EXPORT_DATASETS)}; формати: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    bounds = export_range()
+    if bounds is None:
+        return jsonify({'error': 'Місяць має бути у форматі YYYY-MM'}), 400
+    start_date, end_date = bounds
+    user_id = current_user.id
+
+    def record(count):
+        add_history_entry(
+            user_id,
+            "Колонковий експорт",
+            params=f"Набір: {dataset}; формат: {fmt}; період: {start_date or 'початок'} — {end_date or 'кінець'}",
+            result_text=f"Вивантажено {count} рядків"
+        )
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    period = request.args.get('month') or f"{start_date or 'all'}_{end_date or 'all'}"
+    response = Response(
+        stream_with_context(iter_export(dataset, fmt, start_date, end_date, on_complete=record)),
+        mimetype=mimetype
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{dataset}_{period}.{extension}"'
+    return response
+
+@bp.route('/api/export/<dataset>/partitions')
+@requires_authorized_or_above
+def api_export_partitions(dataset):
+    fmt = request.args.get('format', 'parquet')
+    if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Доступні набори: {', '.join(EXPORT_DATASETS)}; формати: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    start_date = parse_date(request.args.get('start_date'))
+    end_date = parse_date(request.args.get('end_date'))
+    partitions = export_partitions(dataset, start_date, end_date)
+    for partition in partitions:
+        partition['download_url'] = url_for(
+            'reports.api_export', dataset=dataset, month=partition['month'], format=fmt
+        )
+    return json_response({'dataset': dataset, 'format': fmt, 'partitions': partitions})
+
+MAX_SERIES_POINTS = 10000
+
+@bp.route('/api/revenue-series')
+@requires_authorized_or_above
+@limit_reports_per_user
+def api_revenue_series():
+    granularity = request.args.get('granularity', 'day')
+    split = request.args.get('split') or None
+    end_date = parse_date(request.args.get('end_date')) or date.today()
+    start_date = parse_date(request.args.get('start_date')) or end_date - timedelta(days=29)
+
+    if granularity not in SERIES_STEPS:
+        return jsonify({'error': 'Невідомий інтервал: допустимі hour, day, week, month'}), 400
+    if split and split not in SERIES_SPLITS:
+        return jsonify({'error': 'Розбивка можлива лише за category або department'}), 400
+    if start_date > end_date:
+        return jsonify({'error': 'Дата початку пізніша за дату завершення'}), 400
+
+    days = (end_date - start_date).days + 1
+    if granularity == 'hour' and days * 24 > MAX_SERIES_POINTS or days > MAX_SERIES_POINTS:
+        return jsonify({'error': 'Забагато інтервалів: зменшіть період або збільште інтервал'}), 400
+
+    series = BookstoreQueries.revenue_series(start_date, end_date, granularity=granularity, split=split)
+
+    points = []
+    for bucket, group, revenue, quantity in series:
+        point = {'bucket': bucket, 'revenue': revenue, 'quantity': quantity}
+        if split:
+            point['group'] = group
+        points.append(point)
+
+    add_history_entry(
+        current_user.id,
+        "Динаміка виторгу",
+        params=(
+            f"Період: {start_date} — {end_date}; "
+            f"інтервал: {granularity}; "
+            f"розбивка: {split or 'немає'}"
+        ),
+        result_text=f"Отримано {len(points)} точок"
+    )
+
+    return json_response({
+        'start_date': start_date,
+        'end_date': end_date,
+        'granularity': granularity,
+        'split': split,
+        'series': points
+    })
+
+@bp.route('/api/compare')
+@requires_authorized_or_above
+@limit_reports_per_user
+def api_compare():
+    metric = request.args.get('metric', 'revenue')
+    period_type = request.args.get('period', 'month')
+    end_date = parse_date(request.args.get('end_date')) or date.today()
+    start_date = parse_date(request.args.get('start_date')) or end_date.replace(month=1, day=1)
+
+    if metric not in METRICS:
+        return jsonify({'error': 'Невідома метрика: допустимі revenue, top_sellers'}), 400
+    if period_type not in PERIOD_TYPES:
+        return jsonify({'error': 'Невідомий період: допустимі week, month, quarter, year'}), 400
+    if start_date > end_date:
+        return jsonify({'error': 'Дата початку пізніша за дату завершення'}), 400
+
+    periods = split_periods(start_date, end_date, period_type)
+    if len(periods) > MAX_PERIODS:
+        return jsonify({'error': f'Забагато періодів (більше {MAX_PERIODS}): зменшіть діапазон або збільште період'}), 400
+
+    if metric == 'revenue':
+        options = {'category_name': request.args.get('category') or None}
+    else:
+        options = {
+            'min_amount': request.args.get('min_amount', 0, type=float),
+            'top': request.args.get('top', 5, type=int)
+        }
+
+    results, overall = compare_periods(current_app._get_current_object(), metric, periods, **options)
+    summary = summarize(metric, results, overall)
+
+    add_history_entry(
+        current_user.id,
+        "Порівняння періодів",
+        params=(
+            f"Метрика: {metric}; період: {period_type}; "
+            f"діапазон: {start_date} — {end_date}"
+        ),
+        result_text=f"Порівняно {len(results)} періодів"
+    )
+
+    return json_response(dict(summary, metric=metric, period=period_type, periods=results))
+
+def begin_report_snapshot():
+    # звіти дашборду читаються з одного знімка БД, а не з кількох транзакцій
+    db.session.close()
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY'))
+
+@bp.route('/api/dashboard')
+@requires_authorized_or_above
+@limit_reports_per_user
+def api_dashboard():
+    user_id = current_user.id
+
+    begin_report_snapshot()
+    summary = BookstoreQueries.dashboard_summary()
+    today = summary['date']
+
+    top_sellers = [
+        {
+            'full_name': emp.full_name,
+            'department': emp.department.name,
+            'total_sales': total_sales,
+            'sales_count': sales_count
+        }
+        for emp, total_sales, sales_count in summary['top_sellers']
+    ]
+
+    shifts = []
+    for row in summary['shifts']['employees']:
+        shift = row._asdict()
+        shift['shift_start'] = row.shift_start.strftime('%H:%M')
+        shift['shift_end'] = row.shift_end.strftime('%H:%M')
+        shifts.append(shift)
+
+    weekly = summary['weekly_sales']
+
+    payload = {
+        'query1': [row._asdict() for row in summary['employees']],
+        'query2': {
+            'revenue': summary['revenue']['revenue'],
+            'period': "Поточний місяць",
+            'category': "Всі категорії"
+        },
+        'query3': [row._asdict() for row in summary['contracts']],
+        'query4': [row._asdict() for row in summary['suppliers']],
+        'query5': top_sellers,
+        'query6': {
+            'filters': {'target_date': today, 'month': None, 'category': None, 'supplier': None},
+            'sales': [row._asdict() for row in summary['sales']]
+        },
+        'query7': {
+            'date': today,
+            'department': "Всі відділи",
+            'employees': shifts,
+            'count': summary['shifts']['count']
+        },
+        'query10': {
+            'total_sales': weekly['total_sales'],
+            'by_category': [{'category': name, 'sales': sales} for name, sales in weekly['by_category']],
+            'start_date': weekly['start_date'],
+            'end_date': weekly['end_date']
+        }
+    }
+
+    db.session.commit()
+
+    add_history_entry(
+        user_id,
+        "Дашборд звітів",
+        params=f"Дата: {today}",
+        result_text=(
+            f"Співробітників: {len(payload['query1'])}; "
+            f"продажів за день: {len(payload['query6']['sales'])}; "
+            f"виторг за тиждень: {float(weekly['total_sales'])} грн"
+        )
+    )
+
+    return json_response(payload)
+
+@bp.route('/api/reorder')
+@requires_operator_or_admin
+def api_reorder():
+    cover_days = request.args.get('cover_days', 30, type=int)
+    lead_days = request.args.get('lead_days', 7, type=int)
+    only_needed = request.args.get('only_needed', 'true').lower() == 'true'
+
+    if cover_days is None or lead_days is None or cover_days < 0 or lead_days < 0:
+        return jsonify({'error': 'Кількість днів має бути невід\'ємним числом'}), 400
+
+    recommendations = BookstoreQueries.reorder_recommendations(
+        cover_days=cover_days,
+        lead_time_days=lead_days
+    )
+
+    result = []
+    for item in recommendations:
+        if only_needed and not item['needs_reorder']:
+            continue
+        item['purchase_price'] = float(item['purchase_price']) if item['purchase_price'] is not None else None
+        result.append(item)
+
+    add_history_entry(
+        current_user.id,
+        "Звіт: Рекомендації щодо дозамовлення",
+        params=f"Запас на {cover_days} дн.; термін поставки: {lead_days} дн.",
+        result_text=f"Товарів до дозамовлення: {sum(1 for item in result if item['needs_reorder'])}"
+    )
+
+    return jsonify({
+        'cover_days': cover_days,
+        'lead_days': lead_days,
+        'products': result
+    })
+
+@bp.route('/my_history')
+@requires_authorized_or_above
+def my_history():
+    history = load_history(current_user.id)
+    return render_template("my_history.html", history=history)
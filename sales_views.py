@@ -0,0 +1,286 @@
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+from flask_login import current_user
+from sqlalchemy import func
+from models import db, Department, Employee, Product, Sale, SaleItem
+from queries import EMPLOYEE_FULL_NAME
+from datetime import datetime, date
+from concurrency_utils import EditConflict, claim_version, adjust_stock
+from search_utils import lookup_department_products
+from view_utils import requires_operator_or_admin, requires_authorized_or_above
+from fragment_utils import cached_fragment
+from cube_utils import append_new_sales, invalidate_sales_cube
+
+bp = Blueprint('sales', __name__)
+
+SALES_PAGE_SIZE = 50
+
+@bp.route('/sales')
+@requires_authorized_or_above
+def sales():
+    today = date.today()
+    can_edit = current_user.role in ('administrator', 'operator')
+    sale_rows = cached_fragment(
+        'sale_rows', ('sales', 'sale_items', 'employees', 'departments'),
+        lambda: render_template('fragments/sale_rows.html', sales=sale_view_models(), can_edit=can_edit),
+        can_edit
+    )
+    today_summary = cached_fragment(
+        'sales_today', ('sales', 'employees'),
+        lambda: render_template('fragments/sales_today.html', summary=today_sales_summary(today)),
+        today
+    )
+    return render_template('sales.html', sale_rows=sale_rows, today_summary=today_summary)
+
+def sale_view_models(limit=SALES_PAGE_SIZE):
+    items_count = db.session.query(func.count(SaleItem.id)).filter(
+        SaleItem.sale_id == Sale.id
+    ).scalar_subquery()
+
+    sales = db.session.query(
+        Sale.id,
+        Sale.sale_date,
+        Sale.sale_time,
+        Sale.total_amount,
+        EMPLOYEE_FULL_NAME,
+        Department.name.label('department'),
+        items_count.label('items_count')
+    ).join(Employee, Employee.id == Sale.employee_id).join(
+        Department, Department.id == Employee.department_id
+    ).order_by(Sale.sale_date.desc()).limit(limit)
+
+    return [row._asdict() for row in sales]
+
+def today_sales_summary(today, top=5):
+    total, count = db.session.query(
+        func.coalesce(func.sum(Sale.total_amount), 0),
+        func.count(Sale.id)
+    ).filter(Sale.sale_date == today).one()
+
+    sales_total = func.sum(Sale.total_amount)
+    top_employees = db.session.query(
+        EMPLOYEE_FULL_NAME,
+        func.count(Sale.id).label('sales_count'),
+        sales_total.label('total')
+    ).join(Employee, Employee.id == Sale.employee_id).filter(
+        Sale.sale_date == today
+    ).group_by(Employee.id, Employee.first_name, Employee.last_name).order_by(sales_total.desc()).limit(top)
+
+    return {
+        'count': count,
+        'total': total,
+        'top_employees': [row._asdict() for row in top_employees]
+    }
+
+@bp.route('/sales/add', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def add_sale():
+    employees = Employee.query.filter_by(is_deleted=False).all()
+
+    if request.method == 'GET':
+        selected_emp_id = request.args.get('employee_id')
+
+        if not selected_emp_id:
+            return render_template("add_sale.html",
+                                   employees=employees,
+                                   department_id=None,
+                                   selected_emp_id=None)
+
+        employee = Employee.query.get(int(selected_emp_id))
+
+        return render_template("add_sale.html",
+                               employees=employees,
+                               department_id=employee.department_id if employee else None,
+                               selected_emp_id=selected_emp_id)
+
+    employee_id = int(request.form.get('employee_id'))
+    employee = Employee.query.get(employee_id)
+
+    if not employee:
+        flash("Невірний співробітник.", "danger")
+        return redirect(url_for('sales.add_sale'))
+
+    sale = Sale(
+        employee_id=employee_id,
+        sale_date=date.today(),
+        sale_time=datetime.now().time(),
+        total_amount=0
+    )
+    db.session.add(sale)
+    db.session.flush()
+
+    product_ids = request.form.getlist('product_id')
+    quantities = request.form.getlist('quantity')
+
+    items_added = 0
+    total = 0
+
+    for pid, qty in zip(product_ids, quantities):
+
+        if not pid or not qty:
+            continue
+
+        try:
+            quantity = int(qty)
+        except ValueError:
+            continue
+
+        if quantity <= 0:
+            continue
+
+        product = Product.query.get(int(pid))
+
+        if product.department_id != employee.department_id:
+            db.session.rollback()
+            flash("Товар не з відділу співробітника.", "danger")
+            return redirect(url_for('sales.add_sale', employee_id=employee_id))
+
+        if not adjust_stock(product.id, -quantity, reason='sale', reference_id=sale.id):
+            db.session.rollback()
+            flash(
+                f"Недостатньо товару «{product.name}» на складі. Доступно: {product.stock_quantity}",
+                "danger"
+            )
+            return redirect(url_for('sales.add_sale', employee_id=employee_id))
+
+        unit_price = product.price
+        total_price = unit_price * quantity
+
+        sale_item = SaleItem(
+            sale_id=sale.id,
+            product_id=product.id,
+            quantity=quantity,
+            unit_price=unit_price,
+            total_price=total_price
+        )
+        db.session.add(sale_item)
+
+        total += total_price
+        items_added += 1
+
+    if items_added == 0:
+        db.session.rollback()
+        flash("Продаж повинен містити хоча б один товар.", "danger")
+        return redirect(url_for('sales.add_sale', employee_id=employee_id))
+
+    sale.total_amount = total
+    db.session.commit()
+    append_new_sales()
+
+    flash("Продаж успішно створено.", "success")
+    return redirect(url_for('sales.sales'))
+
+@bp.route('/api/departments/<int:department_id>/products/lookup')
+@requires_operator_or_admin
+def api_department_product_lookup(department_id):
+    search_query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 10, type=int) or 10, 1), 50)
+
+    return jsonify(lookup_department_products(department_id, search_query, limit=limit))
+
+@bp.route('/sales/edit/<int:sale_id>', methods=['GET', 'POST'])
+@requires_operator_or_admin
+def edit_sale(sale_id):
+    sale = Sale.query.get_or_404(sale_id)
+    employee = sale.employee
+
+    products = Product.query.filter_by(
+        department_id=employee.department_id,
+        is_deleted=False
+    ).all()
+
+    old_items = {item.product_id: item.quantity for item in sale.sale_items}
+
+    if request.method == 'POST':
+
+        new_items = {}
+        for key in request.form:
+            if key.startswith("quantity_"):
+                product_id = int(key.split("_")[1])
+                qty_raw = request.form[key]
+
+                if not qty_raw:
+                    continue
+
+                try:
+                    qty = int(qty_raw)
+                except:
+                    continue
+
+                if qty > 0:
+                    new_items[product_id] = qty
+
+        if len(new_items) == 0:
+            flash("Продаж не може бути порожнім. Залиште хоча б один товар.", "danger")
+            return redirect(url_for('sales.edit_sale', sale_id=sale.id))
+
+        try:
+            claim_version(Sale, sale.id, request.form.get('version', type=int))
+        except EditConflict:
+            db.session.rollback()
+            flash("Продаж щойно змінив інший користувач. Перевірте актуальні дані та повторіть редагування.", "warning")
+            return render_template("edit_sale.html", sale=sale, products=products), 409
+
+        for pid in new_items:
+            product = Product.query.get(pid)
+
+            if not product or product.department_id != employee.department_id:
+                db.session.rollback()
+                flash("Товар не належить відділу співробітника.", "danger")
+                return redirect(url_for('sales.edit_sale', sale_id=sale_id))
+
+        # сортування за id задає однаковий порядок блокування рядків у паралельних транзакціях
+        for pid in sorted(set(old_items) | set(new_items)):
+            delta = old_items.get(pid, 0) - new_items.get(pid, 0)
+
+            if delta and not adjust_stock(pid, delta, reason='sale_edit', reference_id=sale.id):
+                db.session.rollback()
+                product = Product.query.get(pid)
+                flash(
+                    f"Недостатньо товару «{product.name}» на складі. "
+                    f"Доступно: {product.stock_quantity + old_items.get(pid, 0)}",
+                    "danger"
+                )
+                return redirect(url_for('sales.edit_sale', sale_id=sale.id))
+
+        SaleItem.query.filter_by(sale_id=sale.id).delete()
+        db.session.flush()
+
+        total_amount = 0
+        for pid, qty in new_items.items():
+            product = Product.query.get(pid)
+            total_price = product.price * qty
+
+            db.session.add(SaleItem(
+                sale_id=sale.id,
+                product_id=pid,
+                quantity=qty,
+                unit_price=product.price,
+                total_price=total_price
+            ))
+
+            total_amount += total_price
+
+        sale.total_amount = total_amount
+        db.session.commit()
+        invalidate_sales_cube()
+
+        flash("Продаж успішно оновлено.", "success")
+        return redirect(url_for('sales.sales'))
+
+    return render_template("edit_sale.html", sale=sale, products=products)
+
+@bp.route('/sales/delete/<int:sale_id>')
+@requires_operator_or_admin
+def delete_sale(sale_id):
+    sale = Sale.query.get_or_404(sale_id)
+
+    for item in sale.sale_items:
+        adjust_stock(item.product_id, item.quantity, reason='sale_delete', reference_id=sale.id)
+
+    SaleItem.query.filter_by(sale_id=sale_id).delete()
+    db.session.delete(sale)
+    db.session.commit()
+    invalidate_sales_cube()
+
+    flash("Продаж успішно видалено. Товари повернено на склад.", "success")
+    return redirect(url_for('sales.sales'))
@@ -0,0 +1,180 @@
+import os
+import re
+import time
+import zlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import text
+from models import db
+from db_pool import PGBOUNCER_MODE
+
+# той самий синтаксис параметрів, що й у sqlalchemy.text(): :name, але не ::cast
+PARAM_RE = re.compile(r'(?<![:\w\\]):(\w+)(?!:)')
+READ_ONLY_RE = re.compile(r'^\s*(select|with)\b', re.IGNORECASE)
+
+CACHE_TTL = float(os.getenv('SAVED_QUERY_CACHE_TTL', 60))
+CACHE_SIZE = int(os.getenv('SAVED_QUERY_CACHE_SIZE', 200))
+MAX_ROWS = int(os.getenv('SAVED_QUERY_MAX_ROWS', 1000))
+
+_cache = OrderedDict()
+_stats = {}
+_lock = threading.Lock()
+
+class SavedQueryError(Exception):
+    pass
+
+def query_parameters(sql):
+    """Імена параметрів у порядку першої появи."""
+    names = []
+    for name in PARAM_RE.findall(sql):
+        if name not in names:
+            names.append(name)
+    return names
+
+def validate_sql(sql):
+    sql = (sql or '').strip().rstrip(';').strip()
+    if not sql:
+        raise SavedQueryError('SQL запит порожній')
+    if ';' in sql:
+        raise SavedQueryError('Збережений запит має містити лише одну інструкцію')
+    if not READ_ONLY_RE.match(sql):
+        raise SavedQueryError('Збережений запит має починатися з SELECT або WITH')
+    return sql
+
+def _fetch(result):
+    columns = list(result.keys())
+    rows = [dict(zip(columns, row)) for row in result.fetchmany(MAX_ROWS + 1)]
+    return {
+        'columns': columns,
+        'rows': rows[:MAX_ROWS],
+        'truncated': len(rows) > MAX_ROWS
+    }
+
+def _statement_name(query_id, sql):
+    # назва залежить від тексту, тож після редагування готується нова інструкція
+    return f'saved_query_{query_id}_{zlib.crc32(sql.encode("utf-8")):08x}'
+
+def _execute_prepared(conn, query_id, sql, params):
+    names = query_parameters(sql)
+    statement = _statement_name(query_id, sql)
+
+    # PREPARE діє в межах з'єднання, тому список підготовлених зберігаємо в info з'єднання пулу
+    prepared = conn.connection.info.setdefault('prepared_saved_queries', set())
+    if statement not in prepared:
+        positional = PARAM_RE.sub(lambda match: f'${names.index(match.group(1)) + 1}', sql)
+        conn.exec_driver_sql(f'PREPARE {statement} AS {positional}')
+        prepared.add(statement)
+
+    arguments = f"({', '.join(f':{name}' for name in names)})" if names else ''
+    return conn.execute(text(f'EXECUTE {statement}{arguments}'), params)
+
+@contextmanager
+def read_only_connection():
+    """Окреме з'єднання з транзакцією лише для читання, яка завжди відкочується."""
+    with db.engine.connect() as conn:
+        dialect = conn.dialect.name
+        trans = conn.begin()
+        try:
+            if dialect == 'postgresql':
+                conn.execute(text('SET TRANSACTION READ ONLY'))
+            elif dialect == 'sqlite':
+                conn.exec_driver_sql('PRAGMA query_only = ON')
+            yield conn
+        finally:
+            trans.rollback()
+            if dialect == 'sqlite':
+                conn.exec_driver_sql('PRAGMA query_only = OFF')
+
+def _run(sql, params, query_id=None):
+    with read_only_connection() as conn:
+        # через PgBouncer наступна транзакція може потрапити на інше з'єднання сервера
+        if conn.dialect.name == 'postgresql' and query_id is not None and not PGBOUNCER_MODE:
+            result = _execute_prepared(conn, query_id, sql, params)
+        else:
+            result = conn.execute(text(sql), params)
+        return _fetch(result)
+
+def run_read_only(sql, params=None):
+    """Виконує довільний SQL у транзакції лише для читання."""
+    return _run(sql, params or {})
+
+def _record(query_id, started, row_count=None, cached=False, failed=False):
+    with _lock:
+        stats = _stats.setdefault(query_id, {
+            'runs': 0, 'cache_hits': 0, 'errors': 0,
+            'total_ms': 0.0, 'last_ms': None, 'last_run_at': None, 'last_row_count': None
+        })
+        stats['last_run_at'] = datetime.now()
+        if failed:
+            stats['errors'] += 1
+            return
+        if cached:
+            stats['cache_hits'] += 1
+        else:
+            elapsed = (time.perf_counter() - started) * 1000
+            stats['runs'] += 1
+            stats['total_ms'] += elapsed
+            stats['last_ms'] = round(elapsed, 2)
+        stats['last_row_count'] = row_count
+
+def get_saved_query_stats(query_id):
+    with _lock:
+        stats = dict(_stats.get(query_id, {
+            'runs': 0, 'cache_hits': 0, 'errors': 0,
+            'total_ms': 0.0, 'last_ms': None, 'last_run_at': None, 'last_row_count': None
+        }))
+    stats['avg_ms'] = round(stats['total_ms'] / stats['runs'], 2) if stats['runs'] else None
+    stats['total_ms'] = round(stats['total_ms'], 2)
+    return stats
+
+def invalidate_saved_query(query_id):
+    with _lock:
+        for key in [key for key in _cache if key[0] == query_id]:
+            del _cache[key]
+
+def bind_values(sql, params):
+    names = query_parameters(sql)
+    missing = [name for name in names if params.get(name) in (None, '')]
+    if missing:
+        raise SavedQueryError(f"Не вказано параметри: {', '.join(missing)}")
+    return {name: params[name] for name in names}
+
+def run_saved_query(saved_query, params):
+    names = query_parameters(saved_query.sql_text)
+    values = bind_values(saved_query.sql_text, params)
+    key = (
+        saved_query.id,
+        zlib.crc32(saved_query.sql_text.encode('utf-8')),
+        tuple((name, str(values[name])) for name in names)
+    )
+
+    started = time.perf_counter()
+    with _lock:
+        entry = _cache.get(key)
+        if entry and time.monotonic() - entry[0] < CACHE_TTL:
+            _cache.move_to_end(key)
+            result = entry[1]
+        else:
+            result = None
+
+    if result is not None:
+        _record(saved_query.id, started, row_count=len(result['rows']), cached=True)
+        return dict(result, cached=True)
+
+    try:
+        result = _run(saved_query.sql_text, values, query_id=saved_query.id)
+    except Exception:
+        _record(saved_query.id, started, failed=True)
+        raise
+
+    _record(saved_query.id, started, row_count=len(result['rows']))
+
+    with _lock:
+        _cache[key] = (time.monotonic(), result)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return dict(result, cached=False)
@@ -0,0 +1,99 @@
+import os
+import atexit
+import threading
+import logging
+from datetime import date, datetime, timedelta
+from sqlalchemy import or_, and_, not_
+from models import db, Contract
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = int(os.getenv('SCHEDULER_INTERVAL', os.getenv('CONTRACT_REFRESH_INTERVAL', 600)))
+
+_jobs = []
+_stop_event = threading.Event()
+_thread = None
+_thread_lock = threading.Lock()
+_flags_date = None  # дата, на яку цей процес востаннє перерахував Contract.is_active
+_flags_lock = threading.Lock()
+
+def refresh_contract_flags(today=None):
+    """Оновлює Contract.is_active двома UPDATE і повертає кількість змінених договорів."""
+    global _flags_date
+    today = today or date.today()
+    in_period = and_(
+        Contract.is_deleted == False,
+        Contract.start_date <= today,
+        Contract.end_date >= today
+    )
+
+    activated = Contract.query.filter(Contract.is_active == False, in_period).update(
+        {Contract.is_active: True}, synchronize_session=False
+    )
+    deactivated = Contract.query.filter(
+        Contract.is_active == True,
+        or_(Contract.is_deleted == True, not_(in_period))
+    ).update({Contract.is_active: False}, synchronize_session=False)
+
+    db.session.commit()
+    if today == date.today():
+        _flags_date = today
+    return activated + deactivated
+
+def ensure_contract_flags(today=None):
+    """Перераховує прапорці, якщо після останнього оновлення в цьому процесі змінилася дата.
+
+    Викликається на початку запиту: після півночі перший же запит бачить актуальні договори,
+    не чекаючи наступного проходу планувальника.
+    """
+    today = today or date.today()
+    if _flags_date == today:
+        return
+    with _flags_lock:
+        if _flags_date != today:
+            refresh_contract_flags(today)
+
+def seconds_until_rollover(now=None):
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (midnight - now).total_seconds()
+
+def register_periodic_job(func):
+    if func not in _jobs:
+        _jobs.append(func)
+    return func
+
+def _run(app):
+    while not _stop_event.is_set():
+        for job in list(_jobs):
+            with app.app_context():
+                try:
+                    job()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Помилка фонового завдання %s", job.__name__)
+                finally:
+                    db.session.remove()
+        # прокидаємося й о півночі, щоб договори змінили статус разом зі зміною дати
+        _stop_event.wait(min(REFRESH_INTERVAL, seconds_until_rollover() + 1))
+
+@register_periodic_job
+def refresh_active_contracts():
+    changed = refresh_contract_flags()
+    if changed:
+        logger.info("Оновлено статус %s договорів", changed)
+
+def start_scheduler(app):
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    with _thread_lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _stop_event.clear()
+        _thread = threading.Thread(target=_run, args=(app,), name='scheduler', daemon=True)
+        _thread.start()
+        atexit.register(stop_scheduler)
+
+def stop_scheduler():
+    _stop_event.set()
@@ -0,0 +1,92 @@
+from datetime import date
+from sqlalchemy import func, case, and_
+from models import db, Supplier, Contract, Delivery, DeliveryItem, SupplierScorecard
+
+def _contract_stats(supplier_ids, today):
+    is_active = case(
+        (and_(Contract.start_date <= today, Contract.end_date >= today), 1),
+        else_=0
+    )
+    query = db.session.query(
+        Contract.supplier_id,
+        func.count(Contract.id).label('contracts_count'),
+        func.sum(is_active).label('active_contracts')
+    ).filter(Contract.is_deleted == False)
+
+    if supplier_ids is not None:
+        query = query.filter(Contract.supplier_id.in_(supplier_ids))
+
+    return {row.supplier_id: row for row in query.group_by(Contract.supplier_id)}
+
+def _delivery_stats(supplier_ids):
+    query = db.session.query(
+        Contract.supplier_id,
+        func.count(func.distinct(Delivery.id)).label('deliveries_count'),
+        func.count(DeliveryItem.id).label('delivered_items'),
+        func.sum(DeliveryItem.total_price).label('total_delivered_value'),
+        func.max(Delivery.delivery_date).label('last_delivery_date')
+    ).select_from(Delivery).join(
+        Contract, Contract.id == Delivery.contract_id
+    ).outerjoin(
+        DeliveryItem, DeliveryItem.delivery_id == Delivery.id
+    )
+
+    if supplier_ids is not None:
+        query = query.filter(Contract.supplier_id.in_(supplier_ids))
+
+    return {row.supplier_id: row for row in query.group_by(Contract.supplier_id)}
+
+def refresh_supplier_scorecards(supplier_ids=None):
+    """Перераховує картки постачальників у поточній транзакції (без commit)."""
+    today = date.today()
+
+    if supplier_ids is None:
+        ids = [row.id for row in db.session.query(Supplier.id)]
+    else:
+        ids = list(set(supplier_ids))
+
+    if not ids:
+        return
+
+    contracts = _contract_stats(None if supplier_ids is None else ids, today)
+    deliveries = _delivery_stats(None if supplier_ids is None else ids)
+    existing = {
+        card.supplier_id: card
+        for card in SupplierScorecard.query.filter(SupplierScorecard.supplier_id.in_(ids))
+    }
+
+    for supplier_id in ids:
+        card = existing.get(supplier_id)
+        if card is None:
+            card = SupplierScorecard(supplier_id=supplier_id)
+            db.session.add(card)
+
+        contract_row = contracts.get(supplier_id)
+        delivery_row = deliveries.get(supplier_id)
+
+        card.contracts_count = contract_row.contracts_count if contract_row else 0
+        card.active_contracts = (contract_row.active_contracts or 0) if contract_row else 0
+        card.deliveries_count = delivery_row.deliveries_count if delivery_row else 0
+        card.delivered_items = delivery_row.delivered_items if delivery_row else 0
+        card.total_delivered_value = (delivery_row.total_delivered_value or 0) if delivery_row else 0
+        card.last_delivery_date = delivery_row.last_delivery_date if delivery_row else None
+        card.refreshed_on = today
+
+def get_supplier_scorecards():
+    """Повертає {supplier_id: SupplierScorecard}, оновлюючи лише застарілі картки."""
+    # кількість активних договорів залежить від дати, тому вчорашні картки перераховуються
+    today = date.today()
+
+    stale_ids = [
+        row.id for row in db.session.query(Supplier.id).outerjoin(
+            SupplierScorecard, SupplierScorecard.supplier_id == Supplier.id
+        ).filter(
+            (SupplierScorecard.supplier_id == None) | (SupplierScorecard.refreshed_on < today)
+        )
+    ]
+
+    if stale_ids:
+        refresh_supplier_scorecards(stale_ids)
+        db.session.commit()
+
+    return {card.supplier_id: card for card in SupplierScorecard.query.all()}
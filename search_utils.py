@@ -0,0 +1,312 @@
+import os
+import re
+import time
+import heapq
+import difflib
+import threading
+from bisect import bisect_left
+from sqlalchemy import event, text, DDL
+from models import db, Product
+from etag_utils import get_versions
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+ISBN_RE = re.compile(r'[^0-9xX]')
+
+FIELD_WEIGHTS = {'name': 3.0, 'author': 2.0, 'publisher': 1.0}
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.7
+FUZZY_SCORE = 0.4
+ISBN_SCORE = 10.0
+MIN_ISBN_DIGITS = 3
+
+# як часто звіряти індекси в пам'яті з лічильником змін products, який оновлюють інші воркери
+INDEX_CHECK_INTERVAL = float(os.getenv('SEARCH_INDEX_CHECK_INTERVAL', 5))
+
+# PostgreSQL: tsvector-колонка з GIN-індексом, триграми для нечіткого пошуку
+# та індекс за нормалізованим ISBN для пошуку за префіксом.
+event.listen(Product.__table__, 'after_create', DDL("""
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(author, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(publisher, '')), 'C')
+    ) STORED;
+    CREATE INDEX ix_products_search_vector ON products USING GIN (search_vector);
+    CREATE INDEX ix_products_name_trgm ON products USING GIN (lower(name) gin_trgm_ops);
+    CREATE INDEX ix_products_isbn_digits ON products
+        ((upper(regexp_replace(coalesce(isbn, ''), '[^0-9xX]', '', 'g'))) text_pattern_ops);
+""").execute_if(dialect='postgresql'))
+
+PG_SEARCH_SQL = text("""
+    SELECT p.id, p.name, p.author, p.publisher, p.isbn, p.price, p.stock_quantity,
+           (CASE WHEN :isbn_prefix <> '' AND upper(regexp_replace(coalesce(p.isbn, ''), '[^0-9xX]', '', 'g')) LIKE :isbn_prefix
+                 THEN :isbn_score ELSE 0 END)
+           + (CASE WHEN :tsquery <> '' THEN ts_rank(p.search_vector, to_tsquery('simple', :tsquery)) ELSE 0 END)
+           + similarity(lower(p.name), :query) AS rank
+    FROM products p
+    WHERE p.is_deleted = false
+      AND (
+          (:tsquery <> '' AND p.search_vector @@ to_tsquery('simple', :tsquery))
+          OR lower(p.name) % :query
+          OR (:isbn_prefix <> '' AND upper(regexp_replace(coalesce(p.isbn, ''), '[^0-9xX]', '', 'g')) LIKE :isbn_prefix)
+      )
+    ORDER BY rank DESC, p.id
+    LIMIT :limit
+""")
+
+PG_LOOKUP_SQL = text("""
+    SELECT p.id, p.name, p.isbn, p.price, p.stock_quantity
+    FROM products p
+    WHERE p.department_id = :department_id
+      AND p.is_deleted = false
+      AND (
+          (:tsquery <> '' AND p.search_vector @@ to_tsquery('simple', :tsquery))
+          OR (:isbn_prefix <> '' AND upper(regexp_replace(coalesce(p.isbn, ''), '[^0-9xX]', '', 'g')) LIKE :isbn_prefix)
+      )
+    ORDER BY (:isbn_prefix <> '' AND upper(regexp_replace(coalesce(p.isbn, ''), '[^0-9xX]', '', 'g')) LIKE :isbn_prefix) DESC,
+             left(lower(p.name), length(:phrase)) = :phrase DESC,
+             lower(p.name), p.id
+    LIMIT :limit
+""")
+
+def tokenize(value):
+    return TOKEN_RE.findall((value or '').lower())
+
+def normalize_isbn(value):
+    return ISBN_RE.sub('', value or '').upper()
+
+def _row_to_dict(row, rank):
+    return {
+        'id': row.id,
+        'name': row.name,
+        'author': row.author,
+        'publisher': row.publisher,
+        'isbn': row.isbn,
+        'price': float(row.price),
+        'stock_quantity': row.stock_quantity,
+        'rank': round(float(rank), 4)
+    }
+
+class ProductSearchIndex:
+    """Інвертований індекс у пам'яті для баз без tsvector/pg_trgm (SQLite)."""
+
+    def __init__(self, products):
+        self.postings = {}
+        self.isbns = []
+
+        for product in products:
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(getattr(product, field)):
+                    postings = self.postings.setdefault(token, {})
+                    postings[product.id] = max(postings.get(product.id, 0), weight)
+
+            isbn = normalize_isbn(product.isbn)
+            if isbn:
+                self.isbns.append((isbn, product.id))
+
+        self.tokens = sorted(self.postings)
+        self.isbns.sort()
+
+    def _prefix_tokens(self, prefix):
+        i = bisect_left(self.tokens, prefix)
+        while i < len(self.tokens) and self.tokens[i].startswith(prefix):
+            yield self.tokens[i]
+            i += 1
+
+    def _isbn_matches(self, prefix):
+        i = bisect_left(self.isbns, (prefix,))
+        while i < len(self.isbns) and self.isbns[i][0].startswith(prefix):
+            yield self.isbns[i][1]
+            i += 1
+
+    def search(self, query, limit=20):
+        scores = {}
+
+        isbn = normalize_isbn(query)
+        if len(re.sub(r'\D', '', isbn)) >= MIN_ISBN_DIGITS:
+            for product_id in self._isbn_matches(isbn):
+                scores[product_id] = scores.get(product_id, 0) + ISBN_SCORE
+
+        for term in tokenize(query):
+            matches = {}
+            for token in self._prefix_tokens(term):
+                factor = EXACT_SCORE if token == term else PREFIX_SCORE
+                for product_id, weight in self.postings[token].items():
+                    matches[product_id] = max(matches.get(product_id, 0), weight * factor)
+
+            if not matches and len(term) > 2:
+                for token in difflib.get_close_matches(term, self.tokens, n=5, cutoff=0.75):
+                    ratio = difflib.SequenceMatcher(None, term, token).ratio()
+                    for product_id, weight in self.postings[token].items():
+                        matches[product_id] = max(matches.get(product_id, 0), weight * FUZZY_SCORE * ratio)
+
+            for product_id, score in matches.items():
+                scores[product_id] = scores.get(product_id, 0) + score
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+class DepartmentProductIndex:
+    """Індекс назв та ISBN товарів одного відділу для підказок на касі."""
+
+    def __init__(self, products):
+        self.names = {}
+        self.tokens = {}
+        self.entries = []
+        self.isbns = []
+
+        for product in products:
+            name = (product.name or '').lower()
+            tokens = tuple(sorted(set(tokenize(name))))
+            self.names[product.id] = name
+            self.tokens[product.id] = tokens
+            self.entries.extend((token, product.id) for token in tokens)
+
+            isbn = normalize_isbn(product.isbn)
+            if isbn:
+                self.isbns.append((isbn, product.id))
+
+        self.entries.sort()
+        self.isbns.sort()
+
+    def lookup(self, query, limit=10):
+        found = []
+        seen = set()
+
+        isbn = normalize_isbn(query)
+        if len(re.sub(r'\D', '', isbn)) >= MIN_ISBN_DIGITS:
+            i = bisect_left(self.isbns, (isbn,))
+            while i < len(self.isbns) and self.isbns[i][0].startswith(isbn) and len(found) < limit:
+                found.append(self.isbns[i][1])
+                seen.add(self.isbns[i][1])
+                i += 1
+
+        terms = tokenize(query)
+        if not terms or len(found) >= limit:
+            return found[:limit]
+
+        first, rest = terms[0], terms[1:]
+        phrase = query.strip().lower()
+        candidates = []
+
+        # обмежуємо перегляд, щоб короткий префікс не обходив увесь відділ
+        i = bisect_left(self.entries, (first,))
+        while i < len(self.entries) and self.entries[i][0].startswith(first) and len(candidates) < limit * 10:
+            product_id = self.entries[i][1]
+            i += 1
+            if product_id in seen:
+                continue
+            if all(any(token.startswith(term) for token in self.tokens[product_id]) for term in rest):
+                candidates.append(product_id)
+                seen.add(product_id)
+
+        candidates.sort(key=lambda pid: (not self.names[pid].startswith(phrase), self.names[pid]))
+        return (found + candidates)[:limit]
+
+_indexes = {}  # ключ -> (версія products, час перевірки, індекс)
+_index_lock = threading.Lock()
+
+def invalidate_product_search():
+    """Скидає індекси цього процесу одразу; інші воркери побачать зміну через лічильник products."""
+    with _index_lock:
+        _indexes.clear()
+
+def _cached_index(key, build):
+    now = time.monotonic()
+    with _index_lock:
+        entry = _indexes.get(key)
+    if entry and now - entry[1] < INDEX_CHECK_INTERVAL:
+        return entry[2]
+
+    version = get_versions(['products'])['products']
+    index = entry[2] if entry and entry[0] == version else build()
+    with _index_lock:
+        _indexes[key] = (version, now, index)
+    return index
+
+def _get_index():
+    return _cached_index('catalogue', lambda: ProductSearchIndex(db.session.query(
+        Product.id, Product.name, Product.author, Product.publisher, Product.isbn
+    ).filter(Product.is_deleted == False)))
+
+def search_products(query, limit=20):
+    query = (query or '').strip()
+    if not query:
+        return []
+
+    if db.engine.dialect.name != 'postgresql':
+        ranked = _get_index().search(query, limit=limit)
+        # ціну й залишок беремо з БД, бо індекс не оновлюється при продажах
+        products = {
+            product.id: product
+            for product in Product.query.filter(Product.id.in_([pid for pid, _ in ranked]))
+        }
+        return [
+            _row_to_dict(products[pid], score)
+            for pid, score in ranked
+            if pid in products and not products[pid].is_deleted
+        ]
+
+    isbn = normalize_isbn(query)
+    isbn_prefix = isbn + '%' if len(re.sub(r'\D', '', isbn)) >= MIN_ISBN_DIGITS else ''
+
+    rows = db.session.execute(PG_SEARCH_SQL, {
+        'query': query.lower(),
+        'tsquery': ' & '.join(f'{token}:*' for token in tokenize(query)),
+        'isbn_prefix': isbn_prefix,
+        'isbn_score': ISBN_SCORE,
+        'limit': limit
+    })
+    return [_row_to_dict(row, row.rank) for row in rows]
+
+def _get_department_index(department_id):
+    return _cached_index(('department', department_id), lambda: DepartmentProductIndex(
+        db.session.query(Product.id, Product.name, Product.isbn).filter(
+            Product.department_id == department_id,
+            Product.is_deleted == False
+        )
+    ))
+
+def _product_lookup_dict(row):
+    return {
+        'id': row.id,
+        'name': row.name,
+        'isbn': row.isbn,
+        'price': float(row.price),
+        'stock_quantity': row.stock_quantity
+    }
+
+def _lookup_postgresql(department_id, query, limit):
+    isbn = normalize_isbn(query)
+    rows = db.session.execute(PG_LOOKUP_SQL, {
+        'department_id': department_id,
+        'tsquery': ' & '.join(f'{token}:*' for token in tokenize(query)),
+        'isbn_prefix': isbn + '%' if len(re.sub(r'\D', '', isbn)) >= MIN_ISBN_DIGITS else '',
+        'phrase': query.lower(),
+        'limit': limit
+    })
+    return [_product_lookup_dict(row) for row in rows]
+
+def lookup_department_products(department_id, query, limit=10):
+    query = (query or '').strip()
+    if not query:
+        return []
+
+    # на PostgreSQL tsvector та індекс ISBN вже є в базі, тож індекс у пам'яті не потрібен
+    if db.engine.dialect.name == 'postgresql':
+        return _lookup_postgresql(department_id, query, limit)
+
+    product_ids = _get_department_index(department_id).lookup(query, limit=limit)
+    if not product_ids:
+        return []
+
+    # індекс зберігає лише назви та ISBN; ціна й залишок завжди актуальні з БД
+    rows = db.session.query(
+        Product.id, Product.name, Product.isbn, Product.price, Product.stock_quantity
+    ).filter(
+        Product.id.in_(product_ids),
+        Product.department_id == department_id,
+        Product.is_deleted == False
+    )
+    by_id = {row.id: row for row in rows}
+
+    return [_product_lookup_dict(by_id[pid]) for pid in product_ids if pid in by_id]
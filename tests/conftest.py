@@ -0,0 +1,36 @@
+import pytest
+from app import create_app
+from models import db, User
+from history_utils import flush_history
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # періодичні завдання планувальника тестам не потрібні й лише конкурують за базу
+    monkeypatch.setattr('scheduler.start_scheduler', lambda app: None)
+    monkeypatch.setattr('history_utils.HISTORY_DIR', tmp_path / 'history')
+    app = create_app({
+        'SECRET_KEY': 'test',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        # SQLite має одного записувача: інші потоки чекають на блокування, а не падають
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 30}}
+    })
+    with app.app_context():
+        db.create_all()
+    yield app
+    # записувач історії пише у фоні: скидаємо чергу, поки HISTORY_DIR ще вказує на tmp_path
+    flush_history()
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    with app.app_context():
+        user = User(username='admin', email='admin@example.com', role='administrator', is_active=True)
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'secret'})
+    client.user_id = user_id
+    return client
@@ -0,0 +1,36 @@
+import pytest
+from models import db, Supplier
+
+@pytest.fixture(autouse=True)
+def supplier(app):
+    with app.app_context():
+        supplier = Supplier(name='Книжковий дім')
+        db.session.add(supplier)
+        db.session.commit()
+        return supplier.id
+
+def post(client, url, **kwargs):
+    response = client.post(url, **kwargs)
+    data = response.get_json()
+    response.close()
+    return response.status_code, data
+
+@pytest.mark.parametrize('body', [
+    {'json': [1, 2]},
+    {'json': {'ids': '1'}},
+    {'json': 'ids'},
+    {'data': '{"ids": [1', 'content_type': 'application/json'},
+])
+def test_bulk_delete_rejects_malformed_body(client, body):
+    status, data = post(client, '/api/suppliers/bulk-delete', **body)
+    assert status == 400
+    assert 'error' in data
+
+def test_bulk_delete_and_restore_accept_json_and_form(client, supplier):
+    status, data = post(client, '/api/suppliers/bulk-delete', json={'ids': [supplier, 'abc', 999]})
+    assert status == 200
+    assert data == {'deleted': [supplier], 'blocked': [], 'not_found': [999]}
+
+    status, data = post(client, '/api/suppliers/bulk-restore', data={'ids': [str(supplier)]})
+    assert status == 200
+    assert data == {'restored': [supplier], 'not_found': []}
@@ -0,0 +1,97 @@
+import threading
+import pytest
+from models import db, Department, ProductCategory, Product, StockMovement
+from concurrency_utils import EditConflict, claim_version, adjust_stock
+
+THREADS = 8
+
+@pytest.fixture(autouse=True)
+def product(app):
+    with app.app_context():
+        department = Department(name='Відділ')
+        category = ProductCategory(name='Категорія')
+        db.session.add_all([department, category])
+        db.session.flush()
+        db.session.add(Product(
+            name='Книга', price=100, stock_quantity=1000,
+            department_id=department.id, category_id=category.id
+        ))
+        db.session.commit()
+
+def product_state(app):
+    with app.app_context():
+        product = Product.query.one()
+        return product.id, product.stock_quantity, product.version
+
+def race(app, work, threads=THREADS):
+    """Запускає work() у кількох потоках одночасно, кожен зі своєю сесією; повертає результати."""
+    barrier = threading.Barrier(threads)
+    results = []
+    errors = []
+
+    def run():
+        with app.app_context():
+            barrier.wait()
+            try:
+                results.append(work())
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert not errors
+    return results
+
+def test_claim_version_lets_one_editor_win(app):
+    product_id, stock, version = product_state(app)
+
+    def edit():
+        try:
+            claim_version(Product, product_id, version)
+            db.session.commit()
+            return True
+        except EditConflict:
+            db.session.rollback()
+            return False
+
+    results = race(app, edit)
+
+    assert results.count(True) == 1
+    assert product_state(app) == (product_id, stock, version + 1)
+
+def test_adjust_stock_loses_no_updates(app):
+    product_id, stock, version = product_state(app)
+    per_thread = 25
+
+    def sell():
+        for _ in range(per_thread):
+            assert adjust_stock(product_id, -1, reason='sale')
+            db.session.commit()
+        return True
+
+    race(app, sell)
+
+    total = THREADS * per_thread
+    assert product_state(app) == (product_id, stock - total, version + total)
+    with app.app_context():
+        assert StockMovement.query.filter_by(product_id=product_id).count() == total
+
+def test_adjust_stock_never_goes_negative(app):
+    product_id, stock, version = product_state(app)
+    # залишку вистачає рівно на половину потоків
+    quantity = stock // (THREADS // 2)
+
+    def sell():
+        done = adjust_stock(product_id, -quantity, reason='sale')
+        db.session.commit()
+        return done
+
+    results = race(app, sell)
+
+    assert results.count(True) == THREADS // 2
+    assert product_state(app) == (product_id, 0, version + THREADS // 2)
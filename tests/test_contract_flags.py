@@ -0,0 +1,72 @@
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import inspect, text
+import scheduler
+from models import db, Supplier, Contract
+from queries import BookstoreQueries
+from migrate_db import migrate_contract_flags
+
+TODAY = date.today()
+
+@pytest.fixture(autouse=True)
+def contract(app, monkeypatch):
+    # кожен тест починає з «ще не оновлювали сьогодні», як новий процес
+    monkeypatch.setattr(scheduler, '_flags_date', None)
+    with app.app_context():
+        supplier = Supplier(name='Книжковий дім')
+        db.session.add(supplier)
+        db.session.flush()
+        # прапорець застарів: договір почався сьогодні, а оновлення ще не було
+        contract = Contract(contract_number='C-1', supplier_id=supplier.id, start_date=TODAY,
+                            end_date=TODAY + timedelta(days=10), is_active=False)
+        db.session.add(contract)
+        db.session.commit()
+        return contract.id
+
+def is_active(app, contract_id):
+    with app.app_context():
+        return db.session.get(Contract, contract_id).is_active
+
+def test_flags_are_refreshed_once_the_date_changes(app, contract, monkeypatch):
+    with app.app_context():
+        monkeypatch.setattr(scheduler, '_flags_date', TODAY - timedelta(days=1))
+        scheduler.ensure_contract_flags()
+    assert is_active(app, contract)
+
+    with app.app_context():
+        Contract.query.update({Contract.is_active: False})
+        db.session.commit()
+        scheduler.ensure_contract_flags()  # за сьогодні вже оновлено — повторно не перераховує
+    assert not is_active(app, contract)
+
+def test_first_request_of_the_day_sees_current_contracts(app, client, contract, monkeypatch):
+    with app.app_context():
+        Contract.query.update({Contract.is_active: False})
+        db.session.commit()
+    monkeypatch.setattr(scheduler, '_flags_date', TODAY - timedelta(days=1))
+
+    response = client.get('/api/contracts/expiring?days=30')
+    data = response.get_json()
+    response.close()
+    assert [row['contract_number'] for row in data['contracts']] == ['C-1']
+
+def test_other_dates_are_checked_against_the_date_range(app):
+    with app.app_context():
+        assert BookstoreQueries.contracts_expiring_within(days=30, today=TODAY - timedelta(days=1)) == []
+        found = BookstoreQueries.contracts_expiring_within(days=30, today=TODAY + timedelta(days=1))
+        assert [contract.contract_number for contract, supplier in found] == ['C-1']
+
+def test_scheduler_wakes_up_at_midnight():
+    assert scheduler.seconds_until_rollover(datetime(2024, 3, 15, 23, 59, 30)) == 30
+
+def test_migration_adds_and_backfills_the_flag(app, contract):
+    with app.app_context():
+        db.session.execute(text('DROP INDEX ix_contracts_active_end_date'))
+        db.session.execute(text('ALTER TABLE contracts DROP COLUMN is_active'))
+        db.session.commit()
+
+        assert migrate_contract_flags() == 1
+        assert migrate_contract_flags() == 0
+
+        assert 'ix_contracts_active_end_date' in {index['name'] for index in inspect(db.engine).get_indexes('contracts')}
+    assert is_active(app, contract)
@@ -0,0 +1,50 @@
+import pytest
+import etag_utils
+from history_utils import load_history
+
+def get(client, url, **kwargs):
+    response = client.get(url, **kwargs)
+    # дочитуємо потокову відповідь і закриваємо її, щоб звільнити слот звіту
+    response.get_data()
+    response.close()
+    return response
+
+@pytest.mark.parametrize('url, api_name', [
+    ('/api/query10?from_date=2024-01-01', 'Запит 10: Тижневий аналіз продажів'),
+    # потокова відповідь: запис історії робиться вже після повернення з декоратора
+    ('/api/query1', 'Запит 1: Інформація про співробітників')
+])
+def test_not_modified_report_is_recorded_in_history(app, client, url, api_name):
+    first = get(client, url)
+    assert first.status_code == 200
+
+    second = get(client, url, headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+
+    with app.app_context():
+        full, revalidated = load_history(client.user_id)
+    assert full['api'] == revalidated['api'] == api_name
+    assert revalidated['params'] == full['params']
+    assert revalidated['result'] == f"{full['result']} (без змін, 304)"
+
+def test_not_modified_report_without_remembered_entry_is_still_recorded(app, client):
+    url = '/api/query10?from_date=2024-01-01'
+    etag = get(client, url).headers['ETag']
+    # повну відповідь ніби віддав інший воркер
+    etag_utils._history_entries.clear()
+
+    assert get(client, url, headers={'If-None-Match': etag}).status_code == 304
+
+    with app.app_context():
+        history = load_history(client.user_id)
+    assert len(history) == 2
+    assert history[1]['api'] == 'Запит 10: Тижневий аналіз продажів'
+    assert history[1]['result'].endswith('(без змін, 304)')
+
+def test_not_modified_page_without_history_is_not_recorded(app, client):
+    etag = get(client, '/api/departments').headers['ETag']
+
+    assert get(client, '/api/departments', headers={'If-None-Match': etag}).status_code == 304
+
+    with app.app_context():
+        assert load_history(client.user_id) == []
@@ -0,0 +1,93 @@
+from datetime import date, time
+import pytest
+from models import (
+    db, Department, ProductCategory, Employee, Supplier, Contract, Product, Sale, SaleItem, WorkSchedule
+)
+from queries import BookstoreQueries
+
+TODAY = date.today()
+
+# ключі відповіді API до переходу на проєкцію
+REPORT_KEYS = {
+    1: ['id', 'full_name', 'position', 'department', 'phone', 'email', 'hire_date', 'is_on_vacation'],
+    3: ['id', 'contract_number', 'supplier', 'start_date', 'end_date'],
+    4: ['id', 'name', 'contact_person', 'phone', 'email', 'address'],
+    6: ['sale_id', 'sale_date', 'sale_time', 'employee', 'product_name', 'category',
+        'quantity', 'unit_price', 'total_price'],
+    7: ['full_name', 'position', 'department', 'shift_start', 'shift_end'],
+}
+
+PROJECTIONS = {
+    1: lambda: BookstoreQueries.query_1_employees_info(as_query=True, projection=True),
+    3: lambda: BookstoreQueries.query_3_contracts_by_period('year', as_query=True, projection=True),
+    4: lambda: BookstoreQueries.query_4_suppliers_without_categories(['Настільні ігри'], as_query=True, projection=True),
+    6: lambda: BookstoreQueries.query_6_sales_info(as_query=True, projection=True),
+    7: lambda: BookstoreQueries.query_7_employee_count(TODAY, as_query=True, projection=True),
+}
+
+@pytest.fixture(autouse=True)
+def report_data(app):
+    with app.app_context():
+        department = Department(name='Художня література')
+        category = ProductCategory(name='Детективи')
+        db.session.add_all([department, category])
+        db.session.flush()
+        employee = Employee(
+            first_name='Олена', last_name='Коваль', position='Продавець', phone='+380501112233',
+            email='olena@example.com', hire_date=date(2020, 5, 4), is_on_vacation=False,
+            department_id=department.id
+        )
+        supplier = Supplier(
+            name='Книжковий дім', contact_person='Іван', phone='+380441234567',
+            email='books@example.com', address='вул. Складська, 1'
+        )
+        product = Product(name='Книга', price=120, stock_quantity=10,
+                          department_id=department.id, category_id=category.id)
+        db.session.add_all([employee, supplier, product])
+        db.session.flush()
+        db.session.add(Contract(contract_number='C-1', supplier_id=supplier.id,
+                                start_date=date(TODAY.year, 1, 1), end_date=date(TODAY.year, 12, 31)))
+        sale = Sale(employee_id=employee.id, sale_date=TODAY, sale_time=time(10, 30), total_amount=240)
+        db.session.add(sale)
+        db.session.flush()
+        db.session.add(SaleItem(sale_id=sale.id, product_id=product.id, quantity=2, unit_price=120, total_price=240))
+        db.session.add(WorkSchedule(employee_id=employee.id, department_id=department.id, work_date=TODAY,
+                                    shift_start=time(9), shift_end=time(18)))
+        db.session.commit()
+
+def get_json(client, url):
+    response = client.get(url)
+    response.get_data()
+    response.close()
+    assert response.status_code == 200
+    return response.get_json()
+
+@pytest.mark.parametrize('number', sorted(PROJECTIONS))
+def test_projection_selects_only_report_columns(app, number):
+    with app.app_context():
+        columns = [column['name'] for column in PROJECTIONS[number]().column_descriptions]
+    assert columns == REPORT_KEYS[number]
+
+def test_report_responses_keep_their_shape(client):
+    year = TODAY.strftime('%Y-%m-%d')
+
+    assert get_json(client, '/api/query1') == [{
+        'id': 1, 'full_name': 'Олена Коваль', 'position': 'Продавець', 'department': 'Художня література',
+        'phone': '+380501112233', 'email': 'olena@example.com', 'hire_date': '2020-05-04', 'is_on_vacation': False
+    }]
+    assert get_json(client, '/api/query3?period=year') == [{
+        'id': 1, 'contract_number': 'C-1', 'supplier': 'Книжковий дім',
+        'start_date': f'{TODAY.year}-01-01', 'end_date': f'{TODAY.year}-12-31'
+    }]
+    assert get_json(client, '/api/query4') == [{
+        'id': 1, 'name': 'Книжковий дім', 'contact_person': 'Іван', 'phone': '+380441234567',
+        'email': 'books@example.com', 'address': 'вул. Складська, 1'
+    }]
+    assert get_json(client, f'/api/query6?target_date={year}')['sales'] == [{
+        'sale_id': 1, 'sale_date': year, 'sale_time': '10:30:00', 'employee': 'Олена Коваль',
+        'product_name': 'Книга', 'category': 'Детективи', 'quantity': 2, 'unit_price': 120.0, 'total_price': 240.0
+    }]
+    assert get_json(client, f'/api/query7?target_date={year}')['employees'] == [{
+        'full_name': 'Олена Коваль', 'position': 'Продавець', 'department': 'Художня література',
+        'shift_start': '09:00', 'shift_end': '18:00'
+    }]
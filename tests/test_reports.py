@@ -0,0 +1,19 @@
+import pytest
+
+def get(client, url):
+    response = client.get(url)
+    data = response.get_json()
+    response.close()
+    return response.status_code, data
+
+@pytest.mark.parametrize('query', ['', '?period=week', '?period=month&target_date=2024-03-15'])
+def test_query5_period_defaults_to_day(client, query):
+    status, data = get(client, f'/api/query5{query}')
+    assert status == 200
+    assert data == []
+
+@pytest.mark.parametrize('query', ['?period=year', '?min_amount=abc'])
+def test_query5_rejects_invalid_parameters(client, query):
+    status, data = get(client, f'/api/query5{query}')
+    assert status == 400
+    assert 'error' in data
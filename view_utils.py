@@ -0,0 +1,54 @@
+from datetime import datetime
+from functools import wraps
+from flask import redirect, url_for, flash, jsonify, make_response
+from flask_login import current_user
+from concurrency_utils import try_acquire_report_slot
+
+def requires_role(*roles):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not current_user.is_authenticated:
+                return redirect(url_for('auth.login'))
+            if current_user.role not in roles or not current_user.is_active():
+                flash('У вас немає прав доступу до цієї функції або ваш обліковий запис заблоковано.', 'danger')
+                return redirect(url_for('catalogue.index'))
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def requires_admin(f):
+    return requires_role('administrator')(f)
+
+def requires_operator_or_admin(f):
+    return requires_role('operator', 'administrator')(f)
+
+def requires_authorized_or_above(f):
+    return requires_role('authorized_user', 'operator', 'administrator')(f)
+
+def requires_any_auth(f):
+    return requires_role('guest', 'authorized_user', 'operator', 'administrator')(f)
+
+def limit_reports_per_user(f):
+    # слот тримається до закриття відповіді, тобто до кінця потокової передачі
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        release = try_acquire_report_slot(current_user.id)
+        if release is None:
+            return jsonify({'error': 'Забагато одночасних звітів. Дочекайтеся завершення попередніх.'}), 429
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            release()
+            raise
+        response.call_on_close(release)
+        return response
+    return decorated_function
+
+def parse_date(value):
+    if not value or value.strip() == "":
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except Exception:
+        return None